@@ -1,10 +1,14 @@
-from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
-from typing import List
+from transformers import pipeline
+from typing import List, Dict, Tuple
+import time
 import torch
 from preprocessing import TextPreprocessor
+from instrumentation import span
+from model_loading import load_seq2seq
 
 class AbstractiveSummarizer:
-    def __init__(self, model_name: str = "facebook/bart-large-cnn", max_length: int = 512, min_length: int = 50):
+    def __init__(self, model_name: str = "facebook/bart-large-cnn", max_length: int = 512, min_length: int = 50,
+                 fast_load: bool = None, shared: bool = False):
         self.model_name = model_name
         self.max_length = max_length
         self.min_length = min_length
@@ -13,8 +17,7 @@ class AbstractiveSummarizer:
         device = 0 if torch.cuda.is_available() else -1
         
         try:
-            self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-            self.model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+            self.tokenizer, self.model = load_seq2seq(model_name, fast=fast_load, shared=shared)
             self.summarizer = pipeline(
                 "summarization",
                 model=self.model,
@@ -25,8 +28,7 @@ class AbstractiveSummarizer:
             print(f"Error loading model {model_name}: {e}")
             print("Falling back to t5-small")
             self.model_name = "t5-small"
-            self.tokenizer = AutoTokenizer.from_pretrained("t5-small")
-            self.model = AutoModelForSeq2SeqLM.from_pretrained("t5-small")
+            self.tokenizer, self.model = load_seq2seq("t5-small", fast=fast_load, shared=shared)
             self.summarizer = pipeline(
                 "summarization",
                 model=self.model,
@@ -65,73 +67,209 @@ class AbstractiveSummarizer:
         
         if len(processed_text.split()) <= max_len:
             try:
-                result = self.summarizer(
-                    processed_text,
-                    max_length=max_len,
-                    min_length=min_len,
-                    num_beams=num_beams,
-                    do_sample=do_sample,
-                    no_repeat_ngram_size=no_repeat_ngram_size
-                )
+                with span('abstractive.pipeline'):
+                    result = self.summarizer(
+                        processed_text,
+                        max_length=max_len,
+                        min_length=min_len,
+                        num_beams=num_beams,
+                        do_sample=do_sample,
+                        no_repeat_ngram_size=no_repeat_ngram_size
+                    )
                 return result[0]['summary_text']
             except Exception as e:
                 return processed_text[:500]
         else:
-            chunks = self._chunk_text(processed_text, max_chunk_length=1000)
+            with span('abstractive.chunk'):
+                chunks = self._chunk_text(processed_text, max_chunk_length=1000)
             summaries = []
             
             for chunk in chunks:
                 try:
-                    result = self.summarizer(
-                        chunk,
-                        max_length=max_len,
-                        min_length=min_len,
-                        num_beams=num_beams,
-                        do_sample=do_sample,
-                        no_repeat_ngram_size=no_repeat_ngram_size
-                    )
+                    with span('abstractive.pipeline'):
+                        result = self.summarizer(
+                            chunk,
+                            max_length=max_len,
+                            min_length=min_len,
+                            num_beams=num_beams,
+                            do_sample=do_sample,
+                            no_repeat_ngram_size=no_repeat_ngram_size
+                        )
                     summaries.append(result[0]['summary_text'])
                 except Exception as e:
                     summaries.append(chunk[:200])
             
             return ' '.join(summaries)
-
-class T5Summarizer(AbstractiveSummarizer):
-    def __init__(self, model_name: str = "t5-small", max_length: int = 512, min_length: int = 50):
-        super().__init__(model_name=model_name, max_length=max_length, min_length=min_length)
     
-    def summarize(self, text: str, max_length: int = None, min_length: int = None,
-                  num_beams: int = 4, do_sample: bool = False,
-                  no_repeat_ngram_size: int = 3) -> str:
-        processed_text = self.preprocessor.preprocess(text)
+    def summarize_batch(self, texts: List[str], max_length: int = None, min_length: int = None,
+                        num_beams: int = 4, do_sample: bool = False,
+                        no_repeat_ngram_size: int = 3, batch_size: int = 8) -> List[str]:
+        processed_texts = [self.preprocessor.preprocess(text) for text in texts]
         
         max_len = max_length or self.max_length
         min_len = min_length or self.min_length
         
-        input_text = f"summarize: {processed_text}"
+        pieces = []
+        with span('abstractive.chunk'):
+            for i, processed_text in enumerate(processed_texts):
+                if len(processed_text.split()) <= max_len:
+                    pieces.append((i, processed_text))
+                else:
+                    pieces.extend((i, chunk) for chunk in self._chunk_text(processed_text, max_chunk_length=1000))
         
         try:
-            inputs = self.tokenizer.encode(
-                input_text,
-                max_length=512,
-                truncation=True,
-                return_tensors="pt"
-            )
-            
-            with torch.no_grad():
-                outputs = self.model.generate(
-                    inputs,
+            with span('abstractive.pipeline_batch'):
+                results = self.summarizer(
+                    [piece for _, piece in pieces],
                     max_length=max_len,
                     min_length=min_len,
-                    length_penalty=2.0,
                     num_beams=num_beams,
                     do_sample=do_sample,
                     no_repeat_ngram_size=no_repeat_ngram_size,
-                    early_stopping=True
+                    batch_size=batch_size
                 )
+        except Exception as e:
+            return [self.summarize(text, max_length=max_length, min_length=min_length, num_beams=num_beams,
+                                   do_sample=do_sample, no_repeat_ngram_size=no_repeat_ngram_size)
+                    for text in texts]
+        
+        summaries = [[] for _ in texts]
+        for (i, _), result in zip(pieces, results):
+            summaries[i].append(result['summary_text'])
+        
+        return [' '.join(parts) for parts in summaries]
+
+class T5Summarizer(AbstractiveSummarizer):
+    def __init__(self, model_name: str = "t5-small", max_length: int = 512, min_length: int = 50,
+                 compiled: bool = False, input_buckets: Tuple[int, ...] = (128, 256, 512),
+                 warmup_num_beams: int = 4, fast_load: bool = None, shared: bool = False):
+        # Compilation patches the model in place, so a compiled summarizer always gets its own copy
+        super().__init__(model_name=model_name, max_length=max_length, min_length=min_length,
+                         fast_load=fast_load, shared=shared and not compiled)
+        self.compiled = False
+        self.input_buckets = tuple(sorted(input_buckets))
+        self.warmup_time = 0.0
+        
+        if compiled:
+            self._compile_generation(warmup_num_beams)
+    
+    def _compile_generation(self, num_beams: int):
+        start_time = time.time()
+        eager_forward = self.model.forward
+        
+        try:
+            self.model.eval()
+            self.model.generation_config.cache_implementation = "static"
+            self.model.forward = torch.compile(eager_forward, dynamic=False)
+            self.compiled = True
             
-            summary = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
+            pad_id = self.tokenizer.pad_token_id or 0
+            for bucket in self.input_buckets:
+                input_ids = torch.full((1, bucket), self.tokenizer.unk_token_id or pad_id, dtype=torch.long)
+                attention_mask = torch.ones_like(input_ids)
+                # The second call runs against an already initialized cache, which is a separate graph
+                for _ in range(2):
+                    self._generate_ids({'input_ids': input_ids, 'attention_mask': attention_mask},
+                                       max_length=self.max_length, min_length=self.min_length,
+                                       num_beams=num_beams, do_sample=False, no_repeat_ngram_size=3)
+        except Exception as e:
+            print(f"Error compiling {self.model_name}: {e}")
+            print("Falling back to eager generation")
+            self.model.forward = eager_forward
+            self.model.generation_config.cache_implementation = None
+            self.compiled = False
+        
+        self.warmup_time = time.time() - start_time
+    
+    def _encode(self, text: str) -> Dict[str, torch.Tensor]:
+        inputs = self.tokenizer(
+            f"summarize: {text}",
+            max_length=512,
+            truncation=True,
+            return_tensors="pt"
+        )
+        
+        if not self.compiled:
+            return {'input_ids': inputs['input_ids'], 'attention_mask': inputs['attention_mask']}
+        
+        length = inputs['input_ids'].shape[-1]
+        bucket = next((b for b in self.input_buckets if b >= length), self.input_buckets[-1])
+        pad = bucket - length
+        
+        return {
+            'input_ids': torch.nn.functional.pad(inputs['input_ids'][:, :bucket], (0, max(pad, 0)),
+                                                 value=self.tokenizer.pad_token_id or 0),
+            'attention_mask': torch.nn.functional.pad(inputs['attention_mask'][:, :bucket], (0, max(pad, 0)),
+                                                      value=0)
+        }
+    
+    def _generate_ids(self, inputs: Dict[str, torch.Tensor], max_length: int, min_length: int,
+                      num_beams: int, do_sample: bool, no_repeat_ngram_size: int) -> torch.Tensor:
+        with torch.no_grad():
+            return self.model.generate(
+                **inputs,
+                max_length=max_length,
+                min_length=min_length,
+                length_penalty=2.0,
+                num_beams=num_beams,
+                do_sample=do_sample,
+                no_repeat_ngram_size=no_repeat_ngram_size,
+                early_stopping=True
+            )
+    
+    def summarize(self, text: str, max_length: int = None, min_length: int = None,
+                  num_beams: int = 4, do_sample: bool = False,
+                  no_repeat_ngram_size: int = 3) -> str:
+        processed_text = self.preprocessor.preprocess(text)
+        
+        max_len = max_length or self.max_length
+        min_len = min_length or self.min_length
+        
+        try:
+            with span('t5.tokenize'):
+                inputs = self._encode(processed_text)
+            with span('t5.generate'):
+                outputs = self._generate_ids(inputs, max_len, min_len, num_beams, do_sample, no_repeat_ngram_size)
+            
+            with span('t5.decode'):
+                summary = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
             return summary
         except Exception as e:
             return processed_text[:500]
-
+    
+    def summarize_batch(self, texts: List[str], max_length: int = None, min_length: int = None,
+                        num_beams: int = 4, do_sample: bool = False,
+                        no_repeat_ngram_size: int = 3, batch_size: int = 8) -> List[str]:
+        if self.compiled:
+            return [self.summarize(text, max_length=max_length, min_length=min_length, num_beams=num_beams,
+                                   do_sample=do_sample, no_repeat_ngram_size=no_repeat_ngram_size)
+                    for text in texts]
+        
+        processed_texts = [self.preprocessor.preprocess(text) for text in texts]
+        
+        max_len = max_length or self.max_length
+        min_len = min_length or self.min_length
+        
+        summaries = []
+        for start in range(0, len(processed_texts), batch_size):
+            batch = processed_texts[start:start + batch_size]
+            try:
+                with span('t5.tokenize_batch'):
+                    inputs = self.tokenizer(
+                        [f"summarize: {text}" for text in batch],
+                        max_length=512,
+                        truncation=True,
+                        padding=True,
+                        return_tensors="pt"
+                    )
+                with span('t5.generate_batch'):
+                    outputs = self._generate_ids(
+                        {'input_ids': inputs['input_ids'], 'attention_mask': inputs['attention_mask']},
+                        max_len, min_len, num_beams, do_sample, no_repeat_ngram_size
+                    )
+                with span('t5.decode_batch'):
+                    summaries.extend(self.tokenizer.batch_decode(outputs, skip_special_tokens=True))
+            except Exception as e:
+                summaries.extend(text[:500] for text in batch)
+        
+        return summaries
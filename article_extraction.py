@@ -0,0 +1,181 @@
+import threading
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+import bs4
+from bs4.dammit import EncodingDetector, UnicodeDammit
+
+try:
+    from lxml import etree
+    from lxml.html import HTMLParser
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+# Cached parse results are keyed on these, so upgrading a parser does not reuse its old output
+PARSER_VERSIONS = {'lxml': etree.__version__ if HAS_LXML else None, 'bs4': bs4.__version__}
+
+# Same rules as NewsCollector._parse_*_article, as XPath. A class regex in BeautifulSoup matches any
+# class token containing the pattern, which contains(@class, ...) reproduces for patterns without spaces.
+EXTRACTION_RULES = {
+    'bbc': {
+        'name': 'BBC',
+        'title': ["//h1"],
+        'body': ["//article", "//div[@data-component='text-block']",
+                 "//div[contains(@class, 'story-body') or contains(@class, 'article-body')]"],
+        'paragraphs': ".//*[self::p or self::div][contains(@class, 'paragraph') or contains(@class, 'text')]",
+        'min_paragraph': 20,
+        'fallbacks': [("//p", 50)]
+    },
+    'guardian': {
+        'name': 'Guardian',
+        'title': ["//h1"],
+        'body': ["//div[@data-gu-name='body']", "//div[contains(@class, 'article-body')]"],
+        'paragraphs': ".//p",
+        'min_paragraph': 20,
+        'fallbacks': [("//p[contains(@class, 'paragraph')]", 50)]
+    },
+    'fox': {
+        'name': 'Fox News',
+        'title': ["//h1", "//h2[contains(@class, 'headline')]"],
+        'body': ["//div[contains(@class, 'article-body') or contains(@class, 'entry-content') "
+                 "or contains(@class, 'article-text')]"],
+        'paragraphs': ".//p",
+        'min_paragraph': 20,
+        'fallbacks': [("//p[contains(@class, 'speakable') or contains(@class, 'paragraph')]", 50), ("//p", 100)]
+    }
+}
+
+# BeautifulSoup's get_text leaves out comments and the contents of these tags
+SKIPPED_TAGS = {'script', 'style', 'template'}
+
+_local = threading.local()
+
+def _parser(encoding: str):
+    parsers = getattr(_local, 'parsers', None)
+    if parsers is None:
+        parsers = _local.parsers = {}
+    if encoding not in parsers:
+        parsers[encoding] = HTMLParser(encoding=encoding)
+    return parsers[encoding]
+
+def detect_encoding(content: bytes) -> str:
+    declared = EncodingDetector.find_declared_encoding(content, is_html=True)
+    if declared:
+        return declared
+    try:
+        content.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return UnicodeDammit(content, is_html=True).original_encoding or 'windows-1252'
+
+def parse_html(content: bytes):
+    try:
+        return etree.fromstring(content, _parser(detect_encoding(content)))
+    except (etree.LxmlError, LookupError, ValueError):
+        return None
+
+def _append_stripped(parts: List[str], text: Optional[str]):
+    if text:
+        text = text.strip()
+        if text:
+            parts.append(text)
+
+def _collect_text(element, parts: List[str]):
+    _append_stripped(parts, element.text)
+    for child in element:
+        if isinstance(child.tag, str):
+            if child.tag not in SKIPPED_TAGS:
+                _collect_text(child, parts)
+        elif child.tag is etree.Comment and child.text and child.text.startswith('[CDATA[') and child.text.endswith(']]'):
+            # libxml2 reads <![CDATA[...]]> in HTML as a comment; BeautifulSoup keeps it as text
+            _append_stripped(parts, child.text[7:-2])
+        _append_stripped(parts, child.tail)
+
+def element_text(element) -> str:
+    # Equivalent of BeautifulSoup's get_text(strip=True)
+    parts = []
+    _collect_text(element, parts)
+    return ''.join(parts)
+
+def _first(root, queries):
+    for query in queries:
+        found = query(root)
+        if found:
+            return found[0]
+    return None
+
+class ArticleExtractor:
+    def __init__(self, key: str):
+        rules = EXTRACTION_RULES[key]
+        self.name = rules['name']
+        self.title = [etree.XPath(query) for query in rules['title']]
+        self.body = [etree.XPath(query) for query in rules['body']]
+        self.paragraphs = etree.XPath(rules['paragraphs'])
+        self.min_paragraph = rules['min_paragraph']
+        self.fallbacks = [(etree.XPath(query), min_length) for query, min_length in rules['fallbacks']]
+    
+    def _texts(self, elements, min_length: int) -> List[str]:
+        texts = []
+        for element in elements:
+            text = element_text(element)
+            if len(text) > min_length:
+                texts.append(text)
+        return texts
+    
+    def extract(self, content: bytes, url: str) -> Optional[Dict]:
+        root = parse_html(content)
+        if root is None:
+            return None
+        
+        title_elem = _first(root, self.title)
+        title = element_text(title_elem) if title_elem is not None else ""
+        
+        article_body = _first(root, self.body)
+        paragraphs = self._texts(self.paragraphs(article_body), self.min_paragraph) if article_body is not None else []
+        
+        for query, min_length in self.fallbacks:
+            if paragraphs:
+                break
+            paragraphs = self._texts(query(root), min_length)
+        
+        text = ' '.join(paragraphs)
+        
+        if len(text) < 200:
+            return None
+        
+        return {
+            'title': title,
+            'text': text,
+            'url': url,
+            'source': self.name
+        }
+
+class LinkExtractor:
+    def __init__(self):
+        self.anchors = etree.XPath("//a[@href]")
+    
+    def extract(self, content: bytes, url: str, link_pattern: str, min_link_length: int) -> List[str]:
+        root = parse_html(content)
+        if root is None:
+            return []
+        
+        links = set()
+        for anchor in self.anchors(root):
+            href = anchor.get('href')
+            if href and link_pattern in href and href.startswith('/') and len(href) > min_link_length:
+                links.add(urljoin(url, href))
+        return sorted(links)
+
+def _extractors() -> Dict:
+    # Compiled XPath objects and parsers are kept per thread rather than shared between fetch workers
+    extractors = getattr(_local, 'extractors', None)
+    if extractors is None:
+        extractors = _local.extractors = {key: ArticleExtractor(key) for key in EXTRACTION_RULES}
+        extractors['links'] = LinkExtractor()
+    return extractors
+
+def extract_article(key: str, content: bytes, url: str) -> Optional[Dict]:
+    return _extractors()[key].extract(content, url)
+
+def extract_links(content: bytes, url: str, link_pattern: str, min_link_length: int) -> List[str]:
+    return _extractors()['links'].extract(content, url, link_pattern, min_link_length)
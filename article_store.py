@@ -0,0 +1,158 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from article_stream import iter_articles
+
+DEFAULT_STORE_PATH = "data/articles.jsonl"
+
+TRACKING_PARAMS = {'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'mc_cid', 'mc_eid', 'ocid', 'cmp', 'cmpid',
+                   'intcmp', 'ito', 'ref', 'ref_src', 'taid', '_ga', '_gl', 'igshid'}
+TRACKING_PREFIXES = ('utm_', 'at_', 'ns_', 'pk_', 'mtm_', 'hsa_')
+
+def canonicalize_url(url: str) -> str:
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    port = parts.port
+    if port and not ((scheme == 'http' and port == 80) or (scheme == 'https' and port == 443)):
+        host = f"{host}:{port}"
+    
+    path = parts.path or '/'
+    if len(path) > 1 and path.endswith('/'):
+        path = path.rstrip('/') or '/'
+    
+    query = [(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+             if name.lower() not in TRACKING_PARAMS and not name.lower().startswith(TRACKING_PREFIXES)]
+    return urlunsplit((scheme, host, path, urlencode(sorted(query)), ''))
+
+class ArticleStore:
+    def __init__(self, path: str = DEFAULT_STORE_PATH, index_path: str = None):
+        self.path = path
+        self.index_path = index_path or os.path.splitext(path)[0] + '.index.sqlite'
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(self.index_path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS articles (
+                url TEXT PRIMARY KEY,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                source TEXT,
+                added_at REAL NOT NULL
+            )""")
+        self.db.commit()
+        self.file = open(path, 'ab')
+        self._recover()
+    
+    def _recover(self):
+        # Index anything appended after the last commit (e.g. the process died between the write and the
+        # commit) and drop a trailing partial line, so the file and the index always agree. If the file was
+        # truncated or replaced, the last indexed line no longer matches and the index is rebuilt from scratch.
+        file_size = os.path.getsize(self.path)
+        last = self.db.execute("SELECT url, offset, length FROM articles ORDER BY offset DESC LIMIT 1").fetchone()
+        indexed_end = last[1] + last[2] if last else 0
+        if last and not self._line_matches(*last, file_size):
+            print(f"{self.index_path} does not match {self.path}, rebuilding the index")
+            self.db.execute("DELETE FROM articles")
+            self.db.commit()
+            indexed_end = 0
+        if file_size <= indexed_end:
+            return
+        
+        rows = []
+        valid_end = indexed_end
+        with open(self.path, 'rb') as f:
+            f.seek(indexed_end)
+            offset = indexed_end
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    article = json.loads(line)
+                    rows.append((canonicalize_url(article['url']), offset, len(line), article.get('source'), time.time()))
+                except (ValueError, KeyError, TypeError):
+                    pass
+                offset += len(line)
+                valid_end = offset
+        
+        if valid_end < file_size:
+            self.file.truncate(valid_end)
+            self.file.seek(valid_end)
+        self.db.executemany("INSERT OR IGNORE INTO articles VALUES (?, ?, ?, ?, ?)", rows)
+        self.db.commit()
+    
+    def _line_matches(self, url: str, offset: int, length: int, file_size: int) -> bool:
+        if offset + length > file_size:
+            return False
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            line = f.read(length)
+        try:
+            return line.endswith(b'\n') and canonicalize_url(json.loads(line)['url']) == url
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return False
+    
+    def __contains__(self, url: str) -> bool:
+        return self.contains(url)
+    
+    def __len__(self) -> int:
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+    
+    def contains(self, url: str) -> bool:
+        with self.lock:
+            return self.db.execute("SELECT 1 FROM articles WHERE url = ?",
+                                   (canonicalize_url(url),)).fetchone() is not None
+    
+    def add(self, article: Dict) -> bool:
+        return self.add_many([article]) == 1
+    
+    def add_many(self, articles: Iterable[Dict]) -> int:
+        added = 0
+        with self.lock:
+            for article in articles:
+                url = canonicalize_url(article['url'])
+                if self.db.execute("SELECT 1 FROM articles WHERE url = ?", (url,)).fetchone() is not None:
+                    continue
+                
+                # The canonical URL is only the dedup key; the article keeps the URL it was fetched from
+                line = (json.dumps(article, ensure_ascii=False) + '\n').encode('utf-8')
+                offset = self.file.tell()
+                self.file.write(line)
+                self.db.execute("INSERT INTO articles VALUES (?, ?, ?, ?, ?)",
+                                (url, offset, len(line), article.get('source'), time.time()))
+                added += 1
+            
+            if added:
+                self.file.flush()
+                self.db.commit()
+        return added
+    
+    def get(self, url: str) -> Optional[Dict]:
+        with self.lock:
+            row = self.db.execute("SELECT offset, length FROM articles WHERE url = ?",
+                                  (canonicalize_url(url),)).fetchone()
+        if row is None:
+            return None
+        with open(self.path, 'rb') as f:
+            f.seek(row[0])
+            return json.loads(f.read(row[1]))
+    
+    def urls(self) -> List[str]:
+        with self.lock:
+            return [row[0] for row in self.db.execute("SELECT url FROM articles ORDER BY offset")]
+    
+    def iter_articles(self, num_samples: int = None) -> Iterator[Dict]:
+        self.file.flush()
+        return iter_articles(self.path, num_samples=num_samples)
+    
+    def close(self):
+        with self.lock:
+            self.file.close()
+            self.db.close()
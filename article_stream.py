@@ -0,0 +1,105 @@
+import json
+import os
+from itertools import islice
+from typing import Dict, Iterator, List, Tuple
+
+def detect_format(path: str) -> str:
+    if path.endswith('.jsonl'):
+        return 'jsonl'
+    
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(4096)
+            if not chunk:
+                return 'jsonl'
+            stripped = chunk.lstrip()
+            if stripped:
+                return 'json' if stripped[:1] == b'[' else 'jsonl'
+
+def shard_byte_ranges(path: str, num_shards: int) -> List[Tuple[int, int]]:
+    size = os.path.getsize(path)
+    return [(size * i // num_shards, size * (i + 1) // num_shards) for i in range(num_shards)]
+
+def iter_jsonl(path: str, start: int = 0, end: int = None) -> Iterator[Dict]:
+    with open(path, 'rb') as f:
+        if start > 0:
+            f.seek(start - 1)
+            f.readline()
+        
+        while end is None or f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            if line.strip():
+                yield json.loads(line)
+
+def iter_json_array(path: str, chunk_size: int = 1 << 16) -> Iterator[Dict]:
+    decoder = json.JSONDecoder()
+    
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = ''
+        position = 0
+        eof = False
+        started = False
+        read_size = chunk_size
+        
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            
+            if position >= len(buffer):
+                if eof:
+                    return
+                buffer = f.read(read_size)
+                position = 0
+                eof = not buffer
+                continue
+            
+            if not started:
+                if buffer[position] != '[':
+                    raise ValueError(f"{path} is not a JSON array")
+                started = True
+                position += 1
+                continue
+            
+            if buffer[position] == ']':
+                return
+            
+            try:
+                article, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                more = f.read(read_size)
+                eof = not more
+                buffer = buffer[position:] + more
+                position = 0
+                read_size *= 2
+                continue
+            
+            read_size = chunk_size
+            yield article
+            
+            if position > chunk_size:
+                buffer = buffer[position:]
+                position = 0
+
+def iter_articles(path: str, num_samples: int = None, shard_index: int = 0,
+                  num_shards: int = 1) -> Iterator[Dict]:
+    if detect_format(path) == 'jsonl':
+        start, end = shard_byte_ranges(path, num_shards)[shard_index]
+        articles = iter_jsonl(path, start, end)
+    else:
+        articles = iter_json_array(path)
+        if num_shards > 1:
+            articles = islice(articles, shard_index, None, num_shards)
+    
+    return islice(articles, num_samples) if num_samples else articles
+
+def convert_to_jsonl(input_path: str, output_path: str) -> int:
+    count = 0
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for article in iter_articles(input_path):
+            f.write(json.dumps(article, ensure_ascii=False) + '\n')
+            count += 1
+    return count
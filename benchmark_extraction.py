@@ -0,0 +1,127 @@
+import os
+import json
+import time
+import argparse
+from typing import Dict, List, Tuple
+from data_collector import NewsCollector
+from fixture_server import FixtureSite, SOURCE_LAYOUT
+from article_extraction import extract_article, extract_links
+
+PARAGRAPH = ("Officials confirmed the plan on Tuesday after months of talks, while residents welcomed "
+             "the decision &amp; campaigners said more work was needed.")
+
+# Pages that miss the usual containers, so each parser's fallbacks and get_text edge cases are covered
+EDGE_CASES = {
+    'bbc': [
+        '<html><body><h1> Fallback <b>title</b></h1>' + ''.join(f'<p>{PARAGRAPH} {i}</p>' for i in range(4)) +
+        '<p>short</p></body></html>',
+        '<html><body><div class="story-body"><div class="text-wrapper"><p class="paragraph">' + PARAGRAPH +
+        '<!-- hidden --><script>var x = 1;</script> tail</p></div>' +
+        ''.join(f'<div class="rich-text">{PARAGRAPH} {i}<br/>line</div>' for i in range(3)) + '</div></body></html>',
+    ],
+    'guardian': [
+        '<html><body><h1>Guardian fallback</h1>' +
+        ''.join(f'<p class="dcr-paragraph">{PARAGRAPH} <i>{i}</i></p>' for i in range(3)) + '</body></html>',
+        '<html><body><div class="content article-body"><p>' + PARAGRAPH + '<![CDATA[ raw ]]></p>' +
+        ''.join(f'<p>&nbsp;{PARAGRAPH} {i}&nbsp;</p>' for i in range(3)) + '<p></p></div></body></html>',
+    ],
+    'fox': [
+        '<html><body><h2 class="main headline">Fox <span>headline</span></h2>' +
+        ''.join(f'<p class="speakable">{PARAGRAPH} {i}</p>' for i in range(3)) + '</body></html>',
+        '<html><body><h1>Long paragraphs only</h1>' +
+        ''.join(f'<p>{PARAGRAPH} {PARAGRAPH} {i}</p><p>Too short to keep.</p>' for i in range(3)) + '</body></html>',
+    ]
+}
+
+def save_fixture_pages(directory: str, articles_per_source: int, seed: int = 0):
+    site = FixtureSite('https://fixtures.example', articles_per_source, seed)
+    for key in SOURCE_LAYOUT:
+        os.makedirs(os.path.join(directory, key), exist_ok=True)
+    
+    for path, (content_type, body, _, _) in site.pages.items():
+        key = path.split('/')[1]
+        kind = 'article' if path in site.article_paths() else 'page'
+        if 'html' not in content_type:
+            continue
+        name = f"{kind}-{path.strip('/').replace('/', '_')}.html"
+        with open(os.path.join(directory, key, name), 'wb') as f:
+            f.write(body)
+    
+    for key, pages in EDGE_CASES.items():
+        for i, page in enumerate(pages):
+            with open(os.path.join(directory, key, f"article-edge-{i}.html"), 'w', encoding='utf-8') as f:
+                f.write(page)
+
+def load_pages(directory: str) -> List[Tuple[str, str, str, bytes]]:
+    pages = []
+    for key in sorted(SOURCE_LAYOUT):
+        source_dir = os.path.join(directory, key)
+        if not os.path.isdir(source_dir):
+            continue
+        for name in sorted(os.listdir(source_dir)):
+            with open(os.path.join(source_dir, name), 'rb') as f:
+                kind = 'article' if name.startswith('article-') else 'page'
+                pages.append((key, kind, f"https://fixtures.example/{key}/{name}", f.read()))
+    return pages
+
+def run_backend(pages: List[Tuple[str, str, str, bytes]], parse_article, parse_links, repeats: int) -> Tuple[float, List]:
+    outputs = []
+    start_time = time.perf_counter()
+    for repeat in range(repeats):
+        outputs = []
+        for key, kind, url, content in pages:
+            if kind == 'article':
+                outputs.append(parse_article(key, content, url))
+            else:
+                layout = SOURCE_LAYOUT[key]
+                outputs.append(parse_links(content, url, layout['link_pattern'], layout['min_link_length']))
+    return (time.perf_counter() - start_time) / repeats, outputs
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark article extraction backends on saved pages')
+    parser.add_argument('--pages-dir', type=str, default='results/extraction_fixtures',
+                        help='Directory with <source>/article-*.html pages (generated if missing)')
+    parser.add_argument('--articles-per-source', type=int, default=100, help='Fixture articles to generate')
+    parser.add_argument('--repeats', type=int, default=3, help='Timed passes over all pages')
+    parser.add_argument('--output', type=str, default='results/benchmark_extraction.json',
+                        help='Where to write benchmark results')
+    
+    args = parser.parse_args()
+    
+    if not os.path.isdir(args.pages_dir):
+        print(f"Saving fixture pages to {args.pages_dir}")
+        save_fixture_pages(args.pages_dir, args.articles_per_source)
+    
+    pages = load_pages(args.pages_dir)
+    total_bytes = sum(len(page[3]) for page in pages)
+    print(f"Loaded {len(pages)} pages ({total_bytes / 2**20:.1f} MiB)")
+    
+    collector = NewsCollector(output_dir=args.pages_dir, parser_backend='bs4')
+    collector.close()
+    reference_article = lambda key, content, url: collector.parsers[key](content, url)
+    
+    results = {'pages': len(pages), 'bytes': total_bytes}
+    results['bs4'], expected = run_backend(pages, reference_article, collector._parse_category_links, args.repeats)
+    results['lxml'], outputs = run_backend(pages, extract_article, extract_links, args.repeats)
+    
+    mismatches = [page[2] for page, want, got in zip(pages, expected, outputs) if want != got]
+    results['mismatches'] = len(mismatches)
+    results['mismatched_pages'] = mismatches[:20]
+    results['extracted_articles'] = sum(1 for page, out in zip(pages, expected) if page[1] == 'article' and out)
+    results['speedup'] = results['bs4'] / results['lxml']
+    
+    print(f"BeautifulSoup html.parser: {results['bs4']:.3f}s ({len(pages) / results['bs4']:.0f} pages/s)")
+    print(f"lxml + compiled XPath:     {results['lxml']:.3f}s ({len(pages) / results['lxml']:.0f} pages/s, "
+          f"{results['speedup']:.1f}x)")
+    print(f"Articles extracted:        {results['extracted_articles']}")
+    print(f"Output mismatches:         {results['mismatches']}")
+    for url in mismatches[:5]:
+        print(f"  {url}")
+    
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import json
+import os
+import time
+import argparse
+import multiprocessing
+from typing import Dict, List
+from memory_profiling import current_rss, peak_rss
+
+LOADERS = ['standard', 'fast']
+
+def _smaps_rollup() -> Dict[str, int]:
+    # Pss splits shared pages between the processes mapping them, so summing it across workers is honest
+    fields = {}
+    try:
+        with open('/proc/self/smaps_rollup', 'r') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == 'kB':
+                    fields[parts[0].rstrip(':')] = int(parts[1]) * 1024
+    except OSError:
+        pass
+    return fields
+
+def _load_worker(model_name: str, loader: str, barrier, results):
+    import_start = time.perf_counter()
+    from abstractive_summarizer import AbstractiveSummarizer
+    import torch
+    start_time = time.perf_counter()
+    baseline_rss = current_rss()
+    summarizer = AbstractiveSummarizer(model_name=model_name, fast_load=(loader == 'fast'))
+    load_time = time.perf_counter() - start_time
+    
+    # Touch every weight, as the first forward pass would
+    with torch.no_grad():
+        checksum = float(sum(p.sum() for p in summarizer.model.parameters()))
+    ready_time = time.perf_counter() - start_time
+    
+    # Measured while every worker is alive, so shared pages are counted once across them
+    barrier.wait()
+    smaps = _smaps_rollup()
+    results.put({
+        'model': summarizer.model_name,
+        'import_time': start_time - import_start,
+        'load_time': load_time,
+        'ready_time': ready_time,
+        'baseline_rss': baseline_rss,
+        'peak_rss': peak_rss(),
+        'rss': smaps.get('Rss', current_rss()),
+        'pss': smaps.get('Pss', -1),
+        'private': smaps.get('Private_Clean', 0) + smaps.get('Private_Dirty', 0),
+        'checksum': checksum
+    })
+    barrier.wait()
+
+def run_loader(model_name: str, loader: str, num_workers: int) -> Dict:
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(num_workers)
+    results = context.Queue()
+    workers = [context.Process(target=_load_worker, args=(model_name, loader, barrier, results))
+               for _ in range(num_workers)]
+    for worker in workers:
+        worker.start()
+    stats = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    
+    mb = 1024 ** 2
+    return {
+        'loader': loader,
+        'num_workers': num_workers,
+        'model': stats[0]['model'],
+        'load_time': max(s['load_time'] for s in stats),
+        'ready_time': max(s['ready_time'] for s in stats),
+        'peak_rss_mb': max(s['peak_rss'] - s['baseline_rss'] for s in stats) / mb,
+        'total_pss_mb': sum(s['pss'] for s in stats) / mb,
+        'total_private_mb': sum(s['private'] for s in stats) / mb,
+        'checksum': stats[0]['checksum']
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare cold-start time and memory of the model loaders')
+    parser.add_argument('--model', type=str, default='facebook/bart-large-cnn', help='Checkpoint to load')
+    parser.add_argument('--workers', type=str, default='1,4', help='Comma-separated worker counts')
+    parser.add_argument('--output', type=str, default='results/benchmark_model_loading.json',
+                        help='Where to write benchmark results')
+    
+    args = parser.parse_args()
+    
+    # The first fast load may convert the checkpoint; do it up front so it is not timed as a cold start
+    from model_loading import safetensors_path
+    start_time = time.perf_counter()
+    path = safetensors_path(args.model)
+    print(f"Safetensors checkpoint: {path} ({time.perf_counter() - start_time:.2f}s to resolve / convert)")
+    
+    results: List[Dict] = []
+    for num_workers in [int(n) for n in args.workers.split(',') if n.strip()]:
+        for loader in LOADERS:
+            print(f"Loading {args.model} with the {loader} loader in {num_workers} worker(s)...")
+            results.append(run_loader(args.model, loader, num_workers))
+    
+    print("\n" + "="*50)
+    print("MODEL LOADING BENCHMARK")
+    print("="*50)
+    for stats in results:
+        print(f"{stats['loader']:9s} x{stats['num_workers']}: load {stats['load_time']:.2f}s, "
+              f"ready {stats['ready_time']:.2f}s, peak RSS +{stats['peak_rss_mb']:.0f} MB per worker, "
+              f"total PSS {stats['total_pss_mb']:.0f} MB, private {stats['total_private_mb']:.0f} MB")
+    
+    checksums = {round(stats['checksum'], 3) for stats in results}
+    print(f"\nWeights {'match' if len(checksums) == 1 else 'DIFFER'} across loaders")
+    
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    
+    print(f"\nResults saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import json
+import os
+import time
+import random
+import argparse
+from typing import List, Tuple
+from rouge_score import rouge_scorer
+from evaluation import RougeEvaluator
+import fast_lcs
+
+WORDS = ("government minister said report election market economy police court health "
+         "officials announced investigation company shares rising falling climate energy "
+         "prices workers strike hospital patients school students council plans growth "
+         "security forces attack border talks agreement leaders summit votes campaign").split()
+
+def make_text(rng: random.Random, num_sentences: int) -> str:
+    sentences = []
+    for _ in range(num_sentences):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(8, 25))]
+        sentences.append(' '.join(words).capitalize() + '.')
+    return ' '.join(sentences)
+
+def make_cases(num_articles: int, num_candidates: int, seed: int = 0) -> List[Tuple[str, List[str]]]:
+    rng = random.Random(seed)
+    cases = []
+    for _ in range(num_articles):
+        reference = make_text(rng, 3)
+        candidates = [make_text(rng, rng.randint(2, 6)) for _ in range(num_candidates)]
+        cases.append((reference, candidates))
+    return cases
+
+def check_parity(evaluator: RougeEvaluator, cases: List[Tuple[str, List[str]]]) -> int:
+    rouge_types = ['rouge1', 'rouge2', 'rougeL', 'rougeLsum'] if evaluator.use_lsum else ['rouge1', 'rouge2', 'rougeL']
+    scorer = rouge_scorer.RougeScorer(rouge_types, use_stemmer=True, split_summaries=evaluator.split_summaries)
+    mismatches = 0
+    for reference, candidates in cases:
+        for candidate, scores in zip(candidates, evaluator.evaluate_many(reference, candidates)):
+            expected = evaluator._format_scores(scorer.score(reference, candidate))
+            if expected != scores:
+                mismatches += 1
+    return mismatches
+
+def benchmark_long_lcs(num_pairs: int, reference_sentences: int, candidate_sentences: int) -> dict:
+    rng = random.Random(1)
+    tokenizer = RougeEvaluator().tokenizer
+    pairs = []
+    for _ in range(num_pairs):
+        reference = make_text(rng, reference_sentences)
+        candidate = make_text(rng, candidate_sentences)
+        pairs.append((tokenizer.tokenize(reference), tokenizer.tokenize(candidate),
+                      [tokenizer.tokenize(s) for s in reference.split('. ')],
+                      [tokenizer.tokenize(s) for s in candidate.split('. ')]))
+    
+    results = {'num_pairs': num_pairs,
+               'avg_reference_tokens': sum(len(p[0]) for p in pairs) / num_pairs,
+               'avg_candidate_tokens': sum(len(p[1]) for p in pairs) / num_pairs}
+    mismatches = 0
+    
+    for name, dp_fn, fast_fn, args in [
+        ('rougeL', rouge_scorer._score_lcs, fast_lcs.score_lcs, lambda p: (p[0], p[1])),
+        ('rougeLsum', rouge_scorer._summary_level_lcs, fast_lcs.summary_level_lcs, lambda p: (p[2], p[3])),
+    ]:
+        start_time = time.perf_counter()
+        expected = [dp_fn(*args(p)) for p in pairs]
+        dp_time = time.perf_counter() - start_time
+        
+        start_time = time.perf_counter()
+        actual = [fast_fn(*args(p)) for p in pairs]
+        fast_time = time.perf_counter() - start_time
+        
+        mismatches += sum(1 for a, b in zip(expected, actual) if a != b)
+        results[name] = {'dynamic_programming': dp_time, 'bit_parallel': fast_time,
+                         'speedup': dp_time / fast_time}
+    
+    results['mismatches'] = mismatches
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark ROUGE scoring paths')
+    parser.add_argument('--num-articles', type=int, default=500, help='Number of synthetic references')
+    parser.add_argument('--num-candidates', type=int, default=5, help='Candidates per reference')
+    parser.add_argument('--num-long', type=int, default=20, help='Number of long pairs for the LCS benchmark')
+    parser.add_argument('--long-reference-sentences', type=int, default=60,
+                        help='Sentences per long reference')
+    parser.add_argument('--long-candidate-sentences', type=int, default=120,
+                        help='Sentences per long candidate (concatenated chunk summaries)')
+    parser.add_argument('--output', type=str, default='results/benchmark_rouge.json',
+                        help='Where to write benchmark results')
+    
+    args = parser.parse_args()
+    
+    cases = make_cases(args.num_articles, args.num_candidates)
+    results = {}
+    
+    scorer = rouge_scorer.RougeScorer(['rouge1', 'rouge2', 'rougeL'], use_stemmer=True)
+    start_time = time.perf_counter()
+    for reference, candidates in cases:
+        for candidate in candidates:
+            scorer.score(reference, candidate)
+    results['rouge_scorer'] = time.perf_counter() - start_time
+    
+    evaluator = RougeEvaluator()
+    start_time = time.perf_counter()
+    for reference, candidates in cases:
+        evaluator.evaluate_many(reference, candidates)
+    results['evaluate_many'] = time.perf_counter() - start_time
+    
+    results['mismatches'] = (check_parity(RougeEvaluator(), cases) +
+                             check_parity(RougeEvaluator(use_lsum=True), cases[:100]) +
+                             check_parity(RougeEvaluator(use_lsum=True, split_summaries=True), cases[:100]))
+    results['speedup'] = results['rouge_scorer'] / results['evaluate_many']
+    
+    print(f"rouge_scorer.RougeScorer: {results['rouge_scorer']:.3f}s")
+    print(f"evaluate_many:            {results['evaluate_many']:.3f}s ({results['speedup']:.2f}x)")
+    print(f"Score mismatches:         {results['mismatches']}")
+    
+    results['long_lcs'] = benchmark_long_lcs(args.num_long, args.long_reference_sentences,
+                                             args.long_candidate_sentences)
+    long_lcs = results['long_lcs']
+    print(f"\nLong pairs: {long_lcs['avg_reference_tokens']:.0f} reference tokens, "
+          f"{long_lcs['avg_candidate_tokens']:.0f} candidate tokens")
+    for name in ['rougeL', 'rougeLsum']:
+        print(f"{name:10s}: DP {long_lcs[name]['dynamic_programming']:.3f}s, "
+              f"bit-parallel {long_lcs[name]['bit_parallel']:.3f}s ({long_lcs[name]['speedup']:.1f}x)")
+    print(f"LCS mismatches: {long_lcs['mismatches']}")
+    
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    
+    print(f"\nResults saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import json
+import os
+import time
+import random
+import argparse
+from typing import Dict, List, Set, Tuple
+from article_stream import iter_articles
+from benchmark_suite import NewsArticleGenerator, PLACES
+from preprocessing import TextPreprocessor
+from sentence_segmenter import PunktSegmenter, RegexSegmenter
+
+# News sentences with abbreviations, initials, decimals and quotes; each entry is one sentence
+HARD_SENTENCES = [
+    "Mr. {name} told reporters in {place} that the deal was done.",
+    "Dr. {name} and Prof. {name2} published the study on Jan. 12 in a peer-reviewed journal.",
+    "Shares of Acme Inc. rose 3.5% to $12.40 in early trading.",
+    "The meeting ended at 4 p.m. on Friday without an agreement.",
+    "J. R. {name} said the plan had been delayed again.",
+    "\"Why now?\" asked one resident who had lived there for decades.",
+    "\"We are not done yet!\" she said, before leaving the stage.",
+    "The U.S. economy grew by 2.1 per cent in the last quarter.",
+    "Officials in Washington, D.C. declined to comment on the report.",
+    "Sen. {name} called the vote \"a disgrace.\"",
+    "The company, which moved to 12 Main St. last year, employs 40 people.",
+    "Revenue at Globex Corp. fell to $1.2 billion, analysts said.",
+    "Gov. {name} signed the bill (the third this year.)",
+    "It was, in the words of one official, \"far from over.\"",
+    "The rate will rise to 5.25% from 5.0%, the central bank said.",
+    "Gen. {name} inspected the troops at Fort Bragg on Sept. 3.",
+    "The contract went to Initech Ltd.",
+    "Talks will resume next week in Washington, D.C.",
+    "{name} has lived in the U.S.",
+    "The vote is scheduled for 10 a.m.",
+    "It was, she said, a long wait...",
+]
+NAMES = ['Smith', 'Okafor', 'Nguyen', 'Garcia', 'Kowalski', 'Haddad', 'Larsen', 'Tanaka']
+
+def make_corpus(num_articles: int, hard_fraction: float = 0.4, seed: int = 0) -> List[Tuple[str, List[int]]]:
+    # Returns (text, planted sentence boundaries) pairs
+    generator = NewsArticleGenerator(seed)
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(num_articles):
+        sentences = []
+        for _ in range(rng.randint(8, 40)):
+            if rng.random() < hard_fraction:
+                sentences.append(rng.choice(HARD_SENTENCES).format(
+                    name=rng.choice(NAMES), name2=rng.choice(NAMES), place=rng.choice(PLACES)))
+            else:
+                sentences.append(generator.sentence(rng))
+        boundaries, position = [], 0
+        for sentence in sentences[:-1]:
+            position += len(sentence)
+            boundaries.append(position)
+            position += 1
+        corpus.append((' '.join(sentences), boundaries))
+    return corpus
+
+def boundary_metrics(predicted: List[Set[int]], expected: List[Set[int]]) -> Dict:
+    true_positives = sum(len(p & e) for p, e in zip(predicted, expected))
+    num_predicted = sum(len(p) for p in predicted)
+    num_expected = sum(len(e) for e in expected)
+    precision = true_positives / num_predicted if num_predicted else 1.0
+    recall = true_positives / num_expected if num_expected else 1.0
+    return {
+        'precision': precision,
+        'recall': recall,
+        'f1': 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+        'exact_documents': sum(p == e for p, e in zip(predicted, expected)) / max(len(expected), 1)
+    }
+
+def throughput(preprocessor: TextPreprocessor, texts: List[str], repeats: int) -> Dict:
+    num_chars = sum(len(text) for text in texts)
+    start_time = time.perf_counter()
+    for _ in range(repeats):
+        for text in texts:
+            preprocessor.segment_sentences(text)
+    elapsed = (time.perf_counter() - start_time) / repeats
+    return {'seconds': elapsed, 'docs_per_s': len(texts) / elapsed, 'mb_per_s': num_chars / elapsed / 1e6}
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the regex sentence segmenter with punkt')
+    parser.add_argument('--data', type=str, default=None, help='Articles JSON / JSONL file (default: synthetic)')
+    parser.add_argument('--num-samples', type=int, default=1000, help='Articles to segment')
+    parser.add_argument('--hard-fraction', type=float, default=0.4,
+                        help='Share of synthetic sentences drawn from the abbreviation / quote / initial cases')
+    parser.add_argument('--repeats', type=int, default=3, help='Timing repeats')
+    parser.add_argument('--examples', type=int, default=10, help='Disagreements to print')
+    parser.add_argument('--output', type=str, default='results/benchmark_segmentation.json',
+                        help='Where to write benchmark results')
+    
+    args = parser.parse_args()
+    
+    planted = None
+    if args.data:
+        preprocessor = TextPreprocessor('punkt')
+        texts = [preprocessor.preprocess(a['text']) for a in iter_articles(args.data, num_samples=args.num_samples)
+                 if a.get('text')]
+    else:
+        corpus = make_corpus(args.num_samples, args.hard_fraction)
+        texts = [text for text, _ in corpus]
+        planted = [set(boundaries) for _, boundaries in corpus]
+    
+    punkt, regex = PunktSegmenter(), RegexSegmenter()
+    punkt_boundaries = [set(punkt.boundaries(text)) - {len(text)} for text in texts]
+    regex_boundaries = [set(regex.boundaries(text)) for text in texts]
+    
+    results = {
+        'documents': len(texts),
+        'characters': sum(len(text) for text in texts),
+        'candidates': regex.candidates,
+        'punkt_fallbacks': regex.ambiguous,
+        'vs_punkt': boundary_metrics(regex_boundaries, punkt_boundaries)
+    }
+    filtered = [(TextPreprocessor('punkt').segment_sentences(text), TextPreprocessor('regex').segment_sentences(text))
+                for text in texts]
+    results['vs_punkt']['same_filtered_output'] = sum(a == b for a, b in filtered) / max(len(texts), 1)
+    if planted is not None:
+        results['regex_vs_planted'] = boundary_metrics(regex_boundaries, planted)
+        results['punkt_vs_planted'] = boundary_metrics(punkt_boundaries, planted)
+    
+    results['throughput'] = {name: throughput(TextPreprocessor(name), texts, args.repeats)
+                             for name in ['punkt', 'regex']}
+    
+    print("\n" + "="*50)
+    print("SENTENCE SEGMENTATION BENCHMARK")
+    print("="*50)
+    print(f"{results['documents']} documents, {results['characters'] / 1e6:.2f}M characters")
+    print(f"Candidate boundaries: {results['candidates']}, sent to punkt: {results['punkt_fallbacks']} "
+          f"({results['punkt_fallbacks'] / max(results['candidates'], 1):.1%})")
+    metrics = results['vs_punkt']
+    print(f"Agreement with punkt: precision {metrics['precision']:.4f}, recall {metrics['recall']:.4f}, "
+          f"identical documents {metrics['exact_documents']:.1%}, "
+          f"identical filtered sentences {metrics['same_filtered_output']:.1%}")
+    if planted is not None:
+        for name in ['regex', 'punkt']:
+            metrics = results[f'{name}_vs_planted']
+            print(f"{name:5s} vs planted boundaries: precision {metrics['precision']:.4f}, "
+                  f"recall {metrics['recall']:.4f}, exact documents {metrics['exact_documents']:.1%}")
+    for name, stats in results['throughput'].items():
+        print(f"{name:5s}: {stats['docs_per_s']:.0f} docs/s, {stats['mb_per_s']:.2f} MB/s")
+    speedup = results['throughput']['punkt']['seconds'] / results['throughput']['regex']['seconds']
+    print(f"Speedup: {speedup:.1f}x")
+    
+    shown = 0
+    for text, punkt_set, regex_set in zip(texts, punkt_boundaries, regex_boundaries):
+        for position in sorted(punkt_set ^ regex_set):
+            if shown >= args.examples:
+                break
+            side = 'punkt only' if position in punkt_set else 'regex only'
+            print(f"  [{side}] ...{text[max(position - 40, 0):position]} | {text[position:position + 30]}...")
+            shown += 1
+    
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    
+    print(f"\nResults saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,377 @@
+import json
+import os
+import sys
+import time
+import random
+import argparse
+import platform
+import subprocess
+import tracemalloc
+import numpy as np
+from typing import Callable, Dict, List, Tuple
+from preprocessing import TextPreprocessor
+from extractive_summarizer import TFIDFSummarizer, TextRankSummarizer, LeadKSummarizer
+from evaluation import RougeEvaluator
+from memory_profiling import current_rss, peak_rss, reset_peak_rss
+
+SUBJECTS = ["The government", "The prime minister", "Mr. Johnson", "Dr. Patel", "Police", "The company",
+            "Officials", "The council", "Union leaders", "The U.S. embassy", "Investors", "Hospital staff",
+            "The committee", "Residents", "The central bank", "Prof. Adams", "Campaigners", "The court"]
+VERBS = ["said", "announced", "confirmed", "warned", "denied", "reported", "rejected", "approved",
+         "launched", "criticised", "welcomed", "delayed", "proposed", "expected", "revealed"]
+OBJECTS = ["a new plan for public transport", "the proposed budget", "an investigation into the incident",
+           "plans to cut energy prices", "the outcome of the election", "a review of hospital waiting times",
+           "the trade agreement", "rising interest rates", "the strike by rail workers",
+           "changes to the school curriculum", "the security operation", "a deal with local suppliers",
+           "the climate targets", "new housing developments", "the results of the inquiry"]
+CLAUSES = ["on Tuesday", "after months of talks", "despite strong opposition", "earlier this week",
+           "according to a statement", "in a report published on Monday", "following the summit",
+           "amid growing concern", "at a press conference", "ahead of the vote"]
+PLACES = ["London", "Manchester", "Washington", "Brussels", "Glasgow", "New York", "Paris", "Cardiff"]
+
+TARGETS = ['preprocess', 'TF-IDF', 'TextRank', 'Lead-3', 'ROUGE', 'BART', 'T5']
+# torch allocates weights and activations natively, out of tracemalloc's sight, so these are measured by RSS
+RSS_MEMORY_TARGETS = {'BART', 'T5'}
+
+GENERATION_KWARGS = {
+    'max_length': 32,
+    'min_length': 8,
+    'num_beams': 2,
+    'do_sample': False,
+    'no_repeat_ngram_size': 3
+}
+
+class NewsArticleGenerator:
+    def __init__(self, seed: int = 0):
+        self.seed = seed
+    
+    def sentence(self, rng: random.Random) -> str:
+        form = rng.random()
+        if form < 0.15:
+            return (f'"We will not accept {rng.choice(OBJECTS)}," {rng.choice(SUBJECTS).lower()} '
+                    f'{rng.choice(VERBS)} {rng.choice(CLAUSES)}.')
+        if form < 0.3:
+            return (f"{rng.choice(SUBJECTS)} in {rng.choice(PLACES)} {rng.choice(VERBS)} that "
+                    f"{rng.randint(2, 95)}.{rng.randint(0, 9)} per cent of people supported {rng.choice(OBJECTS)}.")
+        sentence = f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(OBJECTS)} {rng.choice(CLAUSES)}"
+        if form > 0.7:
+            sentence += f", while {rng.choice(SUBJECTS).lower()} {rng.choice(VERBS)} {rng.choice(OBJECTS)}"
+        return sentence + '.'
+    
+    def article(self, num_sentences: int, index: int = 0) -> Dict:
+        rng = random.Random(f"{self.seed}-{num_sentences}-{index}")
+        sentences = [self.sentence(rng) for _ in range(num_sentences)]
+        
+        paragraphs = []
+        position = 0
+        while position < len(sentences):
+            size = rng.randint(2, 5)
+            paragraphs.append(' '.join(sentences[position:position + size]))
+            position += size
+        
+        return {
+            'title': f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(OBJECTS)}",
+            'text': '\n\n'.join(paragraphs),
+            'num_sentences': num_sentences,
+            'reference': ' '.join(sentences[:3]),
+            'candidate': ' '.join(sentences[::10][:60])
+        }
+
+def vocabulary() -> List[str]:
+    words = set()
+    for phrase in SUBJECTS + VERBS + OBJECTS + CLAUSES + PLACES + ["we will not accept per cent of people "
+                                                                   "supported that in while summarize"]:
+        words.update(phrase.lower().replace('.', ' ').split())
+    return sorted(words)
+
+def make_tiny_checkpoints(output_dir: str, seed: int = 0) -> Dict[str, str]:
+    import torch
+    from tokenizers import Tokenizer, models, normalizers, pre_tokenizers
+    from transformers import (BartConfig, BartForConditionalGeneration, PreTrainedTokenizerFast,
+                              T5Config, T5ForConditionalGeneration)
+    
+    paths = {'BART': os.path.join(output_dir, 'tiny-bart'), 'T5': os.path.join(output_dir, 'tiny-t5')}
+    if all(os.path.exists(os.path.join(path, 'config.json')) for path in paths.values()):
+        return paths
+    
+    vocab = {'<pad>': 0, '</s>': 1, '<unk>': 2, '<s>': 3}
+    for token in vocabulary() + [',', '.', ':', '"']:
+        vocab.setdefault(token, len(vocab))
+    
+    word_tokenizer = Tokenizer(models.WordLevel(vocab, unk_token='<unk>'))
+    word_tokenizer.normalizer = normalizers.Lowercase()
+    word_tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    
+    torch.manual_seed(seed)
+    models_by_name = {
+        'T5': T5ForConditionalGeneration(T5Config(
+            vocab_size=len(vocab), d_model=32, d_ff=64, num_layers=2, num_heads=2, d_kv=16,
+            decoder_start_token_id=0, pad_token_id=0, eos_token_id=1)),
+        'BART': BartForConditionalGeneration(BartConfig(
+            vocab_size=len(vocab), d_model=32, encoder_layers=1, decoder_layers=1,
+            encoder_attention_heads=2, decoder_attention_heads=2, encoder_ffn_dim=64, decoder_ffn_dim=64,
+            max_position_embeddings=2048, pad_token_id=0, eos_token_id=1, bos_token_id=3,
+            decoder_start_token_id=1, forced_eos_token_id=1))
+    }
+    
+    for name, model in models_by_name.items():
+        tokenizer = PreTrainedTokenizerFast(tokenizer_object=word_tokenizer, pad_token='<pad>', eos_token='</s>',
+                                            unk_token='<unk>', bos_token='<s>', model_max_length=2048)
+        model.save_pretrained(paths[name])
+        tokenizer.save_pretrained(paths[name])
+    
+    return paths
+
+def build_targets(names: List[str], checkpoint_dir: str) -> Dict[str, Callable[[Dict], object]]:
+    preprocessor = TextPreprocessor()
+    targets = {}
+    
+    if 'preprocess' in names:
+        targets['preprocess'] = lambda article: preprocessor.preprocess_and_segment(article['text'])
+    
+    for name, cls in [('TF-IDF', TFIDFSummarizer), ('TextRank', TextRankSummarizer), ('Lead-3', LeadKSummarizer)]:
+        if name in names:
+            summarizer = cls(preprocessor)
+            targets[name] = lambda article, summarizer=summarizer: summarizer.summarize(article['text'],
+                                                                                          num_sentences=3)
+    
+    if 'ROUGE' in names:
+        evaluator = RougeEvaluator()
+        targets['ROUGE'] = lambda article: evaluator.evaluate_many(article['reference'],
+                                                                   [article['candidate'], article['title']])
+    
+    if 'BART' in names or 'T5' in names:
+        from abstractive_summarizer import AbstractiveSummarizer, T5Summarizer
+        paths = make_tiny_checkpoints(checkpoint_dir)
+        abstractive = {'BART': lambda: AbstractiveSummarizer(model_name=paths['BART']),
+                       'T5': lambda: T5Summarizer(model_name=paths['T5'])}
+        for name in ['BART', 'T5']:
+            if name in names:
+                summarizer = abstractive[name]()
+                targets[name] = lambda article, summarizer=summarizer: summarizer.summarize(article['text'],
+                                                                                              **GENERATION_KWARGS)
+    
+    return targets
+
+def measure_latency(fn: Callable[[Dict], object], articles: List[Dict]) -> Dict:
+    latencies = []
+    for article in articles:
+        start_time = time.perf_counter()
+        fn(article)
+        latencies.append(time.perf_counter() - start_time)
+    
+    total_time = sum(latencies)
+    total_sentences = sum(article['num_sentences'] for article in articles)
+    latencies_ms = np.array(latencies) * 1000
+    
+    return {
+        'runs': len(latencies),
+        'total_time': total_time,
+        'articles_per_s': len(articles) / total_time if total_time else float('inf'),
+        'sentences_per_s': total_sentences / total_time if total_time else float('inf'),
+        'mean_ms': float(latencies_ms.mean()),
+        'p50_ms': float(np.percentile(latencies_ms, 50)),
+        'p95_ms': float(np.percentile(latencies_ms, 95)),
+        'p99_ms': float(np.percentile(latencies_ms, 99)),
+        'max_ms': float(latencies_ms.max())
+    }
+
+def measure_peak_memory(fn: Callable[[Dict], object], article: Dict) -> int:
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        fn(article)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def measure_peak_rss(fn: Callable[[Dict], object], article: Dict) -> int:
+    # Growth of the RSS high-water mark over the call; without a resettable peak (non-Linux) it is the
+    # growth over the process's earlier peak, so it under-reports calls that fit in memory freed before
+    resettable = reset_peak_rss()
+    before = current_rss() if resettable else peak_rss()
+    fn(article)
+    return max(peak_rss() - before, 0)
+
+def run_suite(targets: Dict[str, Callable[[Dict], object]], sizes: List[int], repeats: int,
+              sentence_budget: int, seed: int, max_sentences: Dict[str, int]) -> Dict:
+    generator = NewsArticleGenerator(seed)
+    warmup = generator.article(min(sizes), index=-1)
+    for fn in targets.values():
+        fn(warmup)
+    
+    results = {name: {} for name in targets}
+    for size in sizes:
+        runs = max(1, min(repeats, sentence_budget // size))
+        articles = [generator.article(size, index=i) for i in range(runs)]
+        
+        for name, fn in targets.items():
+            if size > max_sentences.get(name, size):
+                results[name][str(size)] = {'skipped': f"above the {max_sentences[name]}-sentence cap"}
+                print(f"{name:12s} {size:>7d} sentences: skipped")
+                continue
+            
+            stats = measure_latency(fn, articles)
+            if name in RSS_MEMORY_TARGETS:
+                stats['peak_memory_bytes'] = measure_peak_rss(fn, articles[0])
+                stats['peak_memory_source'] = 'rss'
+            else:
+                stats['peak_memory_bytes'] = measure_peak_memory(fn, articles[0])
+                stats['peak_memory_source'] = 'tracemalloc'
+            results[name][str(size)] = stats
+            print(f"{name:12s} {size:>7d} sentences: p50 {stats['p50_ms']:10.2f} ms, "
+                  f"p95 {stats['p95_ms']:10.2f} ms, {stats['sentences_per_s']:12.0f} sentences/s, "
+                  f"peak {stats['peak_memory_bytes'] / 2**20:8.1f} MiB")
+    
+    return results
+
+def git_revision(ref: str = 'HEAD') -> Tuple[str, bool]:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', ref], capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                    capture_output=True, text=True, check=True).stdout.strip())
+        return commit, dirty
+    except Exception:
+        return 'unknown', False
+
+def resolve_results_path(value: str, results_dir: str) -> str:
+    if os.path.exists(value):
+        return value
+    commit, _ = git_revision(value)
+    # run saves uncommitted changes as <commit>-dirty.json; with both files present the revision is ambiguous
+    found = [path for path in (os.path.join(results_dir, f"{commit}{suffix}.json") for suffix in ('', '-dirty'))
+             if os.path.exists(path)]
+    if not found:
+        raise FileNotFoundError(f"No results for {value} ({commit}) in {results_dir}")
+    if len(found) > 1:
+        raise ValueError(f"{value} has both committed and uncommitted results ({', '.join(found)}); "
+                         f"pass the results file instead")
+    return found[0]
+
+def compare_results(base: Dict, head: Dict, threshold: float, memory_threshold: float,
+                    min_delta_ms: float) -> List[Dict]:
+    rows = []
+    for name, sizes in head['benchmarks'].items():
+        for size, stats in sizes.items():
+            base_stats = base['benchmarks'].get(name, {}).get(size)
+            if not base_stats or 'skipped' in stats or 'skipped' in base_stats:
+                continue
+            
+            metrics = [('p50_ms', threshold), ('p95_ms', threshold)]
+            # Results from before RSS sampling measured every target with tracemalloc; those do not compare
+            sources = {entry.get('peak_memory_source', 'tracemalloc') for entry in (base_stats, stats)}
+            if len(sources) == 1:
+                metrics.append(('peak_memory_bytes', memory_threshold))
+            for metric, limit in metrics:
+                before, after = base_stats[metric], stats[metric]
+                change = (after - before) / before if before else 0.0
+                regression = change > limit
+                if metric != 'peak_memory_bytes' and after - before < min_delta_ms:
+                    regression = False
+                rows.append({'target': name, 'size': int(size), 'metric': metric, 'base': before,
+                             'head': after, 'change': change, 'regression': regression})
+    return rows
+
+def run_command(args):
+    names = [name.strip() for name in args.targets.split(',') if name.strip()]
+    unknown = [name for name in names if name not in TARGETS]
+    if unknown:
+        raise ValueError(f"Unknown targets: {', '.join(unknown)}")
+    
+    sizes = [int(size) for size in args.sizes.split(',')]
+    max_sentences = {'TextRank': args.textrank_max_sentences, 'BART': args.abstractive_max_sentences,
+                     'T5': args.abstractive_max_sentences}
+    
+    targets = build_targets(names, args.checkpoint_dir)
+    benchmarks = run_suite(targets, sizes, args.repeats, args.sentence_budget, args.seed, max_sentences)
+    
+    commit, dirty = git_revision()
+    results = {
+        'commit': commit,
+        'dirty': dirty,
+        'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'sizes': sizes,
+        'benchmarks': benchmarks
+    }
+    
+    output_path = args.output or os.path.join(args.results_dir, f"{commit}{'-dirty' if dirty else ''}.json")
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    
+    print(f"\nResults saved to {output_path}")
+
+def load_results(path: str) -> Dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def compare_command(args) -> int:
+    try:
+        paths = [resolve_results_path(value, args.results_dir) for value in (args.base, args.head)]
+    except (FileNotFoundError, ValueError) as e:
+        print(e)
+        return 2
+    base, head = [load_results(path) for path in paths]
+    
+    rows = compare_results(base, head, args.threshold, args.memory_threshold, args.min_delta_ms)
+    
+    print(f"Comparing {base['commit']} -> {head['commit']}")
+    print(f"{'Target':12s} {'Size':>7s} {'Metric':18s} {'Base':>14s} {'Head':>14s} {'Change':>9s}")
+    for row in rows:
+        flag = '  REGRESSION' if row['regression'] else ''
+        print(f"{row['target']:12s} {row['size']:>7d} {row['metric']:18s} {row['base']:>14.2f} "
+              f"{row['head']:>14.2f} {row['change']:>+8.1%}{flag}")
+    
+    regressions = [row for row in rows if row['regression']]
+    print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%} latency / "
+          f"{args.memory_threshold:.0%} memory")
+    return 1 if regressions else 0
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline benchmark suite on synthetic news articles')
+    parser.add_argument('--results-dir', type=str, default='results/benchmarks',
+                        help='Directory holding one results file per commit')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    run_parser = subparsers.add_parser('run', help='Run the benchmarks and store results for the current commit')
+    run_parser.add_argument('--targets', type=str, default=','.join(TARGETS),
+                            help=f"Comma-separated subset of {', '.join(TARGETS)}")
+    run_parser.add_argument('--sizes', type=str, default='5,50,500,5000,50000',
+                            help='Comma-separated article lengths in sentences')
+    run_parser.add_argument('--repeats', type=int, default=10, help='Articles per size')
+    run_parser.add_argument('--sentence-budget', type=int, default=100000,
+                            help='Upper bound on sentences per size, limits repeats for long articles')
+    run_parser.add_argument('--seed', type=int, default=0, help='Seed for the article generator')
+    run_parser.add_argument('--textrank-max-sentences', type=int, default=5000,
+                            help='Skip TextRank above this length (it builds a dense n x n matrix)')
+    run_parser.add_argument('--abstractive-max-sentences', type=int, default=500,
+                            help='Skip BART / T5 above this length')
+    run_parser.add_argument('--checkpoint-dir', type=str, default='results/benchmarks/checkpoints',
+                            help='Where the tiny local BART / T5 checkpoints are created')
+    run_parser.add_argument('--output', type=str, default=None,
+                            help='Results path (defaults to <results-dir>/<commit>.json, or '
+                                 '<commit>-dirty.json when the tree has uncommitted changes)')
+    
+    compare_parser = subparsers.add_parser('compare', help='Compare two stored results and flag regressions')
+    compare_parser.add_argument('base', type=str, help='Baseline results file or git revision')
+    compare_parser.add_argument('head', type=str, help='New results file or git revision')
+    compare_parser.add_argument('--threshold', type=float, default=0.10,
+                                help='Relative latency increase counted as a regression')
+    compare_parser.add_argument('--memory-threshold', type=float, default=0.10,
+                                help='Relative peak-memory increase counted as a regression')
+    compare_parser.add_argument('--min-delta-ms', type=float, default=0.05,
+                                help='Ignore latency changes smaller than this')
+    
+    args = parser.parse_args()
+    
+    if args.command == 'run':
+        run_command(args)
+    else:
+        sys.exit(compare_command(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import json
+import os
+import time
+import argparse
+import numpy as np
+from typing import List, Dict
+from abstractive_summarizer import T5Summarizer
+from main import load_data
+
+SAMPLE_TEXT = ("The city council approved a new transport plan on Tuesday after months of debate. "
+               "Officials said the plan would add bus routes, extend cycle lanes and cut journey times "
+               "for commuters travelling into the centre. Critics argued that the cost had been "
+               "underestimated and that residents in outer districts would see few benefits. ")
+
+def load_texts(data_path: str, num_texts: int) -> List[str]:
+    if data_path and os.path.exists(data_path):
+        articles = load_data(data_path, num_samples=num_texts * 4)
+        texts = [a.get('text', '') for a in articles if len(a.get('text', '')) >= 200]
+        if texts:
+            return texts[:num_texts]
+    return [SAMPLE_TEXT * (i % 4 + 1) for i in range(num_texts)]
+
+def benchmark_summarizer(summarizer: T5Summarizer, texts: List[str], max_length: int,
+                         min_length: int, num_beams: int) -> Dict:
+    latencies = []
+    per_token = []
+    
+    for i, text in enumerate(texts):
+        inputs = summarizer._encode(summarizer.preprocessor.preprocess(text))
+        start_time = time.perf_counter()
+        outputs = summarizer._generate_ids(inputs, max_length, min_length, num_beams, False, 3)
+        elapsed_time = time.perf_counter() - start_time
+        
+        if i == 0:
+            continue
+        
+        latencies.append(elapsed_time)
+        per_token.append(elapsed_time / max(outputs.shape[-1] - 1, 1))
+    
+    return {
+        'compiled': summarizer.compiled,
+        'warmup_time': summarizer.warmup_time,
+        'num_texts': len(latencies),
+        'avg_latency': float(np.mean(latencies)),
+        'p50_per_token_ms': float(np.percentile(per_token, 50) * 1000),
+        'p95_per_token_ms': float(np.percentile(per_token, 95) * 1000),
+        'avg_per_token_ms': float(np.mean(per_token) * 1000)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark eager vs compiled T5 generation')
+    parser.add_argument('--model', type=str, default='t5-small', help='T5 checkpoint to benchmark')
+    parser.add_argument('--data', type=str, default='data/articles.json', help='Optional articles JSON file')
+    parser.add_argument('--num-texts', type=int, default=10, help='Number of texts to generate for')
+    parser.add_argument('--max-length', type=int, default=150, help='Generation max_length')
+    parser.add_argument('--min-length', type=int, default=50, help='Generation min_length')
+    parser.add_argument('--num-beams', type=int, default=4, help='Beam search width')
+    parser.add_argument('--output', type=str, default='results/benchmark_t5_generation.json',
+                        help='Where to write benchmark results')
+    
+    args = parser.parse_args()
+    
+    texts = load_texts(args.data, args.num_texts + 1)
+    results = {}
+    
+    for mode in ['eager', 'compiled']:
+        print(f"Loading {args.model} ({mode})...")
+        start_time = time.perf_counter()
+        summarizer = T5Summarizer(model_name=args.model, max_length=args.max_length,
+                                  min_length=args.min_length, compiled=(mode == 'compiled'),
+                                  warmup_num_beams=args.num_beams)
+        load_time = time.perf_counter() - start_time
+        
+        results[mode] = benchmark_summarizer(summarizer, texts, args.max_length,
+                                             args.min_length, args.num_beams)
+        results[mode]['load_time'] = load_time
+        del summarizer
+    
+    print("\n" + "="*50)
+    print("T5 GENERATION BENCHMARK")
+    print("="*50)
+    for mode, stats in results.items():
+        print(f"{mode:10s}: load {stats['load_time']:.2f}s (warm-up {stats['warmup_time']:.2f}s), "
+              f"{stats['avg_per_token_ms']:.2f} ms/token avg, {stats['p95_per_token_ms']:.2f} ms/token p95")
+    
+    if results['compiled']['compiled']:
+        speedup = results['eager']['avg_per_token_ms'] / results['compiled']['avg_per_token_ms']
+        print(f"\nSteady-state speedup: {speedup:.2f}x")
+    else:
+        print("\nCompilation failed, compiled run used the eager path")
+    
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    
+    print(f"\nResults saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
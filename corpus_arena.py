@@ -0,0 +1,171 @@
+import os
+import mmap
+import ctypes
+import heapq
+import shutil
+import tempfile
+import threading
+import numpy as np
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+FALLOC_FL_KEEP_SIZE = 0x01
+FALLOC_FL_PUNCH_HOLE = 0x02
+
+def default_arena_dir() -> str:
+    # tmpfs when available, so the arena lives in shared memory rather than on disk
+    if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK):
+        return '/dev/shm'
+    return tempfile.gettempdir()
+
+@lru_cache(maxsize=None)
+def _fallocate():
+    try:
+        fallocate = ctypes.CDLL(None, use_errno=True).fallocate
+    except (OSError, AttributeError):
+        return None
+    fallocate.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int64, ctypes.c_int64]
+    return fallocate
+
+def punch_hole(fd: int, offset: int, length: int) -> bool:
+    # Frees the pages of a byte range without changing the file size (Linux; tmpfs returns them to memory)
+    fallocate = _fallocate()
+    if fallocate is None or length <= 0:
+        return False
+    return fallocate(fd, FALLOC_FL_PUNCH_HOLE | FALLOC_FL_KEEP_SIZE, offset, length) == 0
+
+class CorpusArena:
+    # Article texts as one contiguous UTF-8 blob (texts.bin), each article's end offset (offsets.bin) and
+    # sentence byte spans (spans.bin, int64 start/end pairs into the blob). The files only grow, so readers
+    # in other processes map them read-only and re-map when asked for a range past what they have mapped.
+    def __init__(self, root: str, writable: bool = False):
+        self.root = root
+        self.writable = writable
+        self.lock = threading.Lock()
+        self._maps = {}
+        self._files = {}
+        self.text_bytes = 0
+        self._released = []
+        self.released_end = 0
+        self.freed_bytes = 0
+        if writable:
+            os.makedirs(root, exist_ok=True)
+            self._files = {name: open(os.path.join(root, name), 'wb')
+                           for name in ('texts.bin', 'offsets.bin', 'spans.bin')}
+    
+    @classmethod
+    def create(cls, root: str = None) -> 'CorpusArena':
+        return cls(root or tempfile.mkdtemp(prefix='corpus-arena-', dir=default_arena_dir()), writable=True)
+    
+    def __len__(self) -> int:
+        return os.path.getsize(os.path.join(self.root, 'offsets.bin')) // 8
+    
+    def add(self, text: str, sentences: List[str] = None) -> Tuple[int, int]:
+        data = text.encode('utf-8')
+        spans = self._sentence_spans(text, sentences) if sentences is not None else None
+        with self.lock:
+            start = self.text_bytes
+            self.text_bytes += len(data)
+            self._files['texts.bin'].write(data)
+            self._files['offsets.bin'].write(np.int64(self.text_bytes).tobytes())
+            if spans is not None:
+                self._files['spans.bin'].write((spans + start).tobytes())
+            # Flushed before the span is handed out, so a worker that maps the files afterwards sees it
+            for f in self._files.values():
+                f.flush()
+        return start, self.text_bytes
+    
+    @staticmethod
+    def _sentence_spans(text: str, sentences: List[str]) -> Optional[np.ndarray]:
+        # Byte spans of each sentence within text; segmenters return substrings, so each is found in order
+        spans = np.zeros((len(sentences), 2), dtype=np.int64)
+        cursor, byte_cursor = 0, 0
+        for i, sentence in enumerate(sentences):
+            position = text.find(sentence, cursor)
+            if position < 0:
+                return None
+            byte_start = byte_cursor + len(text[cursor:position].encode('utf-8'))
+            byte_end = byte_start + len(sentence.encode('utf-8'))
+            spans[i] = byte_start, byte_end
+            cursor, byte_cursor = position + len(sentence), byte_end
+        return spans
+    
+    def release(self, start: int, end: int):
+        # Called once per added text when no worker will read it again. Texts finish out of order, so the
+        # released prefix of texts.bin advances over contiguous finished spans and its whole pages are freed.
+        with self.lock:
+            heapq.heappush(self._released, (start, end))
+            while self._released and self._released[0][0] == self.released_end:
+                self.released_end = heapq.heappop(self._released)[1]
+            page_end = self.released_end // mmap.PAGESIZE * mmap.PAGESIZE
+            if page_end > self.freed_bytes and punch_hole(self._files['texts.bin'].fileno(), self.freed_bytes,
+                                                          page_end - self.freed_bytes):
+                self.freed_bytes = page_end
+    
+    def _map(self, name: str, size: int):
+        # Returns a read-only mapping that covers at least size bytes of the named file
+        mapped = self._maps.get(name)
+        if mapped is None or len(mapped) < size:
+            if mapped is not None:
+                mapped.close()
+            path = os.path.join(self.root, name)
+            if os.path.getsize(path) == 0:
+                return None
+            with open(path, 'rb') as f:
+                mapped = self._maps[name] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return mapped
+    
+    def decode(self, start: int, end: int) -> str:
+        if end == start:
+            return ''
+        return self._map('texts.bin', end)[start:end].decode('utf-8')
+    
+    def _span_pairs(self) -> np.ndarray:
+        # Whole start/end pairs only, in case a writer is part-way through an append
+        size = os.path.getsize(os.path.join(self.root, 'spans.bin')) // 16 * 16
+        if not size:
+            return np.zeros((0, 2), dtype=np.int64)
+        return np.frombuffer(self._map('spans.bin', size), dtype=np.int64, count=size // 8).reshape(-1, 2)
+    
+    def span(self, index: int) -> Tuple[int, int]:
+        size = (index + 1) * 8
+        ends = np.frombuffer(self._map('offsets.bin', size), dtype=np.int64, count=index + 1)
+        return (int(ends[index - 1]) if index else 0), int(ends[index])
+    
+    def text(self, index: int) -> str:
+        return self.decode(*self.span(index))
+    
+    def sentence_spans(self, start: int, end: int) -> np.ndarray:
+        # Spans are appended in text order, so the ones inside [start, end) form a contiguous block
+        spans = self._span_pairs()
+        first = np.searchsorted(spans[:, 0], start, side='left')
+        last = np.searchsorted(spans[:, 0], end, side='left')
+        return spans[first:last].copy()
+    
+    def sentences(self, start: int, end: int) -> Optional[List[str]]:
+        spans = self.sentence_spans(start, end)
+        if not len(spans):
+            return None
+        data = self._map('texts.bin', end)
+        return [data[s:e].decode('utf-8') for s, e in spans.tolist()]
+    
+    def close(self):
+        for mapped in self._maps.values():
+            mapped.close()
+        self._maps = {}
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+    
+    def destroy(self):
+        self.close()
+        shutil.rmtree(self.root, ignore_errors=True)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        if self.writable:
+            self.destroy()
+        else:
+            self.close()
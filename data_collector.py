@@ -1,27 +1,26 @@
-import requests
 from bs4 import BeautifulSoup
 import json
 import time
 import os
-from typing import List, Dict, Set
+import argparse
+import threading
+from contextlib import closing
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Iterator, Set
+from urllib.parse import urljoin
 import re
 import xml.etree.ElementTree as ET
+from article_stream import iter_articles
+from http_fetcher import Fetcher, Page
+from page_cache import PageCache
+from article_store import ArticleStore, canonicalize_url
+from article_extraction import HAS_LXML, PARSER_VERSIONS, extract_article, extract_links
 
-class NewsCollector:
-    def __init__(self, output_dir: str = "data"):
-        self.output_dir = output_dir
-        os.makedirs(output_dir, exist_ok=True)
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
-        self.collected_urls: Set[str] = set()
-    
-    def collect_bbc_news(self, num_articles: int = 1500) -> List[Dict]:
-        articles = []
-        all_links = set()
-        
-        rss_feeds = [
+DEFAULT_SOURCES = {
+    'bbc': {
+        'name': 'BBC',
+        'rss_feeds': [
             "http://feeds.bbci.co.uk/news/rss.xml",
             "http://feeds.bbci.co.uk/news/uk/rss.xml",
             "http://feeds.bbci.co.uk/news/world/rss.xml",
@@ -31,77 +30,222 @@ class NewsCollector:
             "http://feeds.bbci.co.uk/news/entertainment_and_arts/rss.xml",
             "http://feeds.bbci.co.uk/news/health/rss.xml",
             "http://feeds.bbci.co.uk/news/education/rss.xml"
-        ]
-        
-        print("Collecting links from BBC RSS feeds...")
-        for rss_url in rss_feeds:
-            try:
-                links = self._parse_rss_feed(rss_url)
-                all_links.update(links)
-                print(f"Found {len(links)} links from {rss_url}")
-                time.sleep(0.5)
-            except Exception as e:
-                print(f"Error fetching RSS feed {rss_url}: {e}")
-                continue
-        
-        base_urls = [
+        ],
+        'base_urls': [
             "https://www.bbc.com/news",
             "https://www.bbc.com/news/uk",
             "https://www.bbc.com/news/world",
             "https://www.bbc.com/news/business",
             "https://www.bbc.com/news/technology"
-        ]
+        ],
+        'link_pattern': '/news/',
+        'min_link_length': 10
+    },
+    'guardian': {
+        'name': 'Guardian',
+        'rss_feeds': [
+            "https://www.theguardian.com/world/rss",
+            "https://www.theguardian.com/uk/rss",
+            "https://www.theguardian.com/business/rss",
+            "https://www.theguardian.com/technology/rss",
+            "https://www.theguardian.com/science/rss",
+            "https://www.theguardian.com/culture/rss",
+            "https://www.theguardian.com/politics/rss",
+            "https://www.theguardian.com/sport/rss"
+        ],
+        'base_urls': [
+            "https://www.theguardian.com/international",
+            "https://www.theguardian.com/uk",
+            "https://www.theguardian.com/world",
+            "https://www.theguardian.com/business",
+            "https://www.theguardian.com/technology"
+        ],
+        'link_pattern': '/202',
+        'min_link_length': 10
+    },
+    'fox': {
+        'name': 'Fox News',
+        'rss_feeds': [
+            "https://feeds.foxnews.com/foxnews/latest",
+            "https://feeds.foxnews.com/foxnews/politics",
+            "https://feeds.foxnews.com/foxnews/world",
+            "https://feeds.foxnews.com/foxnews/business",
+            "https://feeds.foxnews.com/foxnews/tech",
+            "https://feeds.foxnews.com/foxnews/science",
+            "https://feeds.foxnews.com/foxnews/health",
+            "https://feeds.foxnews.com/foxnews/entertainment"
+        ],
+        'base_urls': [
+            "https://www.foxnews.com",
+            "https://www.foxnews.com/politics",
+            "https://www.foxnews.com/world",
+            "https://www.foxnews.com/business",
+            "https://www.foxnews.com/tech"
+        ],
+        'link_pattern': '/202',
+        'min_link_length': 0
+    }
+}
+
+DEFAULT_COUNTS = {'bbc': 500, 'guardian': 400, 'fox': 300}
+
+class NewsCollector:
+    def __init__(self, output_dir: str = "data", sources: Dict[str, Dict] = None, workers: int = 16,
+                 rate: float = 4.0, burst: float = 4.0, max_retries: int = 3, timeout: float = 10,
+                 cache_dir: str = None, cache_max_bytes: int = 512 * 2**20, parser_backend: str = 'lxml',
+                 store: ArticleStore = None):
+        self.output_dir = output_dir
+        os.makedirs(output_dir, exist_ok=True)
+        self.sources = sources or DEFAULT_SOURCES
+        cache = PageCache(cache_dir, cache_max_bytes) if cache_dir else None
+        self.fetcher = Fetcher(workers=workers, rate=rate, burst=burst, max_retries=max_retries, timeout=timeout,
+                               cache=cache)
+        self.session = self.fetcher.session
+        self.parse_stats = {'parsed': 0, 'reused': 0}
+        self.store = store
+        self.collected_urls: Set[str] = set()
+        self._collected_lock = threading.Lock()
+        self.parsers = {
+            'bbc': self._parse_bbc_article,
+            'guardian': self._parse_guardian_article,
+            'fox': self._parse_fox_article
+        }
+        
+        if parser_backend == 'lxml' and not HAS_LXML:
+            print("lxml is not installed, falling back to BeautifulSoup's html.parser")
+            parser_backend = 'bs4'
+        self.parser_backend = parser_backend
+        self.parser_key = f"{parser_backend}-{PARSER_VERSIONS[parser_backend]}"
+        if parser_backend == 'lxml':
+            self.parsers = {key: partial(extract_article, key) for key in self.parsers}
+    
+    def collect_bbc_news(self, num_articles: int = 1500) -> List[Dict]:
+        return self.collect_source('bbc', num_articles)
+    
+    def collect_guardian_news(self, num_articles: int = 500) -> List[Dict]:
+        return self.collect_source('guardian', num_articles)
+    
+    def collect_fox_news(self, num_articles: int = 300) -> List[Dict]:
+        return self.collect_source('fox', num_articles)
+    
+    def collect_all(self, counts: Dict[str, int] = None) -> List[Dict]:
+        counts = counts or DEFAULT_COUNTS
+        with ThreadPoolExecutor(max_workers=len(counts), thread_name_prefix='source') as pool:
+            futures = {key: pool.submit(self.collect_source, key, num) for key, num in counts.items()}
         
-        print("Collecting links from BBC category pages...")
-        for base_url in base_urls:
-            if len(all_links) >= num_articles * 3:
-                break
+        all_articles = []
+        for key, future in futures.items():
             try:
-                response = self.session.get(base_url, timeout=10)
-                response.raise_for_status()
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                for link in soup.find_all('a', href=True):
-                    href = link.get('href')
-                    if href and '/news/' in href and href.startswith('/') and len(href) > 10:
-                        full_url = f"https://www.bbc.com{href}"
-                        all_links.add(full_url)
-                
-                time.sleep(1)
+                all_articles.extend(future.result())
             except Exception as e:
-                print(f"Error fetching {base_url}: {e}")
-                continue
-        
-        print(f"Found {len(all_links)} total potential article links")
+                print(f"Error collecting {self.sources[key]['name']}: {e}")
+        return all_articles
+    
+    def collect_source(self, key: str, num_articles: int) -> List[Dict]:
+        name = self.sources[key]['name']
+        articles = []
         
-        links = list(all_links)
-        for i, url in enumerate(links):
-            if len(articles) >= num_articles:
-                break
-            
-            if url in self.collected_urls:
-                continue
-            
-            try:
-                article = self._fetch_bbc_article(url)
-                if article and article.get('text') and len(article['text']) > 200:
-                    articles.append(article)
-                    self.collected_urls.add(url)
-                    if len(articles) % 25 == 0:
-                        print(f"Collected {len(articles)}/{num_articles} BBC articles")
+        candidates = self.iter_links(key, num_articles)
+        fetches = self.fetcher.imap_unordered(lambda url: self._fetch_article(key, url), candidates,
+                                              max_in_flight=self.fetcher.workers)
+        with closing(fetches):
+            for url, article in fetches:
+                if isinstance(article, Exception) or not article or len(article.get('text', '')) <= 200:
+                    continue
+                if not self._mark_collected(url):
+                    continue
+                if self.store is not None and not self.store.add(article):
+                    continue
                 
-                time.sleep(0.3)
-            except Exception as e:
-                continue
+                articles.append(article)
+                if len(articles) % 25 == 0:
+                    print(f"Collected {len(articles)}/{num_articles} {name} articles")
+                if len(articles) >= num_articles:
+                    break
         
         return articles
     
+    def iter_links(self, key: str, num_articles: int) -> Iterator[str]:
+        # Yields not yet collected article links as each feed or category page comes back. Links are
+        # deduplicated on their canonical form but yielded as found, since that is the URL the site serves
+        source = self.sources[key]
+        name = source['name']
+        seen = set()
+        known = 0
+        
+        def new_links(links):
+            nonlocal known
+            for link in links:
+                url = canonicalize_url(link)
+                if url in seen:
+                    continue
+                seen.add(url)
+                if self._is_collected(url):
+                    known += 1
+                else:
+                    yield link
+        
+        print(f"Collecting links from {name} RSS feeds...")
+        with closing(self.fetcher.imap_unordered(self._parse_rss_feed, source['rss_feeds'])) as feeds:
+            for rss_url, links in feeds:
+                print(f"Found {len(links)} links from {rss_url}")
+                yield from new_links(links)
+        
+        if len(seen) < num_articles * 3:
+            print(f"Collecting links from {name} category pages...")
+            pages = self.fetcher.imap_unordered(lambda url: self._parse_category_page(source, url), source['base_urls'])
+            with closing(pages):
+                for base_url, links in pages:
+                    if isinstance(links, Exception):
+                        print(f"Error fetching {base_url}: {links}")
+                        continue
+                    yield from new_links(links)
+        
+        print(f"Found {len(seen)} total potential {name} article links")
+        if known:
+            print(f"Skipping {known} {name} links that were already collected")
+    
+    def _is_collected(self, url: str) -> bool:
+        url = canonicalize_url(url)
+        return url in self.collected_urls or (self.store is not None and url in self.store)
+    
+    def _mark_collected(self, url: str) -> bool:
+        url = canonicalize_url(url)
+        with self._collected_lock:
+            if url in self.collected_urls:
+                return False
+            self.collected_urls.add(url)
+            return True
+    
+    def _parse_page(self, page: Page, parse):
+        # Parse results are cached against the body's content hash and the parser, so unchanged pages skip parsing
+        cache = self.fetcher.cache
+        if cache is not None:
+            value, found = cache.get_parsed(page.url, page.content_hash, self.parser_key)
+            if found:
+                self._count_parse('reused')
+                return value
+        
+        value = parse(page.content, page.url)
+        self._count_parse('parsed')
+        if cache is not None:
+            cache.set_parsed(page.url, page.content_hash, value, self.parser_key)
+        return value
+    
+    def _count_parse(self, name: str):
+        with self._collected_lock:
+            self.parse_stats[name] += 1
+    
     def _parse_rss_feed(self, rss_url: str) -> List[str]:
+        try:
+            return self._parse_page(self.fetcher.fetch_page(rss_url), self._parse_rss_links)
+        except Exception as e:
+            return []
+    
+    def _parse_rss_links(self, content: bytes, url: str) -> List[str]:
         links = []
         try:
-            response = self.session.get(rss_url, timeout=10)
-            response.raise_for_status()
-            root = ET.fromstring(response.content)
+            root = ET.fromstring(content)
             
             for item in root.findall('.//item'):
                 link_elem = item.find('link')
@@ -112,315 +256,215 @@ class NewsCollector:
         
         return links
     
-    def _fetch_bbc_article(self, url: str) -> Dict:
+    def _parse_category_page(self, source: Dict, base_url: str) -> List[str]:
+        extract = extract_links if self.parser_backend == 'lxml' else self._parse_category_links
+        parse = lambda content, url: extract(content, url, source['link_pattern'], source['min_link_length'])
+        return self._parse_page(self.fetcher.fetch_page(base_url), parse)
+    
+    def _parse_category_links(self, content: bytes, url: str, link_pattern: str, min_link_length: int) -> List[str]:
+        soup = BeautifulSoup(content, 'html.parser')
+        
+        links = set()
+        for link in soup.find_all('a', href=True):
+            href = link.get('href')
+            if href and link_pattern in href and href.startswith('/') and len(href) > min_link_length:
+                links.add(urljoin(url, href))
+        return sorted(links)
+    
+    def _fetch_article(self, key: str, url: str) -> Dict:
         try:
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            title_elem = soup.find('h1')
-            title = title_elem.get_text(strip=True) if title_elem else ""
-            
-            article_body = soup.find('article') or soup.find('div', {'data-component': 'text-block'})
-            if not article_body:
-                article_body = soup.find('div', class_=re.compile('story-body|article-body'))
-            
-            paragraphs = []
-            if article_body:
-                for p in article_body.find_all(['p', 'div'], class_=re.compile('paragraph|text')):
-                    text = p.get_text(strip=True)
-                    if text and len(text) > 20:
-                        paragraphs.append(text)
-            
-            if not paragraphs:
-                for p in soup.find_all('p'):
-                    text = p.get_text(strip=True)
-                    if len(text) > 50:
-                        paragraphs.append(text)
-            
-            text = ' '.join(paragraphs)
-            
-            if len(text) < 200:
-                return None
-            
-            return {
-                'title': title,
-                'text': text,
-                'url': url,
-                'source': 'BBC'
-            }
+            return self._parse_page(self.fetcher.fetch_page(url), self.parsers[key])
         except Exception as e:
             return None
     
-    def collect_guardian_news(self, num_articles: int = 500) -> List[Dict]:
-        articles = []
-        all_links = set()
+    def _fetch_bbc_article(self, url: str) -> Dict:
+        return self._fetch_article('bbc', url)
+    
+    def _fetch_guardian_article(self, url: str) -> Dict:
+        return self._fetch_article('guardian', url)
+    
+    def _fetch_fox_article(self, url: str) -> Dict:
+        return self._fetch_article('fox', url)
+    
+    def _parse_bbc_article(self, content: bytes, url: str) -> Dict:
+        soup = BeautifulSoup(content, 'html.parser')
         
-        rss_feeds = [
-            "https://www.theguardian.com/world/rss",
-            "https://www.theguardian.com/uk/rss",
-            "https://www.theguardian.com/business/rss",
-            "https://www.theguardian.com/technology/rss",
-            "https://www.theguardian.com/science/rss",
-            "https://www.theguardian.com/culture/rss",
-            "https://www.theguardian.com/politics/rss",
-            "https://www.theguardian.com/sport/rss"
-        ]
+        title_elem = soup.find('h1')
+        title = title_elem.get_text(strip=True) if title_elem else ""
         
-        print("Collecting links from Guardian RSS feeds...")
-        for rss_url in rss_feeds:
-            try:
-                links = self._parse_rss_feed(rss_url)
-                all_links.update(links)
-                print(f"Found {len(links)} links from {rss_url}")
-                time.sleep(0.5)
-            except Exception as e:
-                print(f"Error fetching RSS feed {rss_url}: {e}")
-                continue
+        article_body = soup.find('article') or soup.find('div', {'data-component': 'text-block'})
+        if not article_body:
+            article_body = soup.find('div', class_=re.compile('story-body|article-body'))
         
-        base_urls = [
-            "https://www.theguardian.com/international",
-            "https://www.theguardian.com/uk",
-            "https://www.theguardian.com/world",
-            "https://www.theguardian.com/business",
-            "https://www.theguardian.com/technology"
-        ]
+        paragraphs = []
+        if article_body:
+            for p in article_body.find_all(['p', 'div'], class_=re.compile('paragraph|text')):
+                text = p.get_text(strip=True)
+                if text and len(text) > 20:
+                    paragraphs.append(text)
         
-        print("Collecting links from Guardian category pages...")
-        for base_url in base_urls:
-            if len(all_links) >= num_articles * 3:
-                break
-            try:
-                response = self.session.get(base_url, timeout=10)
-                response.raise_for_status()
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                for link in soup.find_all('a', href=True):
-                    href = link.get('href')
-                    if href and '/202' in href and href.startswith('/') and len(href) > 10:
-                        full_url = f"https://www.theguardian.com{href}"
-                        all_links.add(full_url)
-                
-                time.sleep(1)
-            except Exception as e:
-                print(f"Error fetching {base_url}: {e}")
-                continue
+        if not paragraphs:
+            for p in soup.find_all('p'):
+                text = p.get_text(strip=True)
+                if len(text) > 50:
+                    paragraphs.append(text)
         
-        print(f"Found {len(all_links)} total potential Guardian article links")
+        text = ' '.join(paragraphs)
         
-        links = list(all_links)
-        for url in links:
-            if len(articles) >= num_articles:
-                break
-            
-            if url in self.collected_urls:
-                continue
-            
-            try:
-                article = self._fetch_guardian_article(url)
-                if article and article.get('text') and len(article['text']) > 200:
-                    articles.append(article)
-                    self.collected_urls.add(url)
-                    if len(articles) % 25 == 0:
-                        print(f"Collected {len(articles)}/{num_articles} Guardian articles")
-                
-                time.sleep(0.3)
-            except Exception as e:
-                continue
+        if len(text) < 200:
+            return None
         
-        return articles
+        return {
+            'title': title,
+            'text': text,
+            'url': url,
+            'source': 'BBC'
+        }
     
-    def _fetch_guardian_article(self, url: str) -> Dict:
-        try:
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            title_elem = soup.find('h1')
-            title = title_elem.get_text(strip=True) if title_elem else ""
-            
-            article_body = soup.find('div', {'data-gu-name': 'body'}) or soup.find('div', class_=re.compile('article-body'))
-            
-            paragraphs = []
-            if article_body:
-                for p in article_body.find_all('p'):
-                    text = p.get_text(strip=True)
-                    if text and len(text) > 20:
-                        paragraphs.append(text)
-            
-            if not paragraphs:
-                for p in soup.find_all('p', class_=re.compile('paragraph')):
-                    text = p.get_text(strip=True)
-                    if len(text) > 50:
-                        paragraphs.append(text)
-            
-            text = ' '.join(paragraphs)
-            
-            if len(text) < 200:
-                return None
-            
-            return {
-                'title': title,
-                'text': text,
-                'url': url,
-                'source': 'Guardian'
-            }
-        except Exception as e:
+    def _parse_guardian_article(self, content: bytes, url: str) -> Dict:
+        soup = BeautifulSoup(content, 'html.parser')
+        
+        title_elem = soup.find('h1')
+        title = title_elem.get_text(strip=True) if title_elem else ""
+        
+        article_body = soup.find('div', {'data-gu-name': 'body'}) or soup.find('div', class_=re.compile('article-body'))
+        
+        paragraphs = []
+        if article_body:
+            for p in article_body.find_all('p'):
+                text = p.get_text(strip=True)
+                if text and len(text) > 20:
+                    paragraphs.append(text)
+        
+        if not paragraphs:
+            for p in soup.find_all('p', class_=re.compile('paragraph')):
+                text = p.get_text(strip=True)
+                if len(text) > 50:
+                    paragraphs.append(text)
+        
+        text = ' '.join(paragraphs)
+        
+        if len(text) < 200:
             return None
+        
+        return {
+            'title': title,
+            'text': text,
+            'url': url,
+            'source': 'Guardian'
+        }
     
-    def collect_fox_news(self, num_articles: int = 300) -> List[Dict]:
-        articles = []
-        all_links = set()
+    def _parse_fox_article(self, content: bytes, url: str) -> Dict:
+        soup = BeautifulSoup(content, 'html.parser')
         
-        rss_feeds = [
-            "https://feeds.foxnews.com/foxnews/latest",
-            "https://feeds.foxnews.com/foxnews/politics",
-            "https://feeds.foxnews.com/foxnews/world",
-            "https://feeds.foxnews.com/foxnews/business",
-            "https://feeds.foxnews.com/foxnews/tech",
-            "https://feeds.foxnews.com/foxnews/science",
-            "https://feeds.foxnews.com/foxnews/health",
-            "https://feeds.foxnews.com/foxnews/entertainment"
-        ]
+        title_elem = soup.find('h1') or soup.find('h2', class_=re.compile('headline'))
+        title = title_elem.get_text(strip=True) if title_elem else ""
         
-        print("Collecting links from Fox News RSS feeds...")
-        for rss_url in rss_feeds:
-            try:
-                links = self._parse_rss_feed(rss_url)
-                all_links.update(links)
-                print(f"Found {len(links)} links from {rss_url}")
-                time.sleep(0.5)
-            except Exception as e:
-                print(f"Error fetching RSS feed {rss_url}: {e}")
-                continue
+        article_body = soup.find('div', class_=re.compile('article-body|entry-content|article-text'))
         
-        base_urls = [
-            "https://www.foxnews.com",
-            "https://www.foxnews.com/politics",
-            "https://www.foxnews.com/world",
-            "https://www.foxnews.com/business",
-            "https://www.foxnews.com/tech"
-        ]
+        paragraphs = []
+        if article_body:
+            for p in article_body.find_all('p'):
+                text = p.get_text(strip=True)
+                if text and len(text) > 20:
+                    paragraphs.append(text)
         
-        print("Collecting links from Fox News category pages...")
-        for base_url in base_urls:
-            if len(all_links) >= num_articles * 3:
-                break
-            try:
-                response = self.session.get(base_url, timeout=10)
-                response.raise_for_status()
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                for link in soup.find_all('a', href=True):
-                    href = link.get('href')
-                    if href and '/202' in href and href.startswith('/'):
-                        if href.startswith('http'):
-                            full_url = href
-                        else:
-                            full_url = f"https://www.foxnews.com{href}"
-                        if 'foxnews.com' in full_url:
-                            all_links.add(full_url)
-                
-                time.sleep(1)
-            except Exception as e:
-                print(f"Error fetching {base_url}: {e}")
-                continue
+        if not paragraphs:
+            for p in soup.find_all('p', class_=re.compile('speakable|paragraph')):
+                text = p.get_text(strip=True)
+                if len(text) > 50:
+                    paragraphs.append(text)
         
-        print(f"Found {len(all_links)} total potential Fox News article links")
+        if not paragraphs:
+            for p in soup.find_all('p'):
+                text = p.get_text(strip=True)
+                if len(text) > 100:
+                    paragraphs.append(text)
         
-        links = list(all_links)
-        for url in links:
-            if len(articles) >= num_articles:
-                break
-            
-            if url in self.collected_urls:
-                continue
-            
-            try:
-                article = self._fetch_fox_article(url)
-                if article and article.get('text') and len(article['text']) > 200:
-                    articles.append(article)
-                    self.collected_urls.add(url)
-                    if len(articles) % 25 == 0:
-                        print(f"Collected {len(articles)}/{num_articles} Fox News articles")
-                
-                time.sleep(0.3)
-            except Exception as e:
-                continue
+        text = ' '.join(paragraphs)
         
-        return articles
-    
-    def _fetch_fox_article(self, url: str) -> Dict:
-        try:
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            title_elem = soup.find('h1') or soup.find('h2', class_=re.compile('headline'))
-            title = title_elem.get_text(strip=True) if title_elem else ""
-            
-            article_body = soup.find('div', class_=re.compile('article-body|entry-content|article-text'))
-            
-            paragraphs = []
-            if article_body:
-                for p in article_body.find_all('p'):
-                    text = p.get_text(strip=True)
-                    if text and len(text) > 20:
-                        paragraphs.append(text)
-            
-            if not paragraphs:
-                for p in soup.find_all('p', class_=re.compile('speakable|paragraph')):
-                    text = p.get_text(strip=True)
-                    if len(text) > 50:
-                        paragraphs.append(text)
-            
-            if not paragraphs:
-                for p in soup.find_all('p'):
-                    text = p.get_text(strip=True)
-                    if len(text) > 100:
-                        paragraphs.append(text)
-            
-            text = ' '.join(paragraphs)
-            
-            if len(text) < 200:
-                return None
-            
-            return {
-                'title': title,
-                'text': text,
-                'url': url,
-                'source': 'Fox News'
-            }
-        except Exception as e:
+        if len(text) < 200:
             return None
+        
+        return {
+            'title': title,
+            'text': text,
+            'url': url,
+            'source': 'Fox News'
+        }
     
     def save_articles(self, articles: List[Dict], filename: str = "articles.json"):
         filepath = os.path.join(self.output_dir, filename)
         with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(articles, f, ensure_ascii=False, indent=2)
+            if filename.endswith('.jsonl'):
+                for article in articles:
+                    f.write(json.dumps(article, ensure_ascii=False) + '\n')
+            else:
+                json.dump(articles, f, ensure_ascii=False, indent=2)
         print(f"Saved {len(articles)} articles to {filepath}")
     
-    def load_articles(self, filename: str = "articles.json") -> List[Dict]:
+    def load_articles(self, filename: str = "articles.json", num_samples: int = None) -> List[Dict]:
         filepath = os.path.join(self.output_dir, filename)
         if os.path.exists(filepath):
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return list(iter_articles(filepath, num_samples=num_samples))
         return []
+    
+    def close(self):
+        self.fetcher.close()
 
-if __name__ == "__main__":
-    collector = NewsCollector()
+def main():
+    parser = argparse.ArgumentParser(description='Collect news articles from BBC, Guardian and Fox News')
+    parser.add_argument('--output-dir', type=str, default='data', help='Directory to save articles in')
+    parser.add_argument('--output', type=str, default='articles.jsonl',
+                        help='File name; .jsonl appends new articles to the indexed store, .json rewrites the file')
+    parser.add_argument('--bbc', type=int, default=DEFAULT_COUNTS['bbc'], help='BBC articles to collect')
+    parser.add_argument('--guardian', type=int, default=DEFAULT_COUNTS['guardian'], help='Guardian articles to collect')
+    parser.add_argument('--fox', type=int, default=DEFAULT_COUNTS['fox'], help='Fox News articles to collect')
+    parser.add_argument('--sources', type=str, default=None,
+                        help='JSON file with source definitions (feeds, category pages) replacing the defaults')
+    parser.add_argument('--workers', type=int, default=16, help='Concurrent requests across all hosts')
+    parser.add_argument('--rate', type=float, default=4.0, help='Requests per second per host (0 disables)')
+    parser.add_argument('--burst', type=float, default=4.0, help='Requests a host may receive back to back')
+    parser.add_argument('--retries', type=int, default=3, help='Retries with exponential backoff per request')
+    parser.add_argument('--cache-dir', type=str, default='data/page_cache',
+                        help='Raw page cache used for conditional GETs on reruns')
+    parser.add_argument('--cache-max-mb', type=int, default=512, help='Cache size cap before LRU eviction')
+    parser.add_argument('--no-cache', action='store_true', help='Always download and parse every page')
+    parser.add_argument('--parser', type=str, default='lxml', choices=['lxml', 'bs4'],
+                        help="HTML extraction backend (bs4 is the original html.parser implementation)")
     
-    print("Collecting BBC news articles...")
-    bbc_articles = collector.collect_bbc_news(num_articles=500)
+    args = parser.parse_args()
     
-    print("Collecting Guardian news articles...")
-    guardian_articles = collector.collect_guardian_news(num_articles=400)
+    sources = None
+    if args.sources:
+        with open(args.sources, 'r', encoding='utf-8') as f:
+            sources = json.load(f)
     
-    print("Collecting Fox News articles...")
-    fox_articles = collector.collect_fox_news(num_articles=300)
+    store = ArticleStore(os.path.join(args.output_dir, args.output)) if args.output.endswith('.jsonl') else None
+    collector = NewsCollector(output_dir=args.output_dir, sources=sources, workers=args.workers, rate=args.rate,
+                              burst=args.burst, max_retries=args.retries,
+                              cache_dir=None if args.no_cache else args.cache_dir,
+                              cache_max_bytes=args.cache_max_mb * 2**20, parser_backend=args.parser, store=store)
+    counts = {key: num for key, num in [('bbc', args.bbc), ('guardian', args.guardian), ('fox', args.fox)]
+              if num > 0 and key in collector.sources}
     
-    all_articles = bbc_articles + guardian_articles + fox_articles
-    print(f"Total articles collected: {len(all_articles)}")
+    start_time = time.time()
+    try:
+        all_articles = collector.collect_all(counts)
+    finally:
+        collector.close()
     
-    collector.save_articles(all_articles, "articles.json")
+    stats = collector.fetcher.stats
+    print(f"Total articles collected: {len(all_articles)} in {time.time() - start_time:.1f}s "
+          f"({stats['requests']} requests, {stats['retries']} retried, {stats['not_modified']} not modified, "
+          f"{stats['bytes_downloaded'] / 2**20:.1f} MiB downloaded, "
+          f"{collector.parse_stats['parsed']} pages parsed, {collector.parse_stats['reused']} reused)")
+    
+    if store is not None:
+        print(f"Appended {len(all_articles)} new articles to {store.path} ({len(store)} in total)")
+        store.close()
+    else:
+        collector.save_articles(all_articles, args.output)
 
+if __name__ == "__main__":
+    main()
@@ -1,59 +1,96 @@
+import numpy as np
 import pandas as pd
-from typing import List, Dict
-from evaluation import RougeEvaluator
+from typing import Callable, List, Dict
+from report_aggregates import LOW_SCORE, HIGH_SCORE
+
+METHODS = ['TF-IDF', 'TextRank', 'Lead-3', 'BART', 'T5']
+TEXT_FIELDS = ['article_id', 'title']
 
 class ErrorAnalyzer:
-    def __init__(self):
-        self.evaluator = RougeEvaluator()
+    def __init__(self, threshold: float = LOW_SCORE, high_threshold: float = HIGH_SCORE, num_examples: int = 2,
+                 histogram_bins: int = 10):
+        self.threshold = threshold
+        self.high_threshold = high_threshold
+        self.num_examples = num_examples
+        self.histogram_bins = histogram_bins
     
-    def find_error_cases(self, results_df: pd.DataFrame, method: str, 
-                        threshold: float = 0.3) -> List[Dict]:
-        rouge_col = f'{method}_rouge1_f1'
-        summary_col = f'{method}_summary'
+    def _examples(self, results_df: pd.DataFrame, method: str, rows: np.ndarray,
+                  text_loader: Callable = None) -> List[Dict]:
+        # Only the selected rows are read; text columns missing from the frame come from text_loader
+        rows = [int(row) for row in rows]
+        
+        def values(column, default):
+            if column in results_df.columns:
+                return results_df[column].to_numpy()[rows].tolist()
+            if text_loader is not None and (column in TEXT_FIELDS or column.endswith('_summary')):
+                return text_loader(column, rows)
+            return [default] * len(rows)
         
+        fields = {
+            'article_id': values('article_id', ''),
+            'title': values('title', ''),
+            'rouge1_score': values(f'{method}_rouge1_f1', 0),
+            'rouge2_score': values(f'{method}_rouge2_f1', 0),
+            'rougeL_score': values(f'{method}_rougeL_f1', 0),
+            'summary': values(f'{method}_summary', ''),
+            'text_length': values('text_length', 0),
+            'num_sentences': values('num_sentences', 0)
+        }
+        return [dict({'row_index': row}, **{name: column[i] for name, column in fields.items()})
+                for i, row in enumerate(rows)]
+    
+    def _worst_rows(self, scores: np.ndarray, k: int) -> np.ndarray:
+        # Lowest-scoring rows under the threshold, worst first; argpartition avoids sorting the whole column
+        candidates = np.flatnonzero(scores < self.threshold)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(scores[candidates], k - 1)[:k]]
+        return candidates[np.lexsort((candidates, scores[candidates]))]
+    
+    def find_error_cases(self, results_df: pd.DataFrame, method: str, threshold: float = None,
+                         num_examples: int = 5, text_loader: Callable = None) -> List[Dict]:
+        rouge_col = f'{method}_rouge1_f1'
         if rouge_col not in results_df.columns:
             return []
         
-        error_cases = results_df[results_df[rouge_col] < threshold].copy()
+        analyzer = self if threshold is None else ErrorAnalyzer(threshold, self.high_threshold)
+        scores = results_df[rouge_col].to_numpy(dtype=np.float64)
+        return self._examples(results_df, method, analyzer._worst_rows(scores, num_examples), text_loader)
+    
+    def analyze_errors(self, results_df: pd.DataFrame, text_loader: Callable = None) -> Dict:
+        methods = [m for m in METHODS if f'{m}_rouge1_f1' in results_df.columns]
+        if not methods:
+            return {}
         
-        error_examples = []
-        for idx, row in error_cases.head(5).iterrows():
-            error_examples.append({
-                'article_id': row.get('article_id', ''),
-                'title': row.get('title', ''),
-                'rouge1_score': row[rouge_col],
-                'rouge2_score': row.get(f'{method}_rouge2_f1', 0),
-                'rougeL_score': row.get(f'{method}_rougeL_f1', 0),
-                'summary': row.get(summary_col, ''),
-                'text_length': row.get('text_length', 0),
-                'num_sentences': row.get('num_sentences', 0)
-            })
+        # One (rows x methods) matrix of ROUGE-1 scores; every statistic is a column-wise reduction over it
+        scores = np.column_stack([results_df[f'{m}_rouge1_f1'].to_numpy(dtype=np.float64) for m in methods])
+        valid = ~np.isnan(scores)
+        counts = valid.sum(axis=0)
+        filled = np.where(valid, scores, 0.0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = filled.sum(axis=0) / counts
+        mins = np.where(valid, scores, np.inf).min(axis=0)
+        maxs = np.where(valid, scores, -np.inf).max(axis=0)
+        num_low = (scores < self.threshold).sum(axis=0)
+        num_high = (scores > self.high_threshold).sum(axis=0)
         
-        return error_examples
-    
-    def analyze_errors(self, results_df: pd.DataFrame) -> Dict:
-        methods = ['TF-IDF', 'TextRank', 'Lead-3', 'BART', 'T5']
+        bins = self.histogram_bins
+        bin_index = np.clip((filled * bins).astype(np.int64), 0, bins - 1) + np.arange(len(methods)) * bins
+        histograms = np.bincount(bin_index[valid], minlength=len(methods) * bins).reshape(len(methods), bins)
+        edges = np.linspace(0, 1, bins + 1).round(6).tolist()
         
         analysis = {}
-        
-        for method in methods:
-            rouge_col = f'{method}_rouge1_f1'
-            if rouge_col not in results_df.columns:
-                continue
-            
-            method_errors = self.find_error_cases(results_df, method)
-            
-            low_scores = results_df[results_df[rouge_col] < 0.3]
-            high_scores = results_df[results_df[rouge_col] > 0.7]
-            
+        for i, method in enumerate(methods):
+            has_scores = counts[i] > 0
             analysis[method] = {
-                'error_examples': method_errors[:2],
-                'num_low_scores': len(low_scores),
-                'num_high_scores': len(high_scores),
-                'avg_score': results_df[rouge_col].mean(),
-                'min_score': results_df[rouge_col].min(),
-                'max_score': results_df[rouge_col].max()
+                'error_examples': self._examples(results_df, method,
+                                                 self._worst_rows(scores[:, i], self.num_examples), text_loader),
+                'num_scored': int(counts[i]),
+                'num_low_scores': int(num_low[i]),
+                'num_high_scores': int(num_high[i]),
+                'avg_score': float(means[i]) if has_scores else float('nan'),
+                'min_score': float(mins[i]) if has_scores else float('nan'),
+                'max_score': float(maxs[i]) if has_scores else float('nan'),
+                'histogram': {'edges': edges, 'counts': histograms[i].tolist()}
             }
         
         return analysis
-
@@ -1,48 +1,178 @@
-from rouge_score import rouge_scorer
-from typing import List, Dict
-import numpy as np
+from rouge_score import rouge_scorer, tokenize
+from nltk.stem import porter
+import nltk
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+from typing import List, Dict, Iterable, Tuple
+import math
+import os
+from fast_lcs import score_lcs, summary_level_lcs
+from instrumentation import instrumentation, span
 
-class RougeEvaluator:
+SCORE_KEYS = [
+    'rouge1_precision',
+    'rouge1_recall',
+    'rouge1_f1',
+    'rouge2_precision',
+    'rouge2_recall',
+    'rouge2_f1',
+    'rougeL_precision',
+    'rougeL_recall',
+    'rougeL_f1',
+]
+
+LSUM_KEYS = [
+    'rougeLsum_precision',
+    'rougeLsum_recall',
+    'rougeLsum_f1',
+]
+
+class RunningStats:
     def __init__(self):
-        self.scorer = rouge_scorer.RougeScorer(['rouge1', 'rouge2', 'rougeL'], use_stemmer=True)
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+    
+    def update(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+    
+    def merge(self, other: 'RunningStats'):
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+    
+    def std(self) -> float:
+        return math.sqrt(self.m2 / self.count) if self.count else float('nan')
+
+class CachedStemTokenizer:
+    def __init__(self, use_stemmer: bool = True, cache_size: int = 100000):
+        self._stemmer = porter.PorterStemmer() if use_stemmer else None
+        if self._stemmer:
+            self.stem = lru_cache(maxsize=cache_size)(self._stemmer.stem)
+    
+    def tokenize(self, text: str) -> List[str]:
+        return tokenize.tokenize(text, self if self._stemmer else None)
+
+class RougeEvaluator:
+    def __init__(self, stem_cache_size: int = 100000, use_lsum: bool = False, split_summaries: bool = False):
+        # rougeLsum splits on newlines like RougeScorer's default; split_summaries=True splits with
+        # nltk.sent_tokenize instead, matching RougeScorer(split_summaries=True)
+        self.tokenizer = CachedStemTokenizer(use_stemmer=True, cache_size=stem_cache_size)
+        self.use_lsum = use_lsum
+        self.split_summaries = split_summaries
+        self.score_keys = SCORE_KEYS + LSUM_KEYS if use_lsum else SCORE_KEYS
+    
+    def _format_scores(self, scores: Dict) -> Dict[str, float]:
+        formatted = {}
+        for rouge_type, score in scores.items():
+            formatted[f'{rouge_type}_precision'] = score.precision
+            formatted[f'{rouge_type}_recall'] = score.recall
+            formatted[f'{rouge_type}_f1'] = score.fmeasure
+        return formatted
+    
+    def _tokenize_sentences(self, text: str) -> List[List[str]]:
+        sentences = nltk.sent_tokenize(text) if self.split_summaries else text.split('\n')
+        return [self.tokenizer.tokenize(s) for s in sentences if len(s)]
     
     def evaluate(self, reference: str, candidate: str) -> Dict[str, float]:
-        scores = self.scorer.score(reference, candidate)
+        return self.evaluate_many(reference, [candidate])[0]
+    
+    def evaluate_many(self, reference: str, candidates: List[str]) -> List[Dict[str, float]]:
+        with span('rouge.tokenize'):
+            reference_tokens = self.tokenizer.tokenize(reference)
+        with span('rouge.ngrams'):
+            reference_ngrams = {n: rouge_scorer._create_ngrams(reference_tokens, n) for n in (1, 2)}
+        if self.use_lsum:
+            with span('rouge.sentences'):
+                reference_sentences = self._tokenize_sentences(reference)
+        
+        results = []
+        for candidate in candidates:
+            with span('rouge.tokenize'):
+                candidate_tokens = self.tokenizer.tokenize(candidate)
+            with span('rouge.ngrams'):
+                scores = {
+                    'rouge1': rouge_scorer._score_ngrams(reference_ngrams[1],
+                                                         rouge_scorer._create_ngrams(candidate_tokens, 1)),
+                    'rouge2': rouge_scorer._score_ngrams(reference_ngrams[2],
+                                                         rouge_scorer._create_ngrams(candidate_tokens, 2)),
+                }
+            with span('rouge.lcs'):
+                scores['rougeL'] = score_lcs(reference_tokens, candidate_tokens)
+            if self.use_lsum:
+                with span('rouge.sentences'):
+                    candidate_sentences = self._tokenize_sentences(candidate)
+                with span('rouge.lsum'):
+                    scores['rougeLsum'] = summary_level_lcs(reference_sentences, candidate_sentences)
+            results.append(self._format_scores(scores))
         
-        return {
-            'rouge1_precision': scores['rouge1'].precision,
-            'rouge1_recall': scores['rouge1'].recall,
-            'rouge1_f1': scores['rouge1'].fmeasure,
-            'rouge2_precision': scores['rouge2'].precision,
-            'rouge2_recall': scores['rouge2'].recall,
-            'rouge2_f1': scores['rouge2'].fmeasure,
-            'rougeL_precision': scores['rougeL'].precision,
-            'rougeL_recall': scores['rougeL'].recall,
-            'rougeL_f1': scores['rougeL'].fmeasure,
-        }
-    
-    def evaluate_batch(self, references: List[str], candidates: List[str]) -> Dict[str, float]:
-        all_scores = {
-            'rouge1_precision': [],
-            'rouge1_recall': [],
-            'rouge1_f1': [],
-            'rouge2_precision': [],
-            'rouge2_recall': [],
-            'rouge2_f1': [],
-            'rougeL_precision': [],
-            'rougeL_recall': [],
-            'rougeL_f1': [],
-        }
+        return results
+    
+    def evaluate_batch(self, references: Iterable[str], candidates: Iterable[str]) -> Dict[str, float]:
+        all_stats = {key: RunningStats() for key in self.score_keys}
         
         for ref, cand in zip(references, candidates):
             scores = self.evaluate(ref, cand)
-            for key in all_scores:
-                all_scores[key].append(scores[key])
+            for key in self.score_keys:
+                all_stats[key].update(scores[key])
+        
+        return _summarize_stats(all_stats)
+    
+    def evaluate_batch_parallel(self, references: Iterable[str], candidates: Iterable[str],
+                                num_workers: int = None, shard_size: int = 1000) -> Dict[str, float]:
+        num_workers = num_workers or os.cpu_count() or 1
+        all_stats = {key: RunningStats() for key in self.score_keys}
+        pairs = zip(references, candidates)
+        
+        def merge(futures):
+            for future in futures:
+                shard_stats, stage_snapshot = future.result()
+                for key, stats in shard_stats.items():
+                    all_stats[key].merge(stats)
+                instrumentation.merge_snapshot(stage_snapshot)
         
-        avg_scores = {}
-        for key in all_scores:
-            avg_scores[key] = np.mean(all_scores[key])
-            avg_scores[f'{key}_std'] = np.std(all_scores[key])
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            pending = set()
+            for shard in iter(lambda: list(islice(pairs, shard_size)), []):
+                pending.add(executor.submit(_score_shard, shard, self.use_lsum, instrumentation.enabled,
+                                            self.split_summaries))
+                if len(pending) >= num_workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    merge(done)
+            merge(pending)
         
-        return avg_scores
+        return _summarize_stats(all_stats)
 
+_worker_evaluator = None
+
+def _score_shard(pairs: List[Tuple[str, str]], use_lsum: bool = False, instrument: bool = False,
+                 split_summaries: bool = False) -> Tuple[Dict[str, RunningStats], Dict]:
+    global _worker_evaluator
+    instrumentation.enable(instrument)
+    if (_worker_evaluator is None or _worker_evaluator.use_lsum != use_lsum
+            or _worker_evaluator.split_summaries != split_summaries):
+        _worker_evaluator = RougeEvaluator(use_lsum=use_lsum, split_summaries=split_summaries)
+    
+    shard_stats = {key: RunningStats() for key in _worker_evaluator.score_keys}
+    for ref, cand in pairs:
+        scores = _worker_evaluator.evaluate(ref, cand)
+        for key in _worker_evaluator.score_keys:
+            shard_stats[key].update(scores[key])
+    
+    return shard_stats, instrumentation.drain() if instrument else None
+
+def _summarize_stats(all_stats: Dict[str, RunningStats]) -> Dict[str, float]:
+    avg_scores = {}
+    for key, stats in all_stats.items():
+        avg_scores[key] = stats.mean if stats.count else float('nan')
+        avg_scores[f'{key}_std'] = stats.std()
+    
+    return avg_scores
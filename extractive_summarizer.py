@@ -4,6 +4,7 @@ from sklearn.metrics.pairwise import cosine_similarity
 import networkx as nx
 from typing import List
 from preprocessing import TextPreprocessor
+from instrumentation import span
 
 class TFIDFSummarizer:
     def __init__(self, preprocessor: TextPreprocessor = None):
@@ -11,17 +12,20 @@ class TFIDFSummarizer:
         self.vectorizer = TfidfVectorizer(stop_words='english', max_features=5000)
     
     def summarize(self, text: str, num_sentences: int = 3) -> str:
-        sentences = self.preprocessor.segment_sentences(text)
-        
+        return self.summarize_sentences(self.preprocessor.segment_sentences(text), num_sentences)
+    
+    def summarize_sentences(self, sentences: List[str], num_sentences: int = 3) -> str:
         if len(sentences) <= num_sentences:
             return ' '.join(sentences)
         
         try:
-            tfidf_matrix = self.vectorizer.fit_transform(sentences)
-            sentence_scores = np.array(tfidf_matrix.sum(axis=1)).flatten()
-            
-            top_indices = np.argsort(sentence_scores)[-num_sentences:]
-            top_indices = sorted(top_indices)
+            with span('tfidf.fit'):
+                tfidf_matrix = self.vectorizer.fit_transform(sentences)
+            with span('tfidf.rank'):
+                sentence_scores = np.array(tfidf_matrix.sum(axis=1)).flatten()
+                
+                top_indices = np.argsort(sentence_scores)[-num_sentences:]
+                top_indices = sorted(top_indices)
             
             summary_sentences = [sentences[i] for i in top_indices]
             return ' '.join(summary_sentences)
@@ -35,8 +39,10 @@ class TextRankSummarizer:
     
     def _build_similarity_matrix(self, sentences: List[str]) -> np.ndarray:
         try:
-            tfidf_matrix = self.vectorizer.fit_transform(sentences)
-            similarity_matrix = cosine_similarity(tfidf_matrix)
+            with span('textrank.tfidf'):
+                tfidf_matrix = self.vectorizer.fit_transform(sentences)
+            with span('textrank.cosine'):
+                similarity_matrix = cosine_similarity(tfidf_matrix)
             return similarity_matrix
         except:
             n = len(sentences)
@@ -62,14 +68,16 @@ class TextRankSummarizer:
         return pagerank
     
     def summarize(self, text: str, num_sentences: int = 3) -> str:
-        sentences = self.preprocessor.segment_sentences(text)
-        
+        return self.summarize_sentences(self.preprocessor.segment_sentences(text), num_sentences)
+    
+    def summarize_sentences(self, sentences: List[str], num_sentences: int = 3) -> str:
         if len(sentences) <= num_sentences:
             return ' '.join(sentences)
         
         try:
             similarity_matrix = self._build_similarity_matrix(sentences)
-            scores = self._calculate_pagerank(similarity_matrix)
+            with span('textrank.pagerank'):
+                scores = self._calculate_pagerank(similarity_matrix)
             
             top_indices = np.argsort(scores)[-num_sentences:]
             top_indices = sorted(top_indices)
@@ -84,6 +92,8 @@ class LeadKSummarizer:
         self.preprocessor = preprocessor or TextPreprocessor()
     
     def summarize(self, text: str, num_sentences: int = 3) -> str:
-        sentences = self.preprocessor.segment_sentences(text)
+        return self.summarize_sentences(self.preprocessor.segment_sentences(text), num_sentences)
+    
+    def summarize_sentences(self, sentences: List[str], num_sentences: int = 3) -> str:
         return ' '.join(sentences[:num_sentences])
 
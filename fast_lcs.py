@@ -0,0 +1,111 @@
+import collections
+from typing import List, Dict
+from rouge_score import scoring
+
+# int.bit_count is Python 3.10+; bin().count is the slower fallback for older interpreters
+_popcount = getattr(int, 'bit_count', None) or (lambda x: bin(x).count('1'))
+
+def _match_masks(ref: List[str]) -> Dict[str, int]:
+    masks = {}
+    for i, token in enumerate(ref):
+        masks[token] = masks.get(token, 0) | (1 << i)
+    return masks
+
+def _lcs_rows(ref: List[str], can: List[str], masks: Dict[str, int] = None) -> List[int]:
+    masks = masks if masks is not None else _match_masks(ref)
+    full = (1 << len(ref)) - 1
+    row = full
+    rows = [row]
+    
+    for token in can:
+        match = masks.get(token)
+        if match:
+            u = row & match
+            row = ((row + u) | (row - u)) & full
+        rows.append(row)
+    
+    return rows
+
+def lcs_length(ref: List[str], can: List[str]) -> int:
+    if not ref or not can:
+        return 0
+    
+    masks = _match_masks(ref)
+    full = (1 << len(ref)) - 1
+    row = full
+    
+    for token in can:
+        match = masks.get(token)
+        if match:
+            u = row & match
+            row = ((row + u) | (row - u)) & full
+    
+    return len(ref) - _popcount(row)
+
+def lcs_indices(ref: List[str], can: List[str], masks: Dict[str, int] = None) -> List[int]:
+    rows = _lcs_rows(ref, can, masks)
+    
+    def table(i: int, j: int) -> int:
+        return i - _popcount(rows[j] & ((1 << i) - 1))
+    
+    i = len(ref)
+    j = len(can)
+    lcs = []
+    while i > 0 and j > 0:
+        if ref[i - 1] == can[j - 1]:
+            lcs.append(i - 1)
+            i -= 1
+            j -= 1
+        elif table(i, j - 1) > table(i - 1, j):
+            j -= 1
+        else:
+            i -= 1
+    
+    lcs.reverse()
+    return lcs
+
+def score_lcs(target_tokens: List[str], prediction_tokens: List[str]) -> scoring.Score:
+    if not target_tokens or not prediction_tokens:
+        return scoring.Score(precision=0, recall=0, fmeasure=0)
+    
+    lcs = lcs_length(target_tokens, prediction_tokens)
+    
+    precision = lcs / len(prediction_tokens)
+    recall = lcs / len(target_tokens)
+    fmeasure = scoring.fmeasure(precision, recall)
+    
+    return scoring.Score(precision=precision, recall=recall, fmeasure=fmeasure)
+
+def summary_level_lcs(ref_sent: List[List[str]], can_sent: List[List[str]]) -> scoring.Score:
+    if not ref_sent or not can_sent:
+        return scoring.Score(precision=0, recall=0, fmeasure=0)
+    
+    m = sum(map(len, ref_sent))
+    n = sum(map(len, can_sent))
+    if not n or not m:
+        return scoring.Score(precision=0, recall=0, fmeasure=0)
+    
+    token_cnts_r = collections.Counter()
+    token_cnts_c = collections.Counter()
+    for s in ref_sent:
+        token_cnts_r.update(s)
+    for s in can_sent:
+        token_cnts_c.update(s)
+    
+    hits = 0
+    for r in ref_sent:
+        masks = _match_masks(r)
+        union = set()
+        for c in can_sent:
+            union.update(lcs_indices(r, c, masks))
+        
+        for t in (r[i] for i in sorted(union)):
+            if token_cnts_c[t] > 0 and token_cnts_r[t] > 0:
+                hits += 1
+                token_cnts_c[t] -= 1
+                token_cnts_r[t] -= 1
+    
+    recall = hits / m
+    precision = hits / n
+    fmeasure = scoring.fmeasure(precision, recall)
+    return scoring.Score(precision=precision, recall=recall, fmeasure=fmeasure)
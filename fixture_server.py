@@ -0,0 +1,307 @@
+import os
+import json
+import time
+import zlib
+import hashlib
+import random
+import argparse
+import threading
+from html import escape
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+from typing import Dict, List, Tuple
+from benchmark_suite import NewsArticleGenerator
+
+CATEGORIES = ['world', 'business', 'technology', 'politics']
+
+NAV_LINKS = ['home', 'sport', 'weather', 'culture', 'travel', 'video', 'live', 'newsletters', 'podcasts', 'about']
+
+SOURCE_LAYOUT = {
+    'bbc': {
+        'name': 'BBC',
+        'rss': '/bbc/feeds/{category}/rss.xml',
+        'category': '/bbc/news/{category}',
+        'article': '/bbc/news/{category}-{index}',
+        'link_pattern': '/news/',
+        'min_link_length': 10,
+        'rss_query': '?at_medium=RSS&at_campaign=rss'
+    },
+    'guardian': {
+        'name': 'Guardian',
+        'rss': '/guardian/{category}/rss',
+        'category': '/guardian/{category}',
+        'article': '/guardian/{category}/2024/mar/05/story-{index}',
+        'link_pattern': '/202',
+        'min_link_length': 10
+    },
+    'fox': {
+        'name': 'Fox News',
+        'rss': '/fox/feeds/{category}',
+        'category': '/fox/{category}',
+        'article': '/fox/{category}/2024/story-{index}',
+        'link_pattern': '/202',
+        'min_link_length': 0
+    }
+}
+
+def _page(title: str, body: str, noise: str) -> str:
+    nav = ''.join(f'<li><a href="/{item}">{item.title()}</a></li>' for item in NAV_LINKS)
+    return (f'<!DOCTYPE html><html lang="en"><head><meta charset="utf-8"><title>{escape(title)}</title>'
+            f'<script>window.__DATA__ = {json.dumps({"title": title, "noise": noise})};</script>'
+            f'<style>body {{ font-family: sans-serif; }}</style></head><body>'
+            f'<header><nav><ul>{nav}</ul></nav><p>Skip to content</p></header>'
+            f'<main>{body}</main>'
+            f'<aside><h2>Most read</h2><ul>{noise}</ul></aside>'
+            f'<footer><p>Copyright 2024.</p><p>Cookies</p><p>Privacy policy</p></footer></body></html>')
+
+def _article_body(key: str, title: str, paragraphs: List[str]) -> str:
+    if key == 'bbc':
+        blocks = ''.join(f'<div data-component="text-block"><p class="ssrcss-paragraph">{escape(p)}</p></div>'
+                         for p in paragraphs)
+        return f'<article><header><h1 id="main-heading">{escape(title)}</h1></header>{blocks}</article>'
+    if key == 'guardian':
+        blocks = ''.join(f'<p class="dcr-s3ycb2">{escape(p)}</p>' for p in paragraphs)
+        return (f'<div data-gu-name="headline"><h1>{escape(title)}</h1></div>'
+                f'<div data-gu-name="body"><div class="article-body-commercial-selector">{blocks}</div></div>')
+    blocks = ''.join(f'<p>{escape(p)}</p>' for p in paragraphs)
+    return (f'<div class="article-header"><h1 class="headline">{escape(title)}</h1></div>'
+            f'<div class="article-content"><div class="article-body">{blocks}</div></div>')
+
+class FixtureSite:
+    def __init__(self, base_url: str, articles_per_source: int = 60, seed: int = 0):
+        self.base_url = base_url.rstrip('/')
+        self.pages: Dict[str, Tuple[str, bytes, float, str]] = {}
+        self.articles: List[Dict] = []
+        self.created = float(int(time.time()))
+        self._article_pages = {}
+        generator = NewsArticleGenerator(seed)
+        rng = random.Random(seed)
+        
+        for offset, (key, layout) in enumerate(SOURCE_LAYOUT.items()):
+            by_category = {category: [] for category in CATEGORIES}
+            for index in range(articles_per_source):
+                category = CATEGORIES[index % len(CATEGORIES)]
+                generated = generator.article(rng.randint(8, 30), index=offset * 100000 + index)
+                paragraphs = generated['text'].split('\n\n')
+                path = layout['article'].format(category=category, index=index)
+                noise = ''.join(f'<li><a href="/{key}/most-read-{i}">{escape(generator.sentence(rng))}</a></li>'
+                                for i in range(8))
+                
+                self._add(path, 'text/html; charset=utf-8',
+                          _page(generated['title'], _article_body(key, generated['title'], paragraphs), noise))
+                by_category[category].append((path, generated['title']))
+                self._article_pages[path] = (key, generated['title'], paragraphs, noise, len(self.articles))
+                self.articles.append({
+                    'title': generated['title'],
+                    'text': ' '.join(paragraphs),
+                    'url': self.base_url + path,
+                    'source': layout['name']
+                })
+            
+            for category, entries in by_category.items():
+                half = entries[:(len(entries) + 1) // 2]
+                query = escape(layout.get('rss_query', ''))
+                items = ''.join(f'<item><title>{escape(title)}</title><link>{self.base_url}{path}{query}</link></item>'
+                                for path, title in half)
+                self._add(layout['rss'].format(category=category), 'application/rss+xml',
+                          f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+                          f'<title>{layout["name"]} {category}</title>{items}</channel></rss>')
+                
+                links = ''.join(f'<li><a href="{path}">{escape(title)}</a></li>' for path, title in entries)
+                self._add(layout['category'].format(category=category), 'text/html; charset=utf-8',
+                          _page(category.title(), f'<ul class="stories">{links}</ul>', ''))
+    
+    def _add(self, path: str, content_type: str, body: str, modified: float = None):
+        body = body.encode('utf-8')
+        etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+        self.pages[path] = (content_type, body, modified or self.created, etag)
+    
+    def update_article(self, path: str, paragraph: str):
+        key, title, paragraphs, noise, index = self._article_pages[path]
+        paragraphs = paragraphs + [paragraph]
+        self._article_pages[path] = (key, title, paragraphs, noise, index)
+        self.articles[index]['text'] = ' '.join(paragraphs)
+        
+        # HTTP dates have one-second resolution, so make sure Last-Modified moves forward
+        modified = max(float(int(time.time())), self.pages[path][2] + 1)
+        self._add(path, 'text/html; charset=utf-8', _page(title, _article_body(key, title, paragraphs), noise), modified)
+    
+    def article_paths(self) -> List[str]:
+        return list(self._article_pages)
+    
+    def sources(self) -> Dict[str, Dict]:
+        return {
+            key: {
+                'name': layout['name'],
+                'rss_feeds': [self.base_url + layout['rss'].format(category=c) for c in CATEGORIES],
+                'base_urls': [self.base_url + layout['category'].format(category=c) for c in CATEGORIES],
+                'link_pattern': layout['link_pattern'],
+                'min_link_length': layout['min_link_length']
+            }
+            for key, layout in SOURCE_LAYOUT.items()
+        }
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    
+    def do_GET(self):
+        server = self.server.fixture
+        path = urlsplit(self.path).path
+        server.begin_request(path)
+        try:
+            if server.latency:
+                time.sleep(server.latency)
+            
+            page = server.site.pages.get(path)
+            if page is None:
+                self._send(404, 'text/plain', b'not found')
+            elif server.should_fail(path):
+                self._send(503, 'text/plain', b'try again', {'Retry-After': '0'})
+            else:
+                content_type, body, modified, etag = page
+                validators = {'ETag': etag, 'Last-Modified': formatdate(modified, usegmt=True)}
+                if not server.validators:
+                    self._send(200, content_type, body)
+                elif self._not_modified(modified, etag):
+                    server.count_not_modified()
+                    self.send_response(304)
+                    for name, value in validators.items():
+                        self.send_header(name, value)
+                    self.end_headers()
+                else:
+                    self._send(200, content_type, body, validators)
+        finally:
+            server.end_request()
+    
+    def _not_modified(self, modified: float, etag: str) -> bool:
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            return etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+        
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since is None:
+            return False
+        try:
+            return modified <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    
+    def _send(self, status: int, content_type: str, body: bytes, headers: Dict[str, str] = None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.fixture.count_bytes(len(body))
+    
+    def log_message(self, format, *args):
+        pass
+
+class FixtureServer:
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, articles_per_source: int = 60, latency: float = 0.0,
+                 fail_every: int = 0, seed: int = 0, validators: bool = True):
+        self.httpd = ThreadingHTTPServer((host, port), _FixtureHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.fixture = self
+        self.base_url = f"http://{host}:{self.httpd.server_address[1]}"
+        self.site = FixtureSite(self.base_url, articles_per_source, seed)
+        self.latency = latency
+        self.fail_every = fail_every
+        self.validators = validators
+        self.request_counts: Dict[str, int] = {}
+        self.bytes_sent = 0
+        self.not_modified = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self.thread = None
+    
+    def begin_request(self, path: str):
+        with self.lock:
+            self.request_counts[path] = self.request_counts.get(path, 0) + 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+    
+    def end_request(self):
+        with self.lock:
+            self.in_flight -= 1
+    
+    def count_bytes(self, size: int):
+        with self.lock:
+            self.bytes_sent += size
+    
+    def count_not_modified(self):
+        with self.lock:
+            self.not_modified += 1
+    
+    def reset_counters(self):
+        with self.lock:
+            self.request_counts = {}
+            self.bytes_sent = 0
+            self.not_modified = 0
+            self.max_in_flight = self.in_flight
+    
+    def should_fail(self, path: str) -> bool:
+        # Every fail_every-th page answers 503 the first time it is requested, to exercise retries
+        if not self.fail_every:
+            return False
+        return self.request_counts[path] == 1 and zlib.crc32(path.encode('utf-8')) % self.fail_every == 0
+    
+    @property
+    def total_requests(self) -> int:
+        return sum(self.request_counts.values())
+    
+    def sources(self) -> Dict[str, Dict]:
+        return self.site.sources()
+    
+    def start(self) -> 'FixtureServer':
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+    
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for the news sites, serving fixture feeds and pages')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='Interface to bind')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on')
+    parser.add_argument('--articles', type=int, default=60, help='Articles per source')
+    parser.add_argument('--latency', type=float, default=0.05, help='Seconds added to every response')
+    parser.add_argument('--fail-every', type=int, default=0,
+                        help='Answer 503 to the first request of roughly one page in N (0 disables)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the generated articles')
+    parser.add_argument('--no-validators', action='store_true',
+                        help='Send no ETag / Last-Modified and ignore conditional request headers')
+    parser.add_argument('--write-sources', type=str, default='results/fixture_sources.json',
+                        help='Where to write the source definitions for data_collector.py --sources')
+    
+    args = parser.parse_args()
+    
+    server = FixtureServer(args.host, args.port, args.articles, args.latency, args.fail_every, args.seed,
+                           validators=not args.no_validators)
+    os.makedirs(os.path.dirname(args.write_sources) or '.', exist_ok=True)
+    with open(args.write_sources, 'w', encoding='utf-8') as f:
+        json.dump(server.sources(), f, indent=2)
+    
+    print(f"Serving {len(server.site.pages)} fixture pages on {server.base_url}")
+    print(f"Source definitions written to {args.write_sources}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -1,67 +1,108 @@
 import json
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from error_analysis import ErrorAnalyzer
+import hashlib
 import os
+from typing import Callable, Dict
+from results_store import ResultsStore
+from instrumentation import format_stage_table
+from memory_profiling import format_memory_table, format_top_allocators
 
-def generate_full_report(results_csv_path: str = "results/detailed_results.csv",
-                        output_path: str = "results/full_report.md"):
-    df = pd.read_csv(results_csv_path)
-    
-    methods = ['TF-IDF', 'TextRank', 'Lead-3', 'BART', 'T5']
-    
-    error_analyzer = ErrorAnalyzer()
-    error_analysis = error_analyzer.analyze_errors(df)
-    
-    os.makedirs("results/figures", exist_ok=True)
+METHODS = ['TF-IDF', 'TextRank', 'Lead-3', 'BART', 'T5']
+FIGURES_DIR = "results/figures"
+FIGURE_DPI = 300
+
+def render_figure(path: str, inputs: Dict, draw: Callable, hashes: Dict) -> bool:
+    # Figures are redrawn only when the data they plot changes; matplotlib is imported on first use
+    digest = hashlib.sha256(json.dumps({'inputs': inputs, 'dpi': FIGURE_DPI, 'draw': draw.__name__},
+                                       sort_keys=True).encode('utf-8')).hexdigest()
+    if hashes.get(path) == digest and os.path.exists(path):
+        return False
     
+    import matplotlib.pyplot as plt
+    draw(plt, inputs)
+    plt.tight_layout()
+    plt.savefig(path, dpi=FIGURE_DPI, bbox_inches='tight')
+    plt.close()
+    hashes[path] = digest
+    return True
+
+def draw_rouge_scores(plt, inputs: Dict):
     fig, axes = plt.subplots(1, 3, figsize=(15, 5))
+    for ax, (metric, title) in zip(axes, [('rouge1', 'ROUGE-1 F1 Scores'), ('rouge2', 'ROUGE-2 F1 Scores'),
+                                          ('rougeL', 'ROUGE-L F1 Scores')]):
+        ax.bar(inputs['methods'], inputs[metric])
+        ax.set_title(title)
+        ax.set_ylabel('Score')
+        ax.set_ylim(0, 1)
+
+def draw_processing_times(plt, inputs: Dict):
+    plt.figure(figsize=(10, 6))
+    plt.bar(inputs['methods'], inputs['times'])
+    plt.title('Average Processing Time per Article')
+    plt.ylabel('Time (seconds)')
+    plt.xlabel('Method')
+
+def load_error_analysis(store: ResultsStore, run_id: str, aggregates: Dict) -> Dict:
+    error_analysis = aggregates.get('error_analysis')
+    if error_analysis is None:
+        # Runs stored without their error analysis: compute it once from the score columns (text is read
+        # only for the selected examples) and cache it
+        from error_analysis import ErrorAnalyzer
+        columns = [c for c, dtype in store.columns(run_id).items()
+                   if dtype != 'text' and (c.endswith('_f1') or c in ('text_length', 'num_sentences'))]
+        error_analysis = ErrorAnalyzer().analyze_errors(
+            store.load_frame(columns, run_ids=[run_id]),
+            text_loader=lambda column, rows: store.load_text(column, rows, run_id))
+        store.save_error_analysis(run_id, error_analysis)
+    return error_analysis
+
+def generate_full_report(results_dir: str = "results/store",
+                        output_path: str = "results/full_report.md",
+                        stage_latencies_path: str = None,
+                        memory_profile_path: str = None):
+    store = ResultsStore(results_dir)
+    run_id = store.latest_run()
+    aggregates = store.aggregates(run_id)
+    columns = aggregates['columns']
+    mean = lambda column: columns[column]['mean']
+    # Rounded so that re-aggregating the same rows in different chunks does not change a figure's hash
+    plotted = lambda column: round(mean(column), 10)
     
-    rouge1_scores = [df[f'{m}_rouge1_f1'].mean() for m in methods if f'{m}_rouge1_f1' in df.columns]
-    rouge2_scores = [df[f'{m}_rouge2_f1'].mean() for m in methods if f'{m}_rouge2_f1' in df.columns]
-    rougeL_scores = [df[f'{m}_rougeL_f1'].mean() for m in methods if f'{m}_rougeL_f1' in df.columns]
-    method_labels = [m for m in methods if f'{m}_rouge1_f1' in df.columns]
-    
-    axes[0].bar(method_labels, rouge1_scores)
-    axes[0].set_title('ROUGE-1 F1 Scores')
-    axes[0].set_ylabel('Score')
-    axes[0].set_ylim(0, 1)
+    methods = METHODS
+    error_analysis = load_error_analysis(store, run_id, aggregates)
     
-    axes[1].bar(method_labels, rouge2_scores)
-    axes[1].set_title('ROUGE-2 F1 Scores')
-    axes[1].set_ylabel('Score')
-    axes[1].set_ylim(0, 1)
+    os.makedirs(FIGURES_DIR, exist_ok=True)
+    hashes_path = os.path.join(FIGURES_DIR, 'figure_hashes.json')
+    hashes = {}
+    if os.path.exists(hashes_path):
+        with open(hashes_path, 'r', encoding='utf-8') as f:
+            hashes = json.load(f)
     
-    axes[2].bar(method_labels, rougeL_scores)
-    axes[2].set_title('ROUGE-L F1 Scores')
-    axes[2].set_ylabel('Score')
-    axes[2].set_ylim(0, 1)
+    scored = [m for m in methods if f'{m}_rouge1_f1' in columns]
+    rendered = render_figure(os.path.join(FIGURES_DIR, 'rouge_scores.png'), {
+        'methods': scored,
+        'rouge1': [plotted(f'{m}_rouge1_f1') for m in scored],
+        'rouge2': [plotted(f'{m}_rouge2_f1') for m in methods if f'{m}_rouge2_f1' in columns],
+        'rougeL': [plotted(f'{m}_rougeL_f1') for m in methods if f'{m}_rougeL_f1' in columns]
+    }, draw_rouge_scores, hashes)
     
-    plt.tight_layout()
-    plt.savefig('results/figures/rouge_scores.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    timed = [m for m in methods if f'{m}_time' in columns]
+    if 'TF-IDF_time' in columns:
+        rendered |= render_figure(os.path.join(FIGURES_DIR, 'processing_times.png'), {
+            'methods': timed,
+            'times': [plotted(f'{m}_time') for m in timed]
+        }, draw_processing_times, hashes)
     
-    if 'TF-IDF_time' in df.columns:
-        times = [df[f'{m}_time'].mean() for m in methods if f'{m}_time' in df.columns]
-        time_labels = [m for m in methods if f'{m}_time' in df.columns]
-        
-        plt.figure(figsize=(10, 6))
-        plt.bar(time_labels, times)
-        plt.title('Average Processing Time per Article')
-        plt.ylabel('Time (seconds)')
-        plt.xlabel('Method')
-        plt.tight_layout()
-        plt.savefig('results/figures/processing_times.png', dpi=300, bbox_inches='tight')
-        plt.close()
+    if rendered:
+        with open(hashes_path, 'w', encoding='utf-8') as f:
+            json.dump(hashes, f, indent=2)
     
     with open(output_path, 'w', encoding='utf-8') as f:
         f.write("# Text Summarization Evaluation Report\n\n")
         
         f.write("## 1. Dataset\n\n")
-        f.write(f"- **Total Articles**: {len(df)}\n")
-        f.write(f"- **Average Text Length**: {df['text_length'].mean():.0f} characters\n")
-        f.write(f"- **Average Sentences per Article**: {df['num_sentences'].mean():.1f}\n")
+        f.write(f"- **Total Articles**: {aggregates['num_rows']}\n")
+        f.write(f"- **Average Text Length**: {mean('text_length'):.0f} characters\n")
+        f.write(f"- **Average Sentences per Article**: {mean('num_sentences'):.1f}\n")
         f.write(f"- **Sources**: BBC News, The Guardian, Fox News\n\n")
         
         f.write("## 2. Methods\n\n")
@@ -92,25 +133,51 @@ def generate_full_report(results_csv_path: str = "results/detailed_results.csv",
             r2_col = f'{method}_rouge2_f1'
             rL_col = f'{method}_rougeL_f1'
             
-            if r1_col in df.columns:
-                r1 = df[r1_col].mean()
-                r2 = df[r2_col].mean() if r2_col in df.columns else 0
-                rL = df[rL_col].mean() if rL_col in df.columns else 0
+            if r1_col in columns:
+                r1 = mean(r1_col)
+                r2 = mean(r2_col) if r2_col in columns else 0
+                rL = mean(rL_col) if rL_col in columns else 0
                 f.write(f"| {method} | {r1:.4f} | {r2:.4f} | {rL:.4f} |\n")
         
         f.write("\n![ROUGE Scores](figures/rouge_scores.png)\n\n")
         
-        if 'TF-IDF_time' in df.columns:
+        if 'TF-IDF_time' in columns:
             f.write("### Processing Times\n\n")
             f.write("| Method | Avg Time (s) |\n")
             f.write("|--------|--------------|\n")
             for method in methods:
                 time_col = f'{method}_time'
-                if time_col in df.columns:
-                    avg_time = df[time_col].mean()
+                if time_col in columns:
+                    avg_time = mean(time_col)
                     f.write(f"| {method} | {avg_time:.4f} |\n")
+            f.write("\nExtractive times exclude sentence segmentation, which runs once per article before "
+                    "summarizing; BART / T5 times include preprocessing, tokenization and generation.\n")
             f.write("\n![Processing Times](figures/processing_times.png)\n\n")
         
+        if stage_latencies_path and os.path.exists(stage_latencies_path):
+            with open(stage_latencies_path, 'r', encoding='utf-8') as sf:
+                stages = json.load(sf)['stages']
+            f.write("### Stage Latencies\n\n")
+            f.write("Inclusive wall time per instrumented stage; preprocessing spans are also counted inside ")
+            f.write("the summarizers that call them.\n\n")
+            for line in format_stage_table(stages, markdown=True):
+                f.write(line + "\n")
+            f.write("\n")
+        
+        if memory_profile_path and os.path.exists(memory_profile_path):
+            with open(memory_profile_path, 'r', encoding='utf-8') as mf:
+                memory_stats = json.load(mf)
+            f.write("### Memory Profile\n\n")
+            f.write(f"Peak process RSS: {memory_stats['process_peak_rss'] / 2**20:.1f} MiB. ")
+            f.write("RSS growth is the rise in peak RSS during a single summarize call; traced peak counts ")
+            f.write("Python and NumPy allocations only (model tensors are not traced).\n\n")
+            for line in format_memory_table(memory_stats, markdown=True):
+                f.write(line + "\n")
+            f.write("\n#### Top Allocators\n\n")
+            for line in format_top_allocators(memory_stats, markdown=True):
+                f.write(line + "\n")
+            f.write("\n")
+        
         f.write("## 5. Error Analysis\n\n")
         
         for method in methods:
@@ -128,10 +195,8 @@ def generate_full_report(results_csv_path: str = "results/detailed_results.csv",
         f.write("## 6. Conclusions\n\n")
         f.write("### Key Findings\n\n")
         
-        best_rouge1 = max([(m, df[f'{m}_rouge1_f1'].mean()) for m in methods if f'{m}_rouge1_f1' in df.columns], 
-                         key=lambda x: x[1])
-        fastest = min([(m, df[f'{m}_time'].mean()) for m in methods if f'{m}_time' in df.columns], 
-                     key=lambda x: x[1]) if 'TF-IDF_time' in df.columns else None
+        best_rouge1 = max([(m, mean(f'{m}_rouge1_f1')) for m in scored], key=lambda x: x[1])
+        fastest = min([(m, mean(f'{m}_time')) for m in timed], key=lambda x: x[1]) if 'TF-IDF_time' in columns else None
         
         f.write(f"1. **Best ROUGE-1 Score**: {best_rouge1[0]} ({best_rouge1[1]:.4f})\n")
         if fastest:
@@ -148,7 +213,7 @@ def generate_full_report(results_csv_path: str = "results/detailed_results.csv",
         f.write("5. Use human-written reference summaries for more accurate evaluation\n\n")
     
     print(f"Full report saved to {output_path}")
-    print(f"Figures saved to results/figures/")
+    print(f"Figures saved to {FIGURES_DIR}/" if rendered else f"Figures in {FIGURES_DIR}/ are up to date")
 
 if __name__ == "__main__":
     generate_full_report()
@@ -0,0 +1,191 @@
+import time
+import threading
+import requests
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, Iterable, Iterator, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from page_cache import PageCache
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_BACKOFF = 120.0
+
+class Page(NamedTuple):
+    url: str
+    content: bytes
+    content_hash: Optional[str]
+    changed: bool
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.capacity = max(burst, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self) -> float:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+class HostRateLimiter:
+    def __init__(self, rate: float = 4.0, burst: float = 4.0, host_rates: Dict[str, float] = None):
+        self.rate = rate
+        self.burst = burst
+        self.host_rates = host_rates or {}
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+    
+    def bucket(self, url: str) -> TokenBucket:
+        host = urlsplit(url).netloc.lower()
+        with self.lock:
+            if host not in self.buckets:
+                rate = self.host_rates.get(host, self.rate)
+                self.buckets[host] = TokenBucket(rate, self.burst)
+            return self.buckets[host]
+    
+    def acquire(self, url: str) -> float:
+        if self.rate <= 0:
+            return 0.0
+        return self.bucket(url).acquire()
+
+class Fetcher:
+    def __init__(self, workers: int = 16, rate: float = 4.0, burst: float = 4.0, host_rates: Dict[str, float] = None,
+                 max_retries: int = 3, backoff_factor: float = 0.5, timeout: float = 10, cache: PageCache = None):
+        self.workers = workers
+        self.timeout = timeout
+        self.cache = cache
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.limiter = HostRateLimiter(rate, burst, host_rates)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='fetch')
+        self.stats = {'requests': 0, 'errors': 0, 'retries': 0, 'throttled_s': 0.0, 'bytes_downloaded': 0,
+                      'not_modified': 0}
+        self.stats_lock = threading.Lock()
+        
+        # Retries happen in get(), not in the adapter, so every attempt takes a token from the host's bucket
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=workers)
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+    
+    def get(self, url: str, headers: Dict[str, str] = None) -> requests.Response:
+        attempt = 0
+        while True:
+            throttled = self.limiter.acquire(url)
+            try:
+                response = self.session.get(url, timeout=self.timeout, headers=headers)
+            except (requests.ConnectionError, requests.Timeout):
+                self._count('errors', 1)
+                if attempt >= self.max_retries:
+                    raise
+                response = None
+            except Exception:
+                self._count('errors', 1)
+                raise
+            finally:
+                with self.stats_lock:
+                    self.stats['requests'] += 1
+                    self.stats['throttled_s'] += throttled
+            
+            if response is not None and (response.status_code not in RETRY_STATUSES or attempt >= self.max_retries):
+                return response
+            
+            delay = self._backoff(attempt, response.headers.get('Retry-After') if response is not None else None)
+            if response is not None:
+                response.close()
+            self._count('retries', 1)
+            attempt += 1
+            time.sleep(delay)
+    
+    def _backoff(self, attempt: int, retry_after: Optional[str]) -> float:
+        if retry_after:
+            try:
+                return min(max(float(retry_after), 0.0), MAX_BACKOFF)
+            except ValueError:
+                pass
+            try:
+                return min(max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0.0), MAX_BACKOFF)
+            except (TypeError, ValueError):
+                pass
+        return min(self.backoff_factor * 2 ** attempt, MAX_BACKOFF)
+    
+    def fetch(self, url: str) -> bytes:
+        return self.fetch_page(url).content
+    
+    def fetch_page(self, url: str) -> Page:
+        entry = self.cache.lookup(url) if self.cache else None
+        response = self.get(url, headers=self.cache.conditional_headers(entry) if entry else None)
+        
+        if response.status_code == 304 and entry:
+            content = self.cache.read(url)
+            if content is not None:
+                self._count('not_modified', 1)
+                return Page(url, content, entry['content_hash'], False)
+            response = self.get(url)
+        
+        response.raise_for_status()
+        content = response.content
+        self._count('bytes_downloaded', len(content))
+        if self.cache is None:
+            return Page(url, content, None, True)
+        
+        content_hash = self.cache.store(url, content, response.headers.get('ETag'),
+                                        response.headers.get('Last-Modified'))
+        return Page(url, content, content_hash, entry is None or entry['content_hash'] != content_hash)
+    
+    def _count(self, name: str, value):
+        with self.stats_lock:
+            self.stats[name] += value
+    
+    def imap_unordered(self, fn: Callable, items: Iterable, max_in_flight: int = None) -> Iterator[Tuple[object, object]]:
+        # Yields (item, result) as tasks finish; result is the exception if fn raised.
+        # Closing the generator early cancels work that has not started yet.
+        max_in_flight = max_in_flight or self.workers * 2
+        items = iter(items)
+        pending = {}
+        try:
+            while True:
+                for item in items:
+                    pending[self.executor.submit(fn, item)] = item
+                    if len(pending) >= max_in_flight:
+                        break
+                if not pending:
+                    return
+                
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = e
+                    yield item, result
+        finally:
+            for future in pending:
+                future.cancel()
+    
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
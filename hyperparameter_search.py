@@ -1,21 +1,98 @@
+import math
 import time
-from typing import List, Dict
+import random
+import itertools
+from typing import List, Dict, Tuple
 from abstractive_summarizer import AbstractiveSummarizer, T5Summarizer
 from evaluation import RougeEvaluator
 from preprocessing import TextPreprocessor
 
+DEFAULT_SEARCH_SPACE = {
+    "num_beams": [1, 2, 4, 6],
+    "max_length": [120, 150, 180],
+    "min_length": [40, 50, 60],
+    "no_repeat_ngram_size": [2, 3, 4],
+    "do_sample": [False, True]
+}
+
+def expand_search_space(search_space: Dict[str, List], num_candidates: int = None, seed: int = 0) -> List[Dict]:
+    names = sorted(search_space)
+    configs = []
+    for values in itertools.product(*(search_space[name] for name in names)):
+        config = dict(zip(names, values))
+        if config.get("min_length", 0) >= config.get("max_length", float('inf')):
+            continue
+        configs.append(config)
+    
+    if num_candidates and num_candidates < len(configs):
+        configs = random.Random(seed).sample(configs, num_candidates)
+    return configs
+
+def pareto_front(results: List[Dict], quality_key: str = "avg_rouge1", cost_key: str = "avg_time") -> List[Dict]:
+    front = []
+    best_quality = -float('inf')
+    for result in sorted(results, key=lambda r: (r[cost_key], -r[quality_key])):
+        if result[quality_key] > best_quality:
+            front.append(result)
+            best_quality = result[quality_key]
+    return front
+
 class HyperparameterSearch:
     def __init__(self):
         self.evaluator = RougeEvaluator()
         self.preprocessor = TextPreprocessor()
     
-    def search_hyperparameters(self, articles: List[Dict], model_type: str = "T5", 
-                              num_samples: int = 10) -> Dict:
+    def _load_summarizer(self, model_type: str):
         if model_type == "T5":
-            summarizer_class = T5Summarizer
-        else:
-            summarizer_class = AbstractiveSummarizer
+            return T5Summarizer(model_name="t5-small")
+        return AbstractiveSummarizer(model_name="facebook/bart-large-cnn")
+    
+    def _prepare_articles(self, articles: List[Dict]) -> List[Tuple[str, str]]:
+        prepared = []
+        for article in articles:
+            text = article.get('text', '')
+            if len(text) < 200:
+                continue
+            
+            processed_text = self.preprocessor.preprocess(text)
+            sentences = self.preprocessor.segment_sentences(processed_text)
+            
+            if len(sentences) < 3:
+                continue
+            
+            prepared.append((processed_text, ' '.join(sentences[:3])))
+        return prepared
+    
+    def _new_result(self, config: Dict) -> Dict:
+        return {
+            "config": config,
+            "rouge1_scores": [],
+            "rouge2_scores": [],
+            "rougeL_scores": [],
+            "times": []
+        }
+    
+    def _evaluate_config(self, summarizer, config_results: Dict, prepared: List[Tuple[str, str]]):
+        for processed_text, reference_summary in prepared:
+            start_time = time.time()
+            summary = summarizer.summarize(processed_text, **config_results["config"])
+            elapsed_time = time.time() - start_time
+            
+            scores = self.evaluator.evaluate(reference_summary, summary)
+            
+            config_results["rouge1_scores"].append(scores['rouge1_f1'])
+            config_results["rouge2_scores"].append(scores['rouge2_f1'])
+            config_results["rougeL_scores"].append(scores['rougeL_f1'])
+            config_results["times"].append(elapsed_time)
         
+        config_results["num_articles"] = len(config_results["times"])
+        config_results["avg_rouge1"] = sum(config_results["rouge1_scores"]) / len(config_results["rouge1_scores"]) if config_results["rouge1_scores"] else 0
+        config_results["avg_rouge2"] = sum(config_results["rouge2_scores"]) / len(config_results["rouge2_scores"]) if config_results["rouge2_scores"] else 0
+        config_results["avg_rougeL"] = sum(config_results["rougeL_scores"]) / len(config_results["rougeL_scores"]) if config_results["rougeL_scores"] else 0
+        config_results["avg_time"] = sum(config_results["times"]) / len(config_results["times"]) if config_results["times"] else 0
+    
+    def search_hyperparameters(self, articles: List[Dict], model_type: str = "T5",
+                              num_samples: int = 10) -> Dict:
         hyperparameter_configs = [
             {"max_length": 150, "min_length": 50, "num_beams": 4, "do_sample": False, "no_repeat_ngram_size": 3},
             {"max_length": 150, "min_length": 50, "num_beams": 2, "do_sample": False, "no_repeat_ngram_size": 3},
@@ -27,48 +104,14 @@ class HyperparameterSearch:
             {"max_length": 180, "min_length": 60, "num_beams": 4, "do_sample": False, "no_repeat_ngram_size": 3},
         ]
         
+        summarizer = self._load_summarizer(model_type)
+        prepared = self._prepare_articles(articles[:num_samples])
         results = []
         
         for config in hyperparameter_configs:
             print(f"Testing config: {config}")
-            summarizer = summarizer_class(model_name="t5-small" if model_type == "T5" else "facebook/bart-large-cnn")
-            
-            config_results = {
-                "config": config,
-                "rouge1_scores": [],
-                "rouge2_scores": [],
-                "rougeL_scores": [],
-                "times": []
-            }
-            
-            for i, article in enumerate(articles[:num_samples]):
-                text = article.get('text', '')
-                if len(text) < 200:
-                    continue
-                
-                processed_text = self.preprocessor.preprocess(text)
-                sentences = self.preprocessor.segment_sentences(processed_text)
-                
-                if len(sentences) < 3:
-                    continue
-                
-                reference_summary = ' '.join(sentences[:3])
-                
-                start_time = time.time()
-                summary = summarizer.summarize(processed_text, **config)
-                elapsed_time = time.time() - start_time
-                
-                scores = self.evaluator.evaluate(reference_summary, summary)
-                
-                config_results["rouge1_scores"].append(scores['rouge1_f1'])
-                config_results["rouge2_scores"].append(scores['rouge2_f1'])
-                config_results["rougeL_scores"].append(scores['rougeL_f1'])
-                config_results["times"].append(elapsed_time)
-            
-            config_results["avg_rouge1"] = sum(config_results["rouge1_scores"]) / len(config_results["rouge1_scores"]) if config_results["rouge1_scores"] else 0
-            config_results["avg_rouge2"] = sum(config_results["rouge2_scores"]) / len(config_results["rouge2_scores"]) if config_results["rouge2_scores"] else 0
-            config_results["avg_rougeL"] = sum(config_results["rougeL_scores"]) / len(config_results["rougeL_scores"]) if config_results["rougeL_scores"] else 0
-            config_results["avg_time"] = sum(config_results["times"]) / len(config_results["times"]) if config_results["times"] else 0
+            config_results = self._new_result(config)
+            self._evaluate_config(summarizer, config_results, prepared)
             
             results.append(config_results)
             print(f"  Avg ROUGE-1: {config_results['avg_rouge1']:.4f}, Avg Time: {config_results['avg_time']:.2f}s")
@@ -77,6 +120,52 @@ class HyperparameterSearch:
         
         return {
             "all_results": results,
-            "best_config": best_config
+            "best_config": best_config,
+            "pareto_front": pareto_front(results)
+        }
+    
+    def successive_halving(self, articles: List[Dict], model_type: str = "T5", search_space: Dict[str, List] = None,
+                           num_candidates: int = 16, min_articles: int = 2, eta: int = 2,
+                           seed: int = 0) -> Dict:
+        configs = expand_search_space(search_space or DEFAULT_SEARCH_SPACE, num_candidates, seed)
+        summarizer = self._load_summarizer(model_type)
+        prepared = self._prepare_articles(articles)
+        
+        results = [self._new_result(config) for config in configs]
+        survivors = list(results)
+        budget = min(min_articles, len(prepared))
+        rounds = []
+        
+        while survivors:
+            print(f"Round {len(rounds) + 1}: {len(survivors)} candidates on {budget} articles")
+            for config_results in survivors:
+                seen = len(config_results["times"])
+                self._evaluate_config(summarizer, config_results, prepared[seen:budget])
+            
+            survivors.sort(key=lambda r: r['avg_rouge1'], reverse=True)
+            # Every survivor has been scored on the same articles here, so this front compares like with like
+            rung_front = pareto_front([{key: r[key] for key in ("config", "avg_rouge1", "avg_time", "num_articles")}
+                                       for r in survivors])
+            rounds.append({
+                "num_articles": budget,
+                "candidates": [r["config"] for r in survivors],
+                "avg_rouge1": [r["avg_rouge1"] for r in survivors],
+                "pareto_front": rung_front
+            })
+            print(f"  Leader: {survivors[0]['config']} (ROUGE-1 {survivors[0]['avg_rouge1']:.4f})")
+            
+            if len(survivors) == 1 or budget >= len(prepared):
+                break
+            
+            survivors = survivors[:max(1, math.ceil(len(survivors) / eta))]
+            budget = min(budget * eta, len(prepared))
+        
+        evaluated = [r for r in results if r["times"]]
+        
+        return {
+            "all_results": evaluated,
+            "best_config": survivors[0] if survivors else None,
+            "pareto_front": rounds[-1]["pareto_front"] if rounds else [],
+            "rounds": rounds,
+            "total_summaries": sum(r["num_articles"] for r in evaluated)
         }
-
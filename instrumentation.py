@@ -0,0 +1,194 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, List
+
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+
+def bucket_index(value_ns: int) -> int:
+    shift = value_ns.bit_length() - SUB_BUCKET_BITS - 1
+    if shift <= 0:
+        return value_ns
+    return shift * SUB_BUCKETS + (value_ns >> shift)
+
+def bucket_bounds(index: int) -> tuple:
+    if index < 2 * SUB_BUCKETS:
+        return index, index
+    shift = index // SUB_BUCKETS - 1
+    mantissa = index - shift * SUB_BUCKETS
+    return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+    
+    def record(self, value_ns: int):
+        index = bucket_index(value_ns)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total_ns += value_ns
+        self.min_ns = value_ns if self.min_ns is None else min(self.min_ns, value_ns)
+        self.max_ns = max(self.max_ns, value_ns)
+    
+    def merge(self, other: 'LatencyHistogram'):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total_ns += other.total_ns
+        if other.min_ns is not None:
+            self.min_ns = other.min_ns if self.min_ns is None else min(self.min_ns, other.min_ns)
+        self.max_ns = max(self.max_ns, other.max_ns)
+    
+    def percentile(self, q: float) -> int:
+        if not self.count:
+            return 0
+        
+        rank = max(1, int(round(q / 100 * self.count)))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                low, high = bucket_bounds(index)
+                return min(max((low + high) // 2, self.min_ns), self.max_ns)
+        return self.max_ns
+    
+    def to_dict(self) -> Dict:
+        return {
+            'counts': {str(index): count for index, count in self.counts.items()},
+            'count': self.count,
+            'total_ns': self.total_ns,
+            'min_ns': self.min_ns,
+            'max_ns': self.max_ns
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'LatencyHistogram':
+        histogram = cls()
+        histogram.counts = {int(index): count for index, count in data['counts'].items()}
+        histogram.count = data['count']
+        histogram.total_ns = data['total_ns']
+        histogram.min_ns = data['min_ns']
+        histogram.max_ns = data['max_ns']
+        return histogram
+
+class _Span:
+    __slots__ = ('_registry', '_name', '_start')
+    
+    def __init__(self, registry: 'Instrumentation', name: str):
+        self._registry = registry
+        self._name = name
+    
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self._registry.record(self._name, time.perf_counter_ns() - self._start)
+        return False
+
+class _NullSpan:
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class Instrumentation:
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._histograms = {}
+        self._lock = threading.Lock()
+    
+    def enable(self, enabled: bool = True):
+        self.enabled = enabled
+    
+    def span(self, name: str):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+    
+    def record(self, name: str, value_ns: int):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = LatencyHistogram()
+            histogram.record(value_ns)
+    
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+    
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {name: histogram.to_dict() for name, histogram in self._histograms.items()}
+    
+    def drain(self) -> Dict[str, Dict]:
+        with self._lock:
+            histograms, self._histograms = self._histograms, {}
+        return {name: histogram.to_dict() for name, histogram in histograms.items()}
+    
+    def merge_snapshot(self, snapshot: Dict[str, Dict]):
+        if not snapshot:
+            return
+        with self._lock:
+            for name, data in snapshot.items():
+                histogram = self._histograms.get(name)
+                if histogram is None:
+                    histogram = self._histograms[name] = LatencyHistogram()
+                histogram.merge(LatencyHistogram.from_dict(data))
+    
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            histograms = dict(self._histograms)
+        
+        stages = {}
+        for name in sorted(histograms):
+            histogram = histograms[name]
+            stages[name] = {
+                'count': histogram.count,
+                'total_s': histogram.total_ns / 1e9,
+                'mean_ms': histogram.total_ns / histogram.count / 1e6,
+                'p50_ms': histogram.percentile(50) / 1e6,
+                'p95_ms': histogram.percentile(95) / 1e6,
+                'p99_ms': histogram.percentile(99) / 1e6,
+                'max_ms': histogram.max_ns / 1e6
+            }
+        return stages
+    
+    def export_json(self, path: str):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'stages': self.summary(), 'histograms': self.snapshot()}, f, indent=2)
+
+instrumentation = Instrumentation(enabled=os.environ.get('SUMMARIZER_INSTRUMENT', '') == '1')
+
+def span(name: str):
+    if not instrumentation.enabled:
+        return _NULL_SPAN
+    return _Span(instrumentation, name)
+
+def format_stage_table(stages: Dict[str, Dict[str, float]], markdown: bool = False) -> List[str]:
+    columns = ['count', 'total_s', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms']
+    
+    if markdown:
+        lines = ["| Stage | Count | Total (s) | Mean (ms) | p50 (ms) | p95 (ms) | p99 (ms) | Max (ms) |",
+                 "|-------|-------|-----------|-----------|----------|----------|----------|----------|"]
+        for name, stats in stages.items():
+            values = [f"{stats['count']}"] + [f"{stats[c]:.3f}" for c in columns[1:]]
+            lines.append(f"| {name} | " + " | ".join(values) + " |")
+        return lines
+    
+    lines = [f"{'Stage':28s}" + "".join(f"{c:>12s}" for c in columns)]
+    for name, stats in stages.items():
+        lines.append(f"{name:28s}{stats['count']:>12d}" + "".join(f"{stats[c]:>12.3f}" for c in columns[1:]))
+    return lines
@@ -2,45 +2,33 @@ import json
 import os
 import argparse
 import time
-from typing import List, Dict
+from contextlib import nullcontext
+from typing import List, Dict, Iterable, Iterator
 import pandas as pd
 from data_collector import NewsCollector
+from article_store import ArticleStore, DEFAULT_STORE_PATH
 from preprocessing import TextPreprocessor
-from extractive_summarizer import TFIDFSummarizer, TextRankSummarizer, LeadKSummarizer
+from summarization_methods import EXTRACTIVE_CLASSES, GENERATION_KWARGS
 from abstractive_summarizer import AbstractiveSummarizer, T5Summarizer
 from evaluation import RougeEvaluator
 from error_analysis import ErrorAnalyzer
+from parallel_evaluation import ParallelEvaluationEngine
+from result_log import ResultLog, method_config_key
+from article_stream import iter_articles
+from results_store import ResultsStore
+from instrumentation import instrumentation, format_stage_table
+from memory_profiling import MemoryProfiler, format_memory_table, format_top_allocators
+from near_duplicates import NearDuplicateIndex
 
-def load_data(data_path: str) -> List[Dict]:
-    with open(data_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+def load_data(data_path: str, num_samples: int = None) -> List[Dict]:
+    return list(iter_articles(data_path, num_samples=num_samples))
 
 def split_data(articles: List[Dict], train_ratio: float = 0.8) -> tuple:
     split_idx = int(len(articles) * train_ratio)
     return articles[:split_idx], articles[split_idx:]
 
-def evaluate_summarizers(articles: List[Dict], num_samples: int = None):
-    if num_samples:
-        articles = articles[:num_samples]
-    
-    preprocessor = TextPreprocessor()
-    
-    extractive_methods = {
-        'TF-IDF': TFIDFSummarizer(preprocessor),
-        'TextRank': TextRankSummarizer(preprocessor),
-        'Lead-3': LeadKSummarizer(preprocessor)
-    }
-    
-    abstractive_methods = {
-        'BART': AbstractiveSummarizer(model_name="facebook/bart-large-cnn"),
-        'T5': T5Summarizer(model_name="t5-small")
-    }
-    
-    evaluator = RougeEvaluator()
-    
-    results = []
-    
-    for article in articles:
+def prepare_articles(articles: Iterable[Dict], preprocessor: TextPreprocessor) -> Iterator[Dict]:
+    for index, article in enumerate(articles):
         text = article.get('text', '')
         if len(text) < 200:
             continue
@@ -51,52 +39,189 @@ def evaluate_summarizers(articles: List[Dict], num_samples: int = None):
         if len(sentences) < 3:
             continue
         
-        reference_summary = ' '.join(sentences[:3])
-        
-        article_results = {
-            'article_id': article.get('url', ''),
-            'title': article.get('title', ''),
-            'text_length': len(text),
-            'num_sentences': len(sentences)
+        yield {
+            'index': index,
+            'text': processed_text,
+            'reference': ' '.join(sentences[:3]),
+            'sentences': sentences,
+            'row': {
+                'article_id': article.get('url', ''),
+                'title': article.get('title', ''),
+                'text_length': len(text),
+                'num_sentences': len(sentences)
+            }
         }
+
+def run_sequential(items: Iterable[Dict], extractive_methods: Dict, abstractive_methods: Dict,
+                   memory_profiler: MemoryProfiler = None) -> Iterator[tuple]:
+    def profile(method_name, item):
+        if memory_profiler is None:
+            return nullcontext()
+        return memory_profiler.profile(method_name, item['row']['num_sentences'])
+    
+    for item in items:
+        summaries = {}
         
         for method_name, summarizer in extractive_methods.items():
+            if method_name not in item['methods']:
+                continue
             try:
-                start_time = time.time()
-                summary = summarizer.summarize(processed_text, num_sentences=3)
-                elapsed_time = time.time() - start_time
-                scores = evaluator.evaluate(reference_summary, summary)
-                
-                article_results[f'{method_name}_rouge1_f1'] = scores['rouge1_f1']
-                article_results[f'{method_name}_rouge2_f1'] = scores['rouge2_f1']
-                article_results[f'{method_name}_rougeL_f1'] = scores['rougeL_f1']
-                article_results[f'{method_name}_summary'] = summary
-                article_results[f'{method_name}_time'] = elapsed_time
+                with profile(method_name, item):
+                    start_time = time.time()
+                    # Sentences segmented once in prepare_articles, as the parallel workers read them from the arena
+                    summary = summarizer.summarize_sentences(item['sentences'], num_sentences=3)
+                    elapsed_time = time.time() - start_time
+                summaries[method_name] = (summary, elapsed_time)
             except Exception as e:
                 print(f"Error with {method_name}: {e}")
         
         for method_name, summarizer in abstractive_methods.items():
+            if method_name not in item['methods']:
+                continue
             try:
-                start_time = time.time()
-                summary = summarizer.summarize(processed_text, max_length=150, min_length=50,
-                                               num_beams=4, do_sample=False, no_repeat_ngram_size=3)
-                elapsed_time = time.time() - start_time
-                scores = evaluator.evaluate(reference_summary, summary)
-                
-                article_results[f'{method_name}_rouge1_f1'] = scores['rouge1_f1']
-                article_results[f'{method_name}_rouge2_f1'] = scores['rouge2_f1']
-                article_results[f'{method_name}_rougeL_f1'] = scores['rougeL_f1']
-                article_results[f'{method_name}_summary'] = summary
-                article_results[f'{method_name}_time'] = elapsed_time
+                with profile(method_name, item):
+                    start_time = time.time()
+                    summary = summarizer.summarize(item['text'], **GENERATION_KWARGS)
+                    elapsed_time = time.time() - start_time
+                summaries[method_name] = (summary, elapsed_time)
             except Exception as e:
                 print(f"Error with {method_name}: {e}")
         
-        results.append(article_results)
-        print(f"Processed {len(results)} articles")
+        yield item, summaries
+
+def evaluate_summarizers(articles: List[Dict], num_samples: int = None, compile_t5: bool = False,
+                         workers: int = 0, batch_size: int = 8, method_concurrency: Dict[str, int] = None,
+                         result_log: ResultLog = None, memory_profiler: MemoryProfiler = None,
+                         dedup: NearDuplicateIndex = None):
+    if num_samples:
+        articles = articles[:num_samples]
+    
+    if memory_profiler and workers:
+        print("Memory profiling attributes process RSS to one method at a time; running sequentially")
+        workers = 0
+    
+    preprocessor = TextPreprocessor()
+    
+    abstractive_methods = {
+        'BART': AbstractiveSummarizer(model_name="facebook/bart-large-cnn"),
+        'T5': T5Summarizer(model_name="t5-small", max_length=150, min_length=50, compiled=compile_t5)
+    }
+    
+    evaluator = RougeEvaluator()
+    
+    method_names = list(EXTRACTIVE_CLASSES) + list(abstractive_methods)
+    extractive_params = {'num_sentences': 3}
+    if preprocessor.segmenter.name != 'punkt':
+        # Punkt runs keep their original keys, so existing run logs still resume
+        extractive_params['segmenter'] = preprocessor.segmenter.name
+    config_keys = {name: method_config_key(name, extractive_params) for name in EXTRACTIVE_CLASSES}
+    for name, summarizer in abstractive_methods.items():
+        config_keys[name] = method_config_key(name, {'model_name': summarizer.model_name, **GENERATION_KWARGS})
+    
+    completed = result_log.completed(config_keys) if result_log else {name: set() for name in method_names}
+    run_keys = []
+    duplicates = []
+    summarized_methods = {}
+    
+    def pending_items():
+        for item in prepare_articles(articles, preprocessor):
+            # Position plus URL, so articles sharing a URL keep separate rows
+            item['key'] = f"{item['index']}:{item['row']['article_id']}"
+            item['methods'] = [m for m in method_names if item['key'] not in completed[m]]
+            run_keys.append(item['key'])
+            if not item['methods']:
+                continue
+            
+            if dedup is not None:
+                # Near-duplicates of an earlier pending article reuse its summaries instead of being summarized.
+                # On a partial resume the representative may run fewer methods than the duplicate still needs;
+                # then the duplicate is summarized itself.
+                representative = dedup.add(item['key'], item['text'])
+                reusable = (representative != item['key']
+                            and set(item['methods']) <= set(summarized_methods.get(representative, ())))
+                item['duplicate_key'] = representative if reusable else ''
+                item['row']['duplicate_of'] = item['duplicate_key'].split(':', 1)[-1]
+                if reusable:
+                    duplicates.append(item)
+                    continue
+                summarized_methods[item['key']] = item['methods']
+            yield item
+    
+    items = pending_items()
+    
+    if workers:
+        engine = ParallelEvaluationEngine(EXTRACTIVE_CLASSES, abstractive_methods, GENERATION_KWARGS,
+                                          num_workers=workers, batch_size=batch_size,
+                                          method_concurrency=method_concurrency)
+        outputs = engine.run(items)
+    else:
+        extractive_methods = {name: cls(preprocessor) for name, cls in EXTRACTIVE_CLASSES.items()}
+        if memory_profiler:
+            memory_profiler.start()
+        outputs = run_sequential(items, extractive_methods, abstractive_methods, memory_profiler)
+    
+    # With a result log, rows live on disk and are read back by compact(); only a log-less run keeps them here
+    results = []
+    processed = 0
+    shared_summaries = {}
+    
+    def record(item, summaries):
+        nonlocal processed
+        article_results = dict(item['row'])
+        scored_methods = [m for m in method_names if m in summaries]
+        all_scores = evaluator.evaluate_many(item['reference'], [summaries[m][0] for m in scored_methods])
+        method_fields = {}
+        
+        for method_name, scores in zip(scored_methods, all_scores):
+            summary, elapsed_time = summaries[method_name]
+            method_fields[method_name] = {
+                f'{method_name}_rouge1_f1': scores['rouge1_f1'],
+                f'{method_name}_rouge2_f1': scores['rouge2_f1'],
+                f'{method_name}_rougeL_f1': scores['rougeL_f1'],
+                f'{method_name}_summary': summary,
+                f'{method_name}_time': elapsed_time
+            }
+            article_results.update(method_fields[method_name])
+        
+        if result_log:
+            result_log.append(item['key'], item['row'], method_fields, config_keys)
+        else:
+            results.append((item['index'], article_results))
+        processed += 1
+        print(f"Processed {processed} articles")
+    
+    for item, summaries in outputs:
+        if dedup is not None:
+            shared_summaries[item['key']] = summaries
+        record(item, summaries)
+    
+    # Each duplicate is scored against its own reference with its representative's summary and time
+    for item in duplicates:
+        summaries = shared_summaries.get(item['duplicate_key'], {})
+        record(item, {m: summaries[m] for m in item['methods'] if m in summaries})
     
-    return results
+    if dedup is not None:
+        print(f"Near-duplicates: {len(duplicates)} of {len(duplicates) + len(shared_summaries)} articles "
+              f"reused a summary ({dedup.bands} bands x {dedup.rows} rows, threshold {dedup.threshold})")
+    
+    if memory_profiler:
+        memory_profiler.stop()
+    
+    if result_log:
+        return result_log.compact(config_keys, keys=run_keys)
+    
+    return [article_results for _, article_results in sorted(results, key=lambda x: x[0])]
+
+def parse_method_concurrency(value: str) -> Dict[str, int]:
+    limits = {}
+    for part in filter(None, (value or '').split(',')):
+        method_name, limit = part.split('=')
+        limits[method_name.strip()] = int(limit)
+    return limits
 
-def generate_report(results: List[Dict], output_path: str = "results/report.txt"):
+def generate_report(results: List[Dict], output_path: str = "results/report.txt",
+                    store_dir: str = "results/store", stage_stats: Dict[str, Dict] = None,
+                    memory_stats: Dict = None, aggregates: Dict = None):
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     
     df = pd.DataFrame(results)
@@ -141,6 +266,8 @@ def generate_report(results: List[Dict], output_path: str = "results/report.txt"
         
         f.write("\nAverage Processing Time (seconds):\n")
         f.write("-" * 50 + "\n")
+        f.write("Extractive times exclude sentence segmentation, which runs once per article before\n")
+        f.write("summarizing; BART / T5 times include preprocessing, tokenization and generation.\n")
         for method in methods:
             time_col = f'{method}_time'
             if time_col in df.columns:
@@ -156,46 +283,118 @@ def generate_report(results: List[Dict], output_path: str = "results/report.txt"
                 f.write(f"  Average ROUGE-1: {analysis['avg_score']:.4f}\n")
                 f.write(f"  Low scores (<0.3): {analysis['num_low_scores']}\n")
                 f.write(f"  High scores (>0.7): {analysis['num_high_scores']}\n")
+                f.write(f"  ROUGE-1 histogram (0-1): {' '.join(str(c) for c in analysis['histogram']['counts'])}\n")
                 if analysis['error_examples']:
                     f.write(f"  Error examples: {len(analysis['error_examples'])} found\n")
+        
+        if stage_stats:
+            f.write("\nSTAGE LATENCIES:\n")
+            f.write("-" * 50 + "\n")
+            for line in format_stage_table(stage_stats):
+                f.write(line + "\n")
+        
+        if memory_stats:
+            f.write("\nMEMORY PROFILE:\n")
+            f.write("-" * 50 + "\n")
+            f.write(f"Peak process RSS: {memory_stats['process_peak_rss'] / 2**20:.1f} MiB\n\n")
+            for line in format_memory_table(memory_stats):
+                f.write(line + "\n")
+            f.write("\nTop allocators at each method's sampled peak:\n")
+            for line in format_top_allocators(memory_stats):
+                f.write(line + "\n")
     
-    df.to_csv("results/detailed_results.csv", index=False, encoding='utf-8')
+    run_id = ResultsStore(store_dir).append_run(df, error_analysis=error_analysis, aggregates=aggregates)
     
     error_examples_path = "results/error_examples.json"
     with open(error_examples_path, 'w', encoding='utf-8') as f:
         json.dump(error_analysis, f, ensure_ascii=False, indent=2)
     
     print(f"Report saved to {output_path}")
-    print(f"Detailed results saved to results/detailed_results.csv")
+    print(f"Detailed results saved to {store_dir} (run {run_id})")
     print(f"Error analysis saved to {error_examples_path}")
 
 def main():
     parser = argparse.ArgumentParser(description='Text Summarization Evaluation')
     parser.add_argument('--collect', action='store_true', help='Collect news articles')
-    parser.add_argument('--data', type=str, default='data/articles.json', help='Path to articles JSON file')
+    parser.add_argument('--data', type=str, default=None,
+                        help='Path to articles JSON or JSONL file (default: the collected store, data/articles.jsonl, '
+                             'or data/articles.json)')
     parser.add_argument('--num-samples', type=int, default=None, help='Number of articles to evaluate')
     parser.add_argument('--output', type=str, default='results/report.txt', help='Output report path')
+    parser.add_argument('--compile-t5', action='store_true',
+                        help='Use the compiled static-cache generation path for T5')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='Run extractive methods on a process pool of this size alongside batched abstractive models')
+    parser.add_argument('--batch-size', type=int, default=8, help='Abstractive micro-batch size with --workers')
+    parser.add_argument('--method-concurrency', type=str, default='',
+                        help='Per-method in-flight limits with --workers, e.g. "BART=8,TextRank=2"')
+    parser.add_argument('--run-log', type=str, default='results/run_log.jsonl',
+                        help='Append-only log that every finished article is written to')
+    parser.add_argument('--resume', action='store_true',
+                        help='Skip articles already recorded in --run-log for the same method and config')
+    parser.add_argument('--overwrite', action='store_true',
+                        help='Discard the results already in --run-log and start a new log')
+    parser.add_argument('--instrument', action='store_true',
+                        help='Record per-stage latency histograms (segmentation, TF-IDF, generation, ROUGE, ...)')
+    parser.add_argument('--instrument-output', type=str, default='results/stage_latencies.json',
+                        help='Where to write the stage latency histograms with --instrument')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='Record peak RSS and tracemalloc top allocators per method and article size '
+                             '(runs sequentially, timings include tracing overhead)')
+    parser.add_argument('--dedup', action='store_true',
+                        help='Summarize one representative per group of near-duplicate articles (MinHash LSH) '
+                             'and share its summaries across the group')
+    parser.add_argument('--dedup-threshold', type=float, default=0.8,
+                        help='Shingle Jaccard similarity at which articles count as near-duplicates')
+    parser.add_argument('--dedup-num-perm', type=int, default=128, help='MinHash signature length with --dedup')
+    parser.add_argument('--dedup-shingle-size', type=int, default=5, help='Words per shingle with --dedup')
+    parser.add_argument('--memory-output', type=str, default='results/memory_profile.json',
+                        help='Where to write the memory profile with --profile-memory')
+    parser.add_argument('--segmenter', type=str, default=None, choices=['punkt', 'regex'],
+                        help='Sentence segmenter backend (default: $SUMMARIZER_SEGMENTER or punkt)')
+    parser.add_argument('--fast-load', action='store_true',
+                        help='Load BART / T5 from a memory-mapped safetensors file (same as SUMMARIZER_FAST_LOAD=1)')
     
     args = parser.parse_args()
     
+    if args.segmenter:
+        # Through the environment, so worker processes build the same backend
+        os.environ['SUMMARIZER_SEGMENTER'] = args.segmenter
+    if args.fast_load:
+        os.environ['SUMMARIZER_FAST_LOAD'] = '1'
+    
     if args.collect:
         print("Collecting news articles...")
-        collector = NewsCollector()
-        bbc_articles = collector.collect_bbc_news(num_articles=500)
-        guardian_articles = collector.collect_guardian_news(num_articles=400)
-        fox_articles = collector.collect_fox_news(num_articles=300)
-        all_articles = bbc_articles + guardian_articles + fox_articles
-        collector.save_articles(all_articles, "articles.json")
-        print(f"Collected {len(all_articles)} articles")
+        store = ArticleStore(DEFAULT_STORE_PATH)
+        collector = NewsCollector(cache_dir='data/page_cache', store=store)
+        try:
+            all_articles = collector.collect_all({'bbc': 500, 'guardian': 400, 'fox': 300})
+        finally:
+            collector.close()
+        print(f"Collected {len(all_articles)} new articles, {len(store)} in {DEFAULT_STORE_PATH}")
+        store.close()
         print("Data collection complete. Run without --collect to evaluate.")
         return
     
+    if args.data is None:
+        args.data = DEFAULT_STORE_PATH if os.path.exists(DEFAULT_STORE_PATH) else 'data/articles.json'
+    
     if not os.path.exists(args.data):
         print(f"Data file {args.data} not found. Use --collect to collect articles first.")
         return
     
+    try:
+        result_log = ResultLog(args.run_log, resume=args.resume, overwrite=args.overwrite)
+    except FileExistsError:
+        print(f"{args.run_log} already holds results. Use --resume to continue that run "
+              f"or --overwrite to discard it.")
+        return
+    
+    if args.instrument:
+        instrumentation.enable()
+    
     print("Loading articles...")
-    articles = load_data(args.data)
+    articles = load_data(args.data, num_samples=args.num_samples)
     print(f"Loaded {len(articles)} articles")
     
     if args.num_samples:
@@ -205,15 +404,37 @@ def main():
     train_articles, test_articles = split_data(articles, train_ratio=0.8)
     print(f"Train: {len(train_articles)}, Test: {len(test_articles)}")
     
+    memory_profiler = MemoryProfiler() if args.profile_memory else None
+    
     print("Evaluating summarizers on test set...")
-    results = evaluate_summarizers(test_articles, num_samples=None)
+    results = evaluate_summarizers(test_articles, num_samples=None, compile_t5=args.compile_t5,
+                                   workers=args.workers, batch_size=args.batch_size,
+                                   method_concurrency=parse_method_concurrency(args.method_concurrency),
+                                   result_log=result_log,
+                                   memory_profiler=memory_profiler,
+                                   dedup=NearDuplicateIndex(args.dedup_threshold, args.dedup_num_perm,
+                                                            args.dedup_shingle_size) if args.dedup else None)
+    
+    stage_stats = None
+    if args.instrument:
+        stage_stats = instrumentation.summary()
+        instrumentation.export_json(args.instrument_output)
+        print(f"Stage latencies saved to {args.instrument_output}")
+    
+    memory_stats = None
+    if memory_profiler:
+        memory_stats = memory_profiler.summary()
+        memory_profiler.export_json(args.memory_output, memory_stats)
+        print(f"Memory profile saved to {args.memory_output}")
     
     print("Generating report...")
-    generate_report(results, args.output)
+    generate_report(results, args.output, stage_stats=stage_stats, memory_stats=memory_stats,
+                    aggregates=result_log.latest_aggregates())
     
     print("Generating full report with visualizations...")
     from generate_full_report import generate_full_report
-    generate_full_report()
+    generate_full_report(stage_latencies_path=args.instrument_output if args.instrument else None,
+                         memory_profile_path=args.memory_output if args.profile_memory else None)
     
     print("Evaluation complete!")
 
@@ -0,0 +1,221 @@
+import os
+import sys
+import json
+import resource
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, List
+
+SIZE_BUCKETS = [(10, '<=10'), (30, '11-30'), (100, '31-100'), (300, '101-300')]
+
+IGNORED_FILES = [tracemalloc.__file__, threading.__file__, __file__, '<frozen importlib._bootstrap>']
+
+def size_bucket(num_sentences: int) -> str:
+    for limit, label in SIZE_BUCKETS:
+        if num_sentences <= limit:
+            return label
+    return f'>{SIZE_BUCKETS[-1][0]}'
+
+def _status_kb(field: str) -> int:
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return -1
+
+def current_rss() -> int:
+    return _status_kb('VmRSS')
+
+def peak_rss() -> int:
+    peak = _status_kb('VmHWM')
+    if peak >= 0:
+        return peak
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+def reset_peak_rss() -> bool:
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+class _PeakSampler(threading.Thread):
+    def __init__(self, baseline: int, interval: float, min_growth: int):
+        super().__init__(daemon=True)
+        self.baseline = baseline
+        self.interval = interval
+        self.min_growth = min_growth
+        self.peak = 0
+        self.snapshot = None
+        self._stopped = threading.Event()
+    
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            growth = tracemalloc.get_traced_memory()[0] - self.baseline
+            if growth > max(self.min_growth, self.peak * 1.25):
+                self.snapshot = tracemalloc.take_snapshot()
+                self.peak = growth
+    
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+class MemoryProfiler:
+    def __init__(self, top_n: int = 10, sample_interval: float = 0.005, min_growth: int = 1 << 20):
+        self.top_n = top_n
+        self.sample_interval = sample_interval
+        self.min_growth = min_growth
+        self.rss_resettable = False
+        self._groups = {}
+        self._started_tracing = False
+    
+    def start(self):
+        self.rss_resettable = reset_peak_rss()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+    
+    def stop(self):
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+    
+    @contextmanager
+    def profile(self, method_name: str, num_sentences: int):
+        filters = [tracemalloc.Filter(False, filename) for filename in IGNORED_FILES]
+        baseline_snapshot = tracemalloc.take_snapshot().filter_traces(filters)
+        
+        reset_peak_rss()
+        rss_before = current_rss()
+        peak_before = peak_rss()
+        tracemalloc.reset_peak()
+        traced_before = tracemalloc.get_traced_memory()[0]
+        
+        sampler = _PeakSampler(traced_before, self.sample_interval, self.min_growth)
+        sampler.start()
+        try:
+            yield
+        finally:
+            sampler.stop()
+            traced_peak = tracemalloc.get_traced_memory()[1] - traced_before
+            rss_peak = peak_rss()
+            rss_growth = max(rss_peak - (rss_before if self.rss_resettable else peak_before), 0)
+            
+            allocators = []
+            if sampler.snapshot is not None:
+                snapshot = sampler.snapshot.filter_traces(filters)
+                for stat in snapshot.compare_to(baseline_snapshot, 'lineno')[:self.top_n]:
+                    if stat.size_diff <= 0:
+                        continue
+                    frame = stat.traceback[0]
+                    allocators.append({'location': f"{frame.filename}:{frame.lineno}",
+                                       'size_bytes': stat.size_diff, 'count': stat.count_diff})
+            
+            self._record(method_name, size_bucket(num_sentences), traced_peak, rss_peak, rss_growth,
+                         sampler.peak, allocators)
+    
+    def _record(self, method_name: str, bucket: str, traced_peak: int, rss_peak: int, rss_growth: int,
+                sampled_peak: int, allocators: List[Dict]):
+        group = self._groups.setdefault(method_name, {}).setdefault(bucket, {
+            'calls': 0,
+            'traced_peak_total': 0,
+            'traced_peak_max': 0,
+            'rss_growth_total': 0,
+            'rss_growth_max': 0,
+            'rss_peak_max': 0,
+            'sampled_peak': 0,
+            'top_allocators': []
+        })
+        group['calls'] += 1
+        group['traced_peak_total'] += traced_peak
+        group['traced_peak_max'] = max(group['traced_peak_max'], traced_peak)
+        group['rss_growth_total'] += rss_growth
+        group['rss_growth_max'] = max(group['rss_growth_max'], rss_growth)
+        group['rss_peak_max'] = max(group['rss_peak_max'], rss_peak)
+        if allocators and sampled_peak > group['sampled_peak']:
+            group['sampled_peak'] = sampled_peak
+            group['top_allocators'] = allocators
+    
+    def summary(self) -> Dict:
+        methods = {}
+        for method_name, buckets in self._groups.items():
+            labels = [label for _, label in SIZE_BUCKETS] + [f'>{SIZE_BUCKETS[-1][0]}']
+            method_buckets = {}
+            for label in labels:
+                if label not in buckets:
+                    continue
+                group = buckets[label]
+                method_buckets[label] = {
+                    'calls': group['calls'],
+                    'traced_peak_mean': group['traced_peak_total'] / group['calls'],
+                    'traced_peak_max': group['traced_peak_max'],
+                    'rss_growth_mean': group['rss_growth_total'] / group['calls'],
+                    'rss_growth_max': group['rss_growth_max'],
+                    'rss_peak_max': group['rss_peak_max'],
+                    'top_allocators': group['top_allocators']
+                }
+            
+            heaviest = max(method_buckets.values(), key=lambda b: (bool(b['top_allocators']), b['traced_peak_max']))
+            methods[method_name] = {
+                'calls': sum(b['calls'] for b in method_buckets.values()),
+                'traced_peak_max': max(b['traced_peak_max'] for b in method_buckets.values()),
+                'rss_growth_max': max(b['rss_growth_max'] for b in method_buckets.values()),
+                'rss_peak_max': max(b['rss_peak_max'] for b in method_buckets.values()),
+                'top_allocators': heaviest['top_allocators'],
+                'buckets': method_buckets
+            }
+        
+        return {
+            'process_peak_rss': peak_rss() if not self.rss_resettable else max(
+                [m['rss_peak_max'] for m in methods.values()] + [current_rss()]),
+            'rss_resettable': self.rss_resettable,
+            'methods': methods
+        }
+    
+    def export_json(self, path: str, summary: Dict = None):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(summary or self.summary(), f, indent=2)
+
+def _mib(value: float) -> str:
+    return f"{value / 2**20:.1f}"
+
+def format_memory_table(summary: Dict, markdown: bool = False) -> List[str]:
+    rows = []
+    for method_name, method in summary['methods'].items():
+        for bucket, stats in method['buckets'].items():
+            rows.append([method_name, bucket, str(stats['calls']), _mib(stats['rss_growth_mean']),
+                         _mib(stats['rss_growth_max']), _mib(stats['traced_peak_mean']),
+                         _mib(stats['traced_peak_max'])])
+    
+    headers = ['Method', 'Sentences', 'Calls', 'RSS growth mean (MiB)', 'RSS growth max (MiB)',
+               'Traced peak mean (MiB)', 'Traced peak max (MiB)']
+    
+    if markdown:
+        lines = ["| " + " | ".join(headers) + " |", "|" + "|".join("---" for _ in headers) + "|"]
+        lines.extend("| " + " | ".join(row) + " |" for row in rows)
+    else:
+        lines = [f"{'Method':12s}{'Sentences':>10s}{'Calls':>7s}{'RSS mean':>11s}{'RSS max':>10s}"
+                 f"{'Traced mean':>13s}{'Traced max':>12s}  (MiB)"]
+        lines.extend(f"{r[0]:12s}{r[1]:>10s}{r[2]:>7s}{r[3]:>11s}{r[4]:>10s}{r[5]:>13s}{r[6]:>12s}" for r in rows)
+    return lines
+
+def format_top_allocators(summary: Dict, limit: int = 5, markdown: bool = False) -> List[str]:
+    lines = []
+    for method_name, method in summary['methods'].items():
+        if not method['top_allocators']:
+            continue
+        lines.append(f"**{method_name}**" if markdown else f"{method_name}:")
+        for allocator in method['top_allocators'][:limit]:
+            prefix = "- " if markdown else "  "
+            lines.append(f"{prefix}{_mib(allocator['size_bytes'])} MiB in {allocator['count']} blocks at "
+                         f"{allocator['location']}")
+        if markdown:
+            lines.append("")
+    return lines
@@ -0,0 +1,132 @@
+import os
+import json
+import mmap
+import shutil
+import struct
+import tempfile
+import torch
+from typing import Dict, Tuple
+from transformers import AutoConfig, AutoTokenizer, AutoModelForSeq2SeqLM, GenerationConfig
+from transformers.utils import cached_file
+
+MODEL_CACHE_DIR = os.environ.get('SUMMARIZER_MODEL_CACHE', 'models/safetensors')
+SAFETENSORS_NAME = 'model.safetensors'
+SAFETENSORS_DTYPES = {
+    'F64': torch.float64, 'F32': torch.float32, 'F16': torch.float16, 'BF16': torch.bfloat16,
+    'I64': torch.int64, 'I32': torch.int32, 'I16': torch.int16, 'I8': torch.int8, 'U8': torch.uint8,
+    'BOOL': torch.bool
+}
+
+_loaded: Dict[str, Tuple[object, object]] = {}
+
+def convert_checkpoint(model_name: str, output_dir: str) -> str:
+    # One-off conversion of a .bin or sharded checkpoint to a single safetensors file
+    print(f"Converting {model_name} to safetensors in {output_dir}")
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+    parent = os.path.dirname(os.path.abspath(output_dir))
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix='.convert-', dir=parent)
+    try:
+        model.save_pretrained(tmp_dir, safe_serialization=True, max_shard_size='1000GB')
+        # os.replace cannot move a directory over a non-empty one, e.g. a conversion left half-finished
+        if os.path.isdir(output_dir):
+            shutil.rmtree(output_dir)
+        os.replace(tmp_dir, output_dir)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return os.path.join(output_dir, SAFETENSORS_NAME)
+
+def safetensors_path(model_name: str, cache_dir: str = MODEL_CACHE_DIR) -> str:
+    local_path = os.path.join(model_name, SAFETENSORS_NAME)
+    if os.path.isfile(local_path):
+        return local_path
+    
+    converted = os.path.join(cache_dir, model_name.strip('/').replace('/', '--'), SAFETENSORS_NAME)
+    if os.path.isfile(converted):
+        return converted
+    
+    if not os.path.isdir(model_name):
+        try:
+            path = cached_file(model_name, SAFETENSORS_NAME, _raise_exceptions_for_missing_entries=False)
+        except Exception:
+            path = None
+        if path:
+            return path
+    return convert_checkpoint(model_name, os.path.dirname(converted))
+
+def mmap_state_dict(path: str) -> Dict[str, torch.Tensor]:
+    # Tensors are views of a private (copy-on-write) mapping of the file: nothing is read until a page is
+    # touched, and unmodified pages stay shared through the page cache with every process mapping the file
+    with open(path, 'rb') as f:
+        header_size = struct.unpack('<Q', f.read(8))[0]
+        header = json.loads(f.read(header_size))
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    
+    data_start = 8 + header_size
+    state_dict = {}
+    for name, info in header.items():
+        if name == '__metadata__':
+            continue
+        dtype = SAFETENSORS_DTYPES[info['dtype']]
+        begin, end = info['data_offsets']
+        if begin == end:
+            state_dict[name] = torch.empty(info['shape'], dtype=dtype)
+            continue
+        state_dict[name] = torch.frombuffer(mapped, dtype=dtype, count=(end - begin) // dtype.itemsize,
+                                            offset=data_start + begin).view(info['shape'])
+    return state_dict
+
+def load_mapped_model(model_name: str, cache_dir: str = MODEL_CACHE_DIR):
+    path = safetensors_path(model_name, cache_dir)
+    config = AutoConfig.from_pretrained(model_name)
+    
+    # Modules are built on the meta device, so no weights are allocated or randomly initialized;
+    # load_state_dict(assign=True) then swaps the mapped tensors in as the parameters
+    with torch.device('meta'):
+        model = AutoModelForSeq2SeqLM.from_config(config)
+    default_dtype = torch.get_default_dtype()
+    state_dict = {name: tensor if not tensor.is_floating_point() or tensor.dtype == default_dtype
+                  else tensor.to(default_dtype)
+                  for name, tensor in mmap_state_dict(path).items()}
+    model.load_state_dict(state_dict, strict=False, assign=True)
+    model.tie_weights()
+    
+    missing = [name for name, tensor in list(model.named_parameters()) + list(model.named_buffers())
+               if tensor.is_meta]
+    if missing:
+        raise ValueError(f"{len(missing)} tensors not in {path}, e.g. {missing[0]}")
+    
+    try:
+        model.generation_config = GenerationConfig.from_pretrained(model_name)
+    except Exception:
+        pass
+    return model.eval()
+
+def load_seq2seq(model_name: str, fast: bool = None, shared: bool = False, cache_dir: str = MODEL_CACHE_DIR):
+    # Returns (tokenizer, model). The memory-mapped loader is opt-in (fast=True or SUMMARIZER_FAST_LOAD=1).
+    # shared=True reuses one model across the summarizers in this process that also ask for sharing; they
+    # all see any .to() or in-place change, and the model stays loaded until clear_shared().
+    if fast is None:
+        fast = os.environ.get('SUMMARIZER_FAST_LOAD', '') == '1'
+    key = f"{model_name}:{'fast' if fast else 'standard'}"
+    if shared and key in _loaded:
+        return _loaded[key]
+    
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = None
+    if fast:
+        try:
+            model = load_mapped_model(model_name, cache_dir)
+        except Exception as e:
+            print(f"Fast load failed for {model_name}: {e}")
+            print("Falling back to from_pretrained")
+    if model is None:
+        model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+    
+    if shared:
+        _loaded[key] = (tokenizer, model)
+    return tokenizer, model
+
+def clear_shared(model_name: str = None):
+    for key in [key for key in _loaded if model_name is None or key.rsplit(':', 1)[0] == model_name]:
+        del _loaded[key]
@@ -0,0 +1,235 @@
+import re
+import json
+import time
+import zlib
+import random
+import argparse
+import numpy as np
+from itertools import combinations
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+from article_stream import iter_articles
+
+TOKEN_RE = re.compile(r"\w+")
+SHINGLE_PRIME = np.uint64(1099511628211)
+
+def shingle_hashes(text: str, shingle_size: int = 5) -> np.ndarray:
+    tokens = TOKEN_RE.findall(text.lower())
+    if not tokens:
+        return np.zeros(0, dtype=np.uint64)
+    size = min(shingle_size, len(tokens))
+    
+    ids = np.fromiter((zlib.crc32(token.encode('utf-8')) for token in tokens), dtype=np.uint64, count=len(tokens))
+    count = len(tokens) - size + 1
+    hashes = np.zeros(count, dtype=np.uint64)
+    for offset in range(size):
+        hashes = hashes * SHINGLE_PRIME + ids[offset:offset + count]
+    hashes ^= hashes >> np.uint64(32)
+    return np.unique(hashes & np.uint64(0xFFFFFFFF))
+
+def choose_bands(threshold: float, num_perm: int, recall_weight: float = 0.9) -> Tuple[int, int]:
+    # Pick the bands x rows split whose S-curve 1 - (1 - s^r)^b has the least weighted false-positive area
+    # below the threshold plus false-negative area above it. Candidates are verified on the full signature,
+    # so false positives only cost a comparison and misses are weighted more heavily by default.
+    similarity = np.linspace(0, 1, 101)
+    below, above = similarity <= threshold, similarity >= threshold
+    best, best_error = (1, num_perm), None
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            probability = 1 - (1 - similarity ** rows) ** bands
+            error = (1 - recall_weight) * probability[below].sum() + recall_weight * (1 - probability[above]).sum()
+            if best_error is None or error < best_error:
+                best, best_error = (bands, rows), error
+    return best
+
+class MinHasher:
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+    
+    def signature(self, text: str) -> np.ndarray:
+        shingles = shingle_hashes(text, self.shingle_size)
+        if len(shingles) == 0:
+            return np.full(self.num_perm, 0xFFFFFFFF, dtype=np.uint32)
+        # Multiply-shift hashing: one independent-ish permutation per row, minimum over the shingles
+        hashed = (self.a[:, None] * shingles[None, :] + self.b[:, None]) >> np.uint64(32)
+        return hashed.min(axis=1).astype(np.uint32)
+
+class NearDuplicateIndex:
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, shingle_size: int = 5, bands: int = None,
+                 recall_weight: float = 0.9, seed: int = 1):
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm, shingle_size, seed)
+        if bands:
+            self.bands, self.rows = bands, num_perm // bands
+        else:
+            self.bands, self.rows = choose_bands(threshold, num_perm, recall_weight)
+        self.buckets: List[Dict[bytes, List[Hashable]]] = [{} for _ in range(self.bands)]
+        self.signatures: Dict[Hashable, np.ndarray] = {}
+        self.parent: Dict[Hashable, Hashable] = {}
+        self.candidates_checked = 0
+    
+    def _find(self, key: Hashable) -> Hashable:
+        root = key
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[key] != root:
+            self.parent[key], key = root, self.parent[key]
+        return root
+    
+    def add(self, key: Hashable, text: str) -> Hashable:
+        # Returns the representative of key's group: key itself unless an earlier article is a near-duplicate
+        signature = self.hasher.signature(text)
+        band_keys = [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+        
+        candidates = set()
+        for buckets, band_key in zip(self.buckets, band_keys):
+            candidates.update(buckets.get(band_key, ()))
+        
+        best_key, best_similarity = None, self.threshold
+        for candidate in candidates:
+            self.candidates_checked += 1
+            similarity = float(np.mean(self.signatures[candidate] == signature))
+            if similarity >= best_similarity:
+                best_key, best_similarity = candidate, similarity
+        
+        self.signatures[key] = signature
+        self.parent[key] = key
+        for buckets, band_key in zip(self.buckets, band_keys):
+            buckets.setdefault(band_key, []).append(key)
+        
+        if best_key is None:
+            return key
+        self.parent[key] = self._find(best_key)
+        return self.parent[key]
+    
+    def representative(self, key: Hashable) -> Hashable:
+        return self._find(key)
+    
+    def groups(self) -> List[List[Hashable]]:
+        groups = {}
+        for key in self.signatures:
+            groups.setdefault(self._find(key), []).append(key)
+        return list(groups.values())
+
+def jaccard(a: Set, b: Set) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+def exact_pairs(texts: Dict[Hashable, str], threshold: float, shingle_size: int = 5) -> Set[Tuple]:
+    shingles = {key: set(shingle_hashes(text, shingle_size).tolist()) for key, text in texts.items()}
+    return {tuple(sorted((a, b), key=str)) for a, b in combinations(shingles, 2)
+            if jaccard(shingles[a], shingles[b]) >= threshold}
+
+def group_pairs(groups: Iterable[List[Hashable]]) -> Set[Tuple]:
+    return {tuple(sorted(pair, key=str)) for group in groups for pair in combinations(group, 2)}
+
+def pair_metrics(predicted: Set[Tuple], expected: Set[Tuple]) -> Dict:
+    true_positives = len(predicted & expected)
+    precision = true_positives / len(predicted) if predicted else 1.0
+    recall = true_positives / len(expected) if expected else 1.0
+    return {
+        'predicted_pairs': len(predicted),
+        'true_pairs': len(expected),
+        'true_positives': true_positives,
+        'precision': precision,
+        'recall': recall,
+        'f1': 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    }
+
+def make_wire_corpus(num_stories: int, copies: int = 3, edit_rate: float = 0.1, seed: int = 0) -> List[Dict]:
+    from benchmark_suite import NewsArticleGenerator
+    generator = NewsArticleGenerator(seed)
+    rng = random.Random(seed)
+    articles = []
+    for story in range(num_stories):
+        base = generator.article(rng.randint(12, 30), index=story)
+        sentences = re.split(r'(?<=[.!?]) ', base['text'].replace('\n\n', ' '))
+        for copy in range(rng.randint(1, copies)):
+            edited = [generator.sentence(rng) if copy and rng.random() < edit_rate else sentence
+                      for sentence in sentences]
+            if copy and len(edited) > 10:
+                edited = edited[:-rng.randint(1, 2)]
+            articles.append({
+                'title': base['title'] if not copy else f"{base['title']} - update {copy}",
+                'text': ' '.join(edited),
+                'url': f"https://wire.example/{story}/{copy}",
+                'story': story
+            })
+    rng.shuffle(articles)
+    return articles
+
+def main():
+    parser = argparse.ArgumentParser(description='Find near-duplicate articles with MinHash LSH')
+    parser.add_argument('--data', type=str, default=None, help='Articles JSON / JSONL file')
+    parser.add_argument('--synthetic', type=int, default=0,
+                        help='Instead of --data, generate this many wire stories with edited copies')
+    parser.add_argument('--num-samples', type=int, default=None, help='Articles to read from --data')
+    parser.add_argument('--threshold', type=float, default=0.8, help='Jaccard similarity for near-duplicates')
+    parser.add_argument('--num-perm', type=int, default=128, help='MinHash signature length')
+    parser.add_argument('--shingle-size', type=int, default=5, help='Words per shingle')
+    parser.add_argument('--bands', type=int, default=None, help='LSH bands (default: chosen from the threshold)')
+    parser.add_argument('--recall-weight', type=float, default=0.9,
+                        help='Weight of missed pairs against extra candidates when choosing bands')
+    parser.add_argument('--max-eval', type=int, default=2000,
+                        help='Articles compared all-pairs with exact Jaccard for precision / recall')
+    parser.add_argument('--output', type=str, default='results/near_duplicates.json', help='Where to write groups')
+    
+    args = parser.parse_args()
+    
+    if args.synthetic:
+        articles = make_wire_corpus(args.synthetic)
+    else:
+        articles = list(iter_articles(args.data or 'data/articles.jsonl', num_samples=args.num_samples))
+    articles = [a for a in articles if a.get('text')]
+    
+    index = NearDuplicateIndex(args.threshold, args.num_perm, args.shingle_size, args.bands, args.recall_weight)
+    start_time = time.perf_counter()
+    for position, article in enumerate(articles):
+        index.add(position, article['text'])
+    elapsed = time.perf_counter() - start_time
+    
+    groups = [group for group in index.groups() if len(group) > 1]
+    print(f"Indexed {len(articles)} articles in {elapsed:.2f}s ({elapsed / max(len(articles), 1) * 1000:.2f} ms each, "
+          f"{index.bands} bands x {index.rows} rows)")
+    print(f"Candidate comparisons: {index.candidates_checked} "
+          f"(all-pairs would be {len(articles) * (len(articles) - 1) // 2})")
+    print(f"Near-duplicate groups: {len(groups)} covering {sum(len(g) for g in groups)} articles; "
+          f"{sum(len(g) - 1 for g in groups)} summaries saved")
+    
+    evaluated = range(min(len(articles), args.max_eval))
+    sample_groups = [[key for key in group if key in evaluated] for group in index.groups()]
+    predicted = group_pairs(sample_groups)
+    results = {
+        'articles': len(articles),
+        'threshold': args.threshold,
+        'bands': index.bands,
+        'rows': index.rows,
+        'index_seconds': elapsed,
+        'candidates_checked': index.candidates_checked,
+        'groups': [[articles[key].get('url', key) for key in group] for group in groups],
+        'vs_exact_jaccard': pair_metrics(predicted, exact_pairs({key: articles[key]['text'] for key in evaluated},
+                                                                args.threshold, args.shingle_size))
+    }
+    metrics = results['vs_exact_jaccard']
+    print(f"Against exact Jaccard >= {args.threshold} on {len(evaluated)} articles: precision "
+          f"{metrics['precision']:.3f}, recall {metrics['recall']:.3f} ({metrics['true_pairs']} true pairs)")
+    
+    if args.synthetic:
+        stories = {}
+        for key in evaluated:
+            stories.setdefault(articles[key]['story'], []).append(key)
+        results['vs_planted_copies'] = pair_metrics(predicted, group_pairs(stories.values()))
+        metrics = results['vs_planted_copies']
+        print(f"Against planted copies: precision {metrics['precision']:.3f}, recall {metrics['recall']:.3f} "
+              f"({metrics['true_pairs']} true pairs)")
+    
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from typing import Dict, Optional
+
+class PageCache:
+    def __init__(self, root: str = "data/page_cache", max_bytes: int = 512 * 2**20):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.join(root, 'bodies'), exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(os.path.join(root, 'index.sqlite'), check_same_thread=False)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                parsed TEXT,
+                parsed_hash TEXT,
+                parsed_size INTEGER NOT NULL DEFAULT 0
+            )""")
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(pages)")}
+        if 'parsed_size' not in columns:
+            # Caches written before parse results counted towards max_bytes
+            self.db.execute("ALTER TABLE pages ADD COLUMN parsed_size INTEGER NOT NULL DEFAULT 0")
+            self.db.execute("UPDATE pages SET parsed_size = COALESCE(LENGTH(CAST(parsed AS BLOB)), 0)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed_at)")
+        self.db.commit()
+        self.total_bytes = self.db.execute("SELECT COALESCE(SUM(size + parsed_size), 0) FROM pages").fetchone()[0]
+        self._evict()
+        self.db.commit()
+    
+    def _body_path(self, url: str) -> str:
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.root, 'bodies', key[:2], key)
+    
+    def lookup(self, url: str) -> Optional[Dict]:
+        with self.lock:
+            row = self.db.execute("SELECT etag, last_modified, content_hash, size FROM pages WHERE url = ?",
+                                  (url,)).fetchone()
+        if row is None:
+            return None
+        return {'etag': row[0], 'last_modified': row[1], 'content_hash': row[2], 'size': row[3]}
+    
+    def conditional_headers(self, entry: Optional[Dict]) -> Dict[str, str]:
+        headers = {}
+        if entry and entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+    
+    def read(self, url: str) -> Optional[bytes]:
+        try:
+            with open(self._body_path(url), 'rb') as f:
+                body = f.read()
+        except OSError:
+            self.discard(url)
+            return None
+        
+        with self.lock:
+            self.db.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (time.time(), url))
+            self.db.commit()
+        return body
+    
+    def store(self, url: str, body: bytes, etag: str = None, last_modified: str = None) -> str:
+        content_hash = hashlib.sha256(body).hexdigest()
+        path = self._body_path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+        
+        now = time.time()
+        with self.lock:
+            old = self.db.execute("SELECT size + parsed_size FROM pages WHERE url = ?", (url,)).fetchone()
+            # A new body drops the parse result of the old one
+            self.db.execute("""
+                INSERT INTO pages (url, etag, last_modified, content_hash, size, fetched_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET etag = excluded.etag, last_modified = excluded.last_modified,
+                    parsed = CASE WHEN content_hash = excluded.content_hash THEN parsed END,
+                    parsed_hash = CASE WHEN content_hash = excluded.content_hash THEN parsed_hash END,
+                    parsed_size = CASE WHEN content_hash = excluded.content_hash THEN parsed_size ELSE 0 END,
+                    content_hash = excluded.content_hash, size = excluded.size, fetched_at = excluded.fetched_at,
+                    accessed_at = excluded.accessed_at""",
+                (url, etag, last_modified, content_hash, len(body), now, now))
+            new = self.db.execute("SELECT size + parsed_size FROM pages WHERE url = ?", (url,)).fetchone()
+            self.total_bytes += new[0] - (old[0] if old else 0)
+            self._evict()
+            self.db.commit()
+        return content_hash
+    
+    def get_parsed(self, url: str, content_hash: str, parser: str = ''):
+        with self.lock:
+            row = self.db.execute("SELECT parsed FROM pages WHERE url = ? AND parsed_hash = ?",
+                                  (url, f"{parser}:{content_hash}")).fetchone()
+        if row is None:
+            return None, False
+        return json.loads(row[0]), True
+    
+    def set_parsed(self, url: str, content_hash: str, value, parser: str = ''):
+        # parsed_hash ties the result to both the body and the parser that produced it
+        parsed = json.dumps(value, ensure_ascii=False)
+        size = len(parsed.encode('utf-8'))
+        with self.lock:
+            old = self.db.execute("SELECT parsed_size FROM pages WHERE url = ?", (url,)).fetchone()
+            if old is None:
+                return
+            self.db.execute("UPDATE pages SET parsed = ?, parsed_hash = ?, parsed_size = ? WHERE url = ?",
+                            (parsed, f"{parser}:{content_hash}", size, url))
+            self.total_bytes += size - old[0]
+            self._evict()
+            self.db.commit()
+    
+    def discard(self, url: str):
+        with self.lock:
+            self._remove(url)
+            self.db.commit()
+    
+    def _remove(self, url: str):
+        row = self.db.execute("SELECT size + parsed_size FROM pages WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return
+        self.db.execute("DELETE FROM pages WHERE url = ?", (url,))
+        self.total_bytes -= row[0]
+        try:
+            os.remove(self._body_path(url))
+        except OSError:
+            pass
+    
+    def _evict(self):
+        # Least recently used first, down to 90% of the cap so eviction is not triggered on every store
+        if self.total_bytes <= self.max_bytes:
+            return
+        target = self.max_bytes * 0.9
+        for url, size in self.db.execute("SELECT url, size + parsed_size FROM pages ORDER BY accessed_at").fetchall():
+            if self.total_bytes <= target:
+                break
+            self._remove(url)
+    
+    def stats(self) -> Dict:
+        with self.lock:
+            pages = self.db.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+        return {'pages': pages, 'bytes': self.total_bytes, 'max_bytes': self.max_bytes}
+    
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -0,0 +1,182 @@
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, Tuple, Union
+from preprocessing import TextPreprocessor
+from instrumentation import instrumentation
+from corpus_arena import CorpusArena
+
+_worker_summarizers = None
+_worker_arena = None
+
+def _init_extractive_worker(extractive_classes: Dict[str, type], instrument: bool = False, arena_root: str = None):
+    global _worker_summarizers, _worker_arena
+    instrumentation.enable(instrument)
+    preprocessor = TextPreprocessor()
+    _worker_summarizers = {name: cls(preprocessor) for name, cls in extractive_classes.items()}
+    _worker_arena = CorpusArena(arena_root) if arena_root else None
+
+def _run_extractive(method_name: str, text: Union[str, Tuple[int, int]], num_sentences: int,
+                    preprocess: bool = False) -> Tuple[str, float, Dict]:
+    summarizer = _worker_summarizers[method_name]
+    if preprocess:
+        # Raw text (from the service) is cleaned here in the worker rather than on the caller's thread
+        text = summarizer.preprocessor.preprocess(text)
+    start_time = time.time()
+    if isinstance(text, str):
+        summary = summarizer.summarize(text, num_sentences=num_sentences)
+    else:
+        # A (start, end) byte span into the shared arena: only the sentences are decoded when the method
+        # takes them, and the whole text only when it does not or no spans were stored
+        sentences = _worker_arena.sentences(*text) if hasattr(summarizer, 'summarize_sentences') else None
+        if sentences is not None:
+            summary = summarizer.summarize_sentences(sentences, num_sentences=num_sentences)
+        else:
+            summary = summarizer.summarize(_worker_arena.decode(*text), num_sentences=num_sentences)
+    elapsed_time = time.time() - start_time
+    return summary, elapsed_time, instrumentation.drain() if instrumentation.enabled else None
+
+class ParallelEvaluationEngine:
+    def __init__(self, extractive_classes: Dict[str, type], abstractive_methods: Dict[str, object],
+                 generation_kwargs: Dict, num_workers: int = None, batch_size: int = 8,
+                 batch_wait: float = 0.05, method_concurrency: Dict[str, int] = None,
+                 num_sentences: int = 3, max_pending_articles: int = 64, use_arena: bool = True):
+        self.extractive_classes = extractive_classes
+        self.abstractive_methods = abstractive_methods
+        self.generation_kwargs = generation_kwargs
+        self.num_workers = num_workers or multiprocessing.cpu_count()
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.num_sentences = num_sentences
+        self.max_pending_articles = max_pending_articles
+        self.use_arena = use_arena
+        self.method_names = list(extractive_classes) + list(abstractive_methods)
+        
+        method_concurrency = method_concurrency or {}
+        self._semaphores = {}
+        for method_name in self.method_names:
+            default = self.num_workers if method_name in extractive_classes else batch_size * 2
+            self._semaphores[method_name] = threading.BoundedSemaphore(method_concurrency.get(method_name, default))
+    
+    def _abstractive_loop(self, method_name: str, jobs: queue.Queue, results: queue.Queue):
+        summarizer = self.abstractive_methods[method_name]
+        stopping = False
+        
+        while not stopping:
+            job = jobs.get()
+            if job is None:
+                break
+            
+            batch = [job]
+            deadline = time.time() + self.batch_wait
+            while len(batch) < self.batch_size:
+                try:
+                    job = jobs.get(timeout=max(deadline - time.time(), 0))
+                except queue.Empty:
+                    break
+                if job is None:
+                    stopping = True
+                    break
+                batch.append(job)
+            
+            start_time = time.time()
+            try:
+                summaries = summarizer.summarize_batch([text for _, text in batch], batch_size=self.batch_size,
+                                                       **self.generation_kwargs)
+            except Exception as e:
+                summaries = [e] * len(batch)
+            elapsed_time = (time.time() - start_time) / len(batch)
+            
+            for (item_id, _), summary in zip(batch, summaries):
+                self._semaphores[method_name].release()
+                results.put((item_id, method_name, summary, elapsed_time))
+    
+    def _submit_extractive(self, pool: ProcessPoolExecutor, item_id: int, method_name: str,
+                           text: Union[str, Tuple[int, int]], results: queue.Queue):
+        def done(future):
+            self._semaphores[method_name].release()
+            try:
+                summary, elapsed_time, stage_snapshot = future.result()
+                instrumentation.merge_snapshot(stage_snapshot)
+            except Exception as e:
+                summary, elapsed_time = e, 0.0
+            results.put((item_id, method_name, summary, elapsed_time))
+        
+        future = pool.submit(_run_extractive, method_name, text, self.num_sentences)
+        future.add_done_callback(done)
+    
+    def _drain(self, results: queue.Queue, pending: Dict, block: bool,
+               arena: CorpusArena = None) -> Iterator[Tuple[Dict, Dict]]:
+        while pending:
+            try:
+                item_id, method_name, summary, elapsed_time = results.get(block=block)
+            except queue.Empty:
+                return
+            
+            entry = pending[item_id]
+            if isinstance(summary, Exception):
+                print(f"Error with {method_name}: {summary}")
+            else:
+                entry['outputs'][method_name] = (summary, elapsed_time)
+            
+            entry['remaining'] -= 1
+            if entry['remaining'] == 0:
+                del pending[item_id]
+                if entry.get('span') is not None:
+                    arena.release(*entry['span'])
+                yield entry['item'], entry['outputs']
+                block = False
+    
+    def run(self, items: Iterable[Dict]) -> Iterator[Tuple[Dict, Dict[str, Tuple[str, float]]]]:
+        results = queue.Queue()
+        pending = {}
+        job_queues = {name: queue.Queue() for name in self.abstractive_methods}
+        threads = [threading.Thread(target=self._abstractive_loop, args=(name, jobs, results), daemon=True)
+                   for name, jobs in job_queues.items()]
+        
+        # Extractive workers get byte spans into a shared arena instead of a pickled copy of every text
+        arena = CorpusArena.create() if self.use_arena and self.extractive_classes else None
+        pool = ProcessPoolExecutor(max_workers=self.num_workers,
+                                   mp_context=multiprocessing.get_context('spawn'),
+                                   initializer=_init_extractive_worker,
+                                   initargs=(self.extractive_classes, instrumentation.enabled,
+                                             arena.root if arena is not None else None))
+        for thread in threads:
+            thread.start()
+        
+        try:
+            for item_id, item in enumerate(items):
+                while len(pending) >= self.max_pending_articles:
+                    yield from self._drain(results, pending, block=True, arena=arena)
+                
+                methods = item.get('methods', self.method_names)
+                if not methods:
+                    yield item, {}
+                    continue
+                
+                pending[item_id] = {'item': item, 'outputs': {}, 'remaining': len(methods)}
+                payload = item['text']
+                if arena is not None and any(m in self.extractive_classes for m in methods):
+                    payload = pending[item_id]['span'] = arena.add(item['text'], item.get('sentences'))
+                
+                for method_name in methods:
+                    self._semaphores[method_name].acquire()
+                    if method_name in job_queues:
+                        job_queues[method_name].put((item_id, item['text']))
+                    else:
+                        self._submit_extractive(pool, item_id, method_name, payload, results)
+                
+                yield from self._drain(results, pending, block=False, arena=arena)
+            
+            while pending:
+                yield from self._drain(results, pending, block=True, arena=arena)
+        finally:
+            for jobs in job_queues.values():
+                jobs.put(None)
+            for thread in threads:
+                thread.join()
+            pool.shutdown(wait=True, cancel_futures=True)
+            if arena is not None:
+                arena.destroy()
@@ -1,7 +1,10 @@
+import os
 import re
 import nltk
 from typing import List
 import html
+from instrumentation import span
+from sentence_segmenter import make_segmenter
 
 try:
     nltk.data.find('tokenizers/punkt')
@@ -14,8 +17,10 @@ except LookupError:
     nltk.download('punkt_tab', quiet=True)
 
 class TextPreprocessor:
-    def __init__(self):
-        self.sentence_tokenizer = nltk.tokenize.sent_tokenize
+    def __init__(self, segmenter: str = None):
+        # SUMMARIZER_SEGMENTER picks the backend for preprocessors built without one, including worker processes
+        self.segmenter = make_segmenter(segmenter or os.environ.get('SUMMARIZER_SEGMENTER', 'punkt'))
+        self.sentence_tokenizer = self.segmenter.segment
         self.url_pattern = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
         self.emoji_pattern = re.compile("["
             u"\U0001F600-\U0001F64F"
@@ -43,15 +48,17 @@ class TextPreprocessor:
         return text
     
     def preprocess(self, text: str) -> str:
-        text = self.remove_html_tags(text)
-        text = self.remove_urls(text)
-        text = self.remove_emojis(text)
-        text = self.normalize_whitespace(text)
+        with span('preprocess.clean'):
+            text = self.remove_html_tags(text)
+            text = self.remove_urls(text)
+            text = self.remove_emojis(text)
+            text = self.normalize_whitespace(text)
         return text
     
     def segment_sentences(self, text: str) -> List[str]:
-        sentences = self.sentence_tokenizer(text)
-        sentences = [s.strip() for s in sentences if len(s.strip()) > 10]
+        with span('preprocess.segment'):
+            sentences = self.sentence_tokenizer(text)
+            sentences = [s.strip() for s in sentences if len(s.strip()) > 10]
         return sentences
     
     def preprocess_and_segment(self, text: str) -> List[str]:
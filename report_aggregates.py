@@ -0,0 +1,107 @@
+import json
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+
+LOW_SCORE = 0.3
+HIGH_SCORE = 0.7
+
+def column_stats(values: np.ndarray, score: bool = False) -> Dict:
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    # An empty column has no mean; NaN rather than 0.0 so it cannot pass for a real score
+    stats = {'count': int(len(values)), 'mean': float('nan'), 'm2': 0.0, 'min': None, 'max': None}
+    if len(values):
+        stats['mean'] = float(values.mean())
+        stats['m2'] = float(((values - stats['mean']) ** 2).sum())
+        stats['min'] = float(values.min())
+        stats['max'] = float(values.max())
+    if score:
+        stats['low'] = int((values < LOW_SCORE).sum())
+        stats['high'] = int((values > HIGH_SCORE).sum())
+    return stats
+
+def value_stats(value: float, score: bool = False) -> Dict:
+    # column_stats of a single value, without the array round trip
+    value = float(value)
+    if value != value:
+        stats = {'count': 0, 'mean': float('nan'), 'm2': 0.0, 'min': None, 'max': None}
+    else:
+        stats = {'count': 1, 'mean': value, 'm2': 0.0, 'min': value, 'max': value}
+    if score:
+        stats['low'] = int(value < LOW_SCORE)
+        stats['high'] = int(value > HIGH_SCORE)
+    return stats
+
+def merge_stats(a: Dict, b: Dict) -> Dict:
+    # Chan et al.'s pairwise update, so chunks can be folded in without revisiting earlier rows
+    if not a['count']:
+        return dict(b)
+    if not b['count']:
+        return dict(a)
+    count = a['count'] + b['count']
+    delta = b['mean'] - a['mean']
+    merged = {
+        'count': count,
+        'mean': a['mean'] + delta * b['count'] / count,
+        'm2': a['m2'] + b['m2'] + delta ** 2 * a['count'] * b['count'] / count,
+        'min': min(a['min'], b['min']),
+        'max': max(a['max'], b['max'])
+    }
+    for name in ('low', 'high'):
+        if name in a:
+            merged[name] = a[name] + b[name]
+    return merged
+
+def std(stats: Dict) -> float:
+    return (stats['m2'] / (stats['count'] - 1)) ** 0.5 if stats['count'] > 1 else float('nan')
+
+class ReportAggregates:
+    def __init__(self, path: str = "results/store/aggregates.json"):
+        self.path = path
+        self.data = {'runs': {}}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.data = json.load(f)
+    
+    def save(self):
+        # A unique temp name, so two writers never replace the file with each other's half-written copy
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path) or '.',
+                                        prefix=os.path.basename(self.path) + '.', suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+    
+    def run(self, run_id: str) -> Optional[Dict]:
+        return self.data['runs'].get(run_id)
+    
+    def reset(self, run_id: str):
+        self.data['runs'][run_id] = {'num_rows': 0, 'columns': {}}
+    
+    def update(self, run_id: str, frame: pd.DataFrame):
+        run = self.data['runs'].setdefault(run_id, {'num_rows': 0, 'columns': {}})
+        for column in frame.columns:
+            if not pd.api.types.is_numeric_dtype(frame[column]):
+                continue
+            stats = column_stats(frame[column].to_numpy(), score=column.endswith('_f1'))
+            previous = run['columns'].get(column)
+            run['columns'][column] = merge_stats(previous, stats) if previous else stats
+        run['num_rows'] += len(frame)
+    
+    def add_row(self, run_id: str, row: Dict, new_row: bool = True):
+        # One row folded in without building a frame; new_row is False when the row only adds columns
+        # to a row that was already counted
+        run = self.data['runs'].setdefault(run_id, {'num_rows': 0, 'columns': {}})
+        for column, value in row.items():
+            if not isinstance(value, (int, float, np.number)):
+                continue
+            stats = value_stats(value, score=column.endswith('_f1'))
+            previous = run['columns'].get(column)
+            run['columns'][column] = merge_stats(previous, stats) if previous else stats
+        if new_row:
+            run['num_rows'] += 1
+    
+    def set_error_analysis(self, run_id: str, analysis: Dict):
+        self.data['runs'][run_id]['error_analysis'] = analysis
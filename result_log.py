@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Iterator, List, Optional, Set
+from report_aggregates import ReportAggregates
+
+def method_config_key(method_name: str, params: Dict) -> str:
+    payload = json.dumps({'method': method_name, **params}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]
+
+class ResultLog:
+    def __init__(self, path: str = "results/run_log.jsonl", resume: bool = False, overwrite: bool = False,
+                 fsync_every: int = 20, fsync_interval: float = 30.0):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        
+        # A log left by an interrupted run is only ever truncated on request
+        has_records = os.path.exists(path) and os.path.getsize(path) > 0
+        if has_records and not resume and not overwrite:
+            raise FileExistsError(f"{path} already holds logged results; resume it or ask to overwrite it")
+        
+        needs_newline = False
+        if has_records and not overwrite:
+            with open(path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b'\n'
+        
+        self._file = open(path, 'w' if overwrite else 'a', encoding='utf-8')
+        if needs_newline:
+            self._file.write('\n')
+        self._unsynced = 0
+        self._last_sync = time.time()
+        
+        # Per-column aggregates of everything logged for a method configuration, folded in as each record is
+        # appended, so an interrupted run has them too. They are rebuilt from the log on the first append after
+        # opening, which also covers records from before a resume.
+        self.aggregates_path = os.path.splitext(path)[0] + '.aggregates.json'
+        self.aggregates = ReportAggregates(self.aggregates_path)
+        if not has_records or overwrite:
+            self.aggregates.data = {'runs': {}}
+        self._aggregated: Dict[str, Set[str]] = {}
+        self._aggregates_id = None
+    
+    def _records(self) -> Iterator[Dict]:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+    
+    def completed(self, config_keys: Dict[str, str]) -> Dict[str, Set[str]]:
+        done = {method_name: set() for method_name in config_keys}
+        for record in self._records():
+            method_name = record.get('method')
+            if method_name in config_keys and record.get('config') == config_keys[method_name]:
+                done[method_name].add(record['key'])
+        return done
+    
+    def latest_aggregates(self) -> Optional[Dict]:
+        # Aggregates for the configuration most recently appended or compacted
+        return self.aggregates.run(self._aggregates_id) if self._aggregates_id else None
+    
+    def _aggregate(self, aggregates_id: str, key: str, article: Dict, fields: List[Dict]):
+        counted = self._aggregated[aggregates_id]
+        row = {} if key in counted else dict(article)
+        for method_fields in fields:
+            row.update(method_fields)
+        self.aggregates.add_row(aggregates_id, row, new_row=key not in counted)
+        counted.add(key)
+    
+    def _start_aggregates(self, config_keys: Dict[str, str]) -> str:
+        aggregates_id = self._aggregates_id = method_config_key('run', config_keys)
+        if aggregates_id in self._aggregated:
+            return aggregates_id
+        
+        if not self._file.closed:
+            self._file.flush()
+        self.aggregates.reset(aggregates_id)
+        self._aggregated[aggregates_id] = set()
+        for record in self._records():
+            method_name = record.get('method')
+            if method_name is None:
+                self._aggregate(aggregates_id, record['key'], record['article'], [])
+            elif method_name in config_keys and record.get('config') == config_keys[method_name]:
+                self._aggregate(aggregates_id, record['key'], record['article'], [record['fields']])
+        return aggregates_id
+    
+    def append(self, key: str, article: Dict, method_fields: Dict[str, Dict], config_keys: Dict[str, str]):
+        self._aggregate(self._start_aggregates(config_keys), key, article, list(method_fields.values()))
+        if not method_fields:
+            # Every method failed: an article-only record keeps the row without marking any method done
+            self._file.write(json.dumps({'key': key, 'method': None, 'article': article}, ensure_ascii=False) + '\n')
+            self._unsynced += 1
+        for method_name, fields in method_fields.items():
+            record = {
+                'key': key,
+                'method': method_name,
+                'config': config_keys[method_name],
+                'article': article,
+                'fields': fields
+            }
+            self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self._unsynced += 1
+        
+        self._file.flush()
+        if self._unsynced >= self.fsync_every or time.time() - self._last_sync >= self.fsync_interval:
+            self.sync()
+    
+    def sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        if self._aggregated:
+            self.aggregates.save()
+        self._unsynced = 0
+        self._last_sync = time.time()
+    
+    def close(self):
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+    
+    def compact(self, config_keys: Dict[str, str], keys: List[str] = None) -> List[Dict]:
+        self._start_aggregates(config_keys)
+        self.close()
+        
+        rows = {key: None for key in keys} if keys is not None else {}
+        for record in self._records():
+            method_name = record.get('method')
+            article_only = method_name is None
+            if not article_only and (method_name not in config_keys
+                                     or record.get('config') != config_keys[method_name]):
+                continue
+            if keys is not None and record['key'] not in rows:
+                continue
+            if rows.get(record['key']) is None:
+                rows[record['key']] = dict(record['article'])
+            if not article_only:
+                rows[record['key']].update(record['fields'])
+        
+        return [row for row in rows.values() if row is not None]
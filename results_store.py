@@ -0,0 +1,230 @@
+import json
+import mmap
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Union
+from report_aggregates import ReportAggregates
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+class ResultsStore:
+    def __init__(self, root: str = "results/store"):
+        self.root = root
+        self.manifest_path = os.path.join(root, "manifest.json")
+        self.aggregates_path = os.path.join(root, "aggregates.json")
+        self.lock_path = os.path.join(root, "manifest.lock")
+        os.makedirs(root, exist_ok=True)
+    
+    @contextmanager
+    def _locked(self):
+        # Serializes read-modify-write of manifest.json and aggregates.json across processes
+        with open(self.lock_path, 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+    
+    def _read_manifest(self) -> Dict:
+        if not os.path.exists(self.manifest_path):
+            return {'runs': []}
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def _write_manifest(self, manifest: Dict):
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix='manifest.json.', suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.manifest_path)
+    
+    def _run_dir(self, run_id: str) -> str:
+        return os.path.join(self.root, "runs", run_id)
+    
+    def _run(self, run_id: str) -> Dict:
+        for run in self._read_manifest()['runs']:
+            if run['run_id'] == run_id:
+                return run
+        raise KeyError(f"Unknown run {run_id}")
+    
+    def _new_run_id(self) -> str:
+        # Timestamp plus pid, with a counter for runs started by the same process in the same second
+        base = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        run_id, counter = base, 1
+        existing = set(self.run_ids())
+        while run_id in existing or os.path.exists(self._run_dir(run_id)):
+            counter += 1
+            run_id = f"{base}-{counter}"
+        return run_id
+    
+    def run_ids(self) -> List[str]:
+        return [run['run_id'] for run in self._read_manifest()['runs']]
+    
+    def latest_run(self) -> str:
+        run_ids = self.run_ids()
+        if not run_ids:
+            raise FileNotFoundError(f"No runs stored in {self.root}")
+        return run_ids[-1]
+    
+    def columns(self, run_id: str = None) -> Dict[str, str]:
+        runs = self._read_manifest()['runs']
+        columns = {}
+        for run in runs:
+            if run_id is None or run['run_id'] == run_id:
+                columns.update(run['columns'])
+        return columns
+    
+    def append_run(self, results: Union[List[Dict], pd.DataFrame], run_id: str = None,
+                   error_analysis: Dict = None, aggregates: Dict = None) -> str:
+        df = results if isinstance(results, pd.DataFrame) else pd.DataFrame(results)
+        run_id = run_id or self._new_run_id()
+        run_dir = self._run_dir(run_id)
+        # A reused run id replaces the run, so columns from the earlier write must not linger
+        shutil.rmtree(run_dir, ignore_errors=True)
+        os.makedirs(run_dir)
+        
+        columns = {}
+        for column in df.columns:
+            if '/' in column or os.sep in column:
+                raise ValueError(f"Invalid column name {column!r}")
+            series = df[column]
+            if pd.api.types.is_numeric_dtype(series):
+                values = series.to_numpy()
+                np.save(os.path.join(run_dir, f"{column}.npy"), values)
+                columns[column] = str(values.dtype)
+            else:
+                encoded = [('' if pd.isna(v) else str(v)).encode('utf-8') for v in series]
+                offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+                np.cumsum([len(b) for b in encoded], out=offsets[1:])
+                with open(os.path.join(run_dir, f"{column}.bin"), 'wb') as f:
+                    for b in encoded:
+                        f.write(b)
+                np.save(os.path.join(run_dir, f"{column}.offsets.npy"), offsets)
+                columns[column] = 'text'
+        
+        with self._locked():
+            manifest = self._read_manifest()
+            manifest['runs'] = [run for run in manifest['runs'] if run['run_id'] != run_id]
+            manifest['runs'].append({'run_id': run_id, 'num_rows': len(df), 'columns': columns})
+            self._write_manifest(manifest)
+        
+        # Aggregates kept while the results were logged are reused when they cover exactly these rows
+        with self._locked():
+            store_aggregates = ReportAggregates(self.aggregates_path)
+            if aggregates is not None and aggregates['num_rows'] == len(df):
+                store_aggregates.data['runs'][run_id] = {'num_rows': len(df), 'columns': {
+                    column: stats for column, stats in aggregates['columns'].items() if column in columns}}
+            else:
+                store_aggregates.reset(run_id)
+                store_aggregates.update(run_id, df)
+            if error_analysis is not None:
+                store_aggregates.set_error_analysis(run_id, error_analysis)
+            store_aggregates.save()
+        
+        return run_id
+    
+    def aggregates(self, run_id: str = None, chunk_rows: int = 1 << 18) -> Dict:
+        # Per-column count / mean / M2 / min / max for a run, kept in aggregates.json. Runs stored before
+        # the file existed are folded in chunk by chunk from the memory-mapped columns, once.
+        run = self._run(run_id or self.latest_run())
+        run_id = run['run_id']
+        aggregates = ReportAggregates(self.aggregates_path)
+        cached = aggregates.run(run_id)
+        if cached is not None and cached['num_rows'] == run['num_rows']:
+            return cached
+        
+        aggregates.reset(run_id)
+        run_dir = self._run_dir(run_id)
+        arrays = {name: np.load(os.path.join(run_dir, f"{name}.npy"), mmap_mode='r')
+                  for name, dtype in run['columns'].items() if dtype != 'text'}
+        for start in range(0, run['num_rows'], chunk_rows):
+            aggregates.update(run_id, pd.DataFrame({name: values[start:start + chunk_rows]
+                                                    for name, values in arrays.items()}))
+        computed = aggregates.run(run_id)
+        computed['num_rows'] = run['num_rows']
+        # Merged into a fresh read, so runs another process added meanwhile are kept
+        with self._locked():
+            aggregates = ReportAggregates(self.aggregates_path)
+            aggregates.data['runs'][run_id] = computed
+            aggregates.save()
+        return computed
+    
+    def save_error_analysis(self, run_id: str, analysis: Dict):
+        if ReportAggregates(self.aggregates_path).run(run_id) is None:
+            self.aggregates(run_id)
+        with self._locked():
+            aggregates = ReportAggregates(self.aggregates_path)
+            aggregates.set_error_analysis(run_id, analysis)
+            aggregates.save()
+    
+    def _selected_runs(self, run_ids: Iterable[str] = None) -> List[Dict]:
+        runs = self._read_manifest()['runs']
+        if run_ids is None:
+            return runs
+        run_ids = list(run_ids)
+        return sorted((run for run in runs if run['run_id'] in run_ids), key=lambda r: run_ids.index(r['run_id']))
+    
+    def load_column(self, name: str, run_ids: Iterable[str] = None) -> np.ndarray:
+        parts = []
+        for run in self._selected_runs(run_ids):
+            dtype = run['columns'].get(name)
+            run_dir = self._run_dir(run['run_id'])
+            if dtype is None:
+                parts.append(np.full(run['num_rows'], np.nan))
+            elif dtype == 'text':
+                parts.append(self._text_column(run_dir, name, run['num_rows']))
+            else:
+                parts.append(np.load(os.path.join(run_dir, f"{name}.npy"), mmap_mode='r'))
+        
+        if not parts:
+            return np.array([])
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+    
+    def _text_column(self, run_dir: str, name: str, num_rows: int) -> np.ndarray:
+        # The blob is memory-mapped and sliced by offset, so only the pages holding each value are read
+        offsets = np.load(os.path.join(run_dir, f"{name}.offsets.npy"), mmap_mode='r').tolist()
+        values = np.empty(num_rows, dtype=object)
+        path = os.path.join(run_dir, f"{name}.bin")
+        if os.path.getsize(path) == 0:
+            values[:] = ''
+            return values
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as blob:
+            for i in range(num_rows):
+                values[i] = blob[offsets[i]:offsets[i + 1]].decode('utf-8')
+        return values
+    
+    def load_text(self, name: str, rows: Iterable[int], run_id: str = None) -> List[str]:
+        run = self._run(run_id or self.latest_run())
+        if run['columns'].get(name) != 'text':
+            return ['' for _ in rows]
+        
+        run_dir = self._run_dir(run['run_id'])
+        offsets = np.load(os.path.join(run_dir, f"{name}.offsets.npy"), mmap_mode='r')
+        texts = []
+        with open(os.path.join(run_dir, f"{name}.bin"), 'rb') as f:
+            for row in rows:
+                f.seek(int(offsets[row]))
+                texts.append(f.read(int(offsets[row + 1] - offsets[row])).decode('utf-8'))
+        return texts
+    
+    def load_frame(self, columns: List[str] = None, run_ids: Iterable[str] = None) -> pd.DataFrame:
+        run_ids = list(run_ids) if run_ids is not None else None
+        if columns is None:
+            columns = []
+            for run in self._selected_runs(run_ids):
+                columns.extend(c for c in run['columns'] if c not in columns)
+        return pd.DataFrame({column: self.load_column(column, run_ids) for column in columns})
+    
+    def export_csv(self, output_path: str, run_id: str = None):
+        self.load_frame(run_ids=[run_id or self.latest_run()]).to_csv(output_path, index=False, encoding='utf-8')
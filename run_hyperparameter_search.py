@@ -1,24 +1,42 @@
 import json
 import argparse
 from data_collector import NewsCollector
-from hyperparameter_search import HyperparameterSearch
+from hyperparameter_search import HyperparameterSearch, DEFAULT_SEARCH_SPACE
+from article_stream import iter_articles
 
 def main():
     parser = argparse.ArgumentParser(description='Hyperparameter Search for Abstractive Summarization')
-    parser.add_argument('--data', type=str, default='data/articles.json', help='Path to articles JSON file')
+    parser.add_argument('--data', type=str, default='data/articles.json', help='Path to articles JSON or JSONL file')
     parser.add_argument('--model', type=str, default='T5', choices=['T5', 'BART'], help='Model to search')
     parser.add_argument('--num-samples', type=int, default=10, help='Number of articles to test')
+    parser.add_argument('--adaptive', action='store_true',
+                        help='Successive halving over a search space instead of the fixed grid')
+    parser.add_argument('--search-space', type=str, default=None,
+                        help='JSON file mapping generation parameters to candidate values (adaptive mode)')
+    parser.add_argument('--num-candidates', type=int, default=16,
+                        help='Configs sampled from the search space (0 keeps the full grid)')
+    parser.add_argument('--min-articles', type=int, default=2, help='Articles per candidate in the first round')
+    parser.add_argument('--eta', type=int, default=2, help='Keep 1/eta of candidates and grow subsets by eta each round')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for sampling candidates')
     
     args = parser.parse_args()
     
-    with open(args.data, 'r', encoding='utf-8') as f:
-        articles = json.load(f)
+    articles = list(iter_articles(args.data, num_samples=args.num_samples))
     
     print(f"Loaded {len(articles)} articles")
     print(f"Testing {args.num_samples} articles with {args.model} model")
     
     search = HyperparameterSearch()
-    results = search.search_hyperparameters(articles, model_type=args.model, num_samples=args.num_samples)
+    if args.adaptive:
+        search_space = DEFAULT_SEARCH_SPACE
+        if args.search_space:
+            with open(args.search_space, 'r', encoding='utf-8') as f:
+                search_space = json.load(f)
+        results = search.successive_halving(articles, model_type=args.model, search_space=search_space,
+                                            num_candidates=args.num_candidates, min_articles=args.min_articles,
+                                            eta=max(args.eta, 2), seed=args.seed)
+    else:
+        results = search.search_hyperparameters(articles, model_type=args.model, num_samples=args.num_samples)
     
     print("\n" + "="*50)
     print("HYPERPARAMETER SEARCH RESULTS")
@@ -31,8 +49,15 @@ def main():
     print(f"  Avg ROUGE-2: {best['avg_rouge2']:.4f}")
     print(f"  Avg ROUGE-L: {best['avg_rougeL']:.4f}")
     print(f"  Avg Time: {best['avg_time']:.4f}s")
+    if args.adaptive:
+        print(f"  Evaluated on: {best['num_articles']} articles ({results['total_summaries']} summaries in total)")
     
-    output_file = f"results/hyperparameter_search_{args.model.lower()}.json"
+    print(f"\nROUGE-1 vs latency Pareto front:")
+    for point in results['pareto_front']:
+        print(f"  {point['avg_rouge1']:.4f} @ {point['avg_time']:.3f}s ({point['num_articles']} articles): {point['config']}")
+    
+    suffix = "_adaptive" if args.adaptive else ""
+    output_file = f"results/hyperparameter_search_{args.model.lower()}{suffix}.json"
     with open(output_file, 'w', encoding='utf-8') as f:
         json.dump(results, f, ensure_ascii=False, indent=2, default=str)
     
@@ -0,0 +1,139 @@
+import re
+import nltk
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+# Abbreviations that do not end a sentence in news copy, whatever follows them
+NON_FINAL_ABBREVIATIONS = {
+    'mr', 'mrs', 'ms', 'dr', 'prof', 'sen', 'rep', 'gov', 'gen', 'lt', 'col', 'maj', 'capt', 'sgt', 'cmdr',
+    'adm', 'rev', 'hon', 'pres', 'supt', 'insp', 'det', 'mt', 'ft', 'vs', 'e.g', 'i.e', 'cf', 'approx', 'est',
+    'dept', 'univ', 'assn', 'bros', 'nos', 'vol', 'fig', 'pp'
+}
+# Abbreviations that often do end a sentence; a capitalised next word leaves the boundary undecided
+FINAL_ABBREVIATIONS = {
+    'inc', 'corp', 'co', 'ltd', 'llc', 'plc', 'jr', 'sr', 'etc', 'st', 'ave', 'blvd', 'rd', 'no', 'al',
+    'jan', 'feb', 'mar', 'apr', 'jun', 'jul', 'aug', 'sep', 'sept', 'oct', 'nov', 'dec',
+    'u.s', 'u.k', 'u.n', 'e.u', 'd.c', 'a.m', 'p.m'
+}
+OPENERS = '"\'“‘(['
+CLOSERS = '"\'”’)]'
+
+# A run of terminal punctuation and closing quotes / brackets followed by whitespace; the lookahead captures
+# the first character of the next word, skipping any opening quotes or brackets
+CANDIDATE_RE = re.compile(r'([.!?]+)([' + re.escape(CLOSERS) + r']*)(?=\s+[' + re.escape(OPENERS) + r']*(\S))')
+NUMBER_RE = re.compile(r'^[\d,.%$£€]+$')
+
+@lru_cache(maxsize=None)
+def _punkt_tokenizer():
+    try:
+        from nltk.tokenize.punkt import PunktTokenizer
+        return PunktTokenizer('english')
+    except ImportError:
+        return nltk.data.load('tokenizers/punkt/english.pickle')
+
+class PunktSegmenter:
+    name = 'punkt'
+    
+    def __init__(self):
+        self.tokenizer = _punkt_tokenizer()
+    
+    def boundaries(self, text: str) -> List[int]:
+        return [end for _, end in self.tokenizer.span_tokenize(text)]
+    
+    def segment(self, text: str) -> List[str]:
+        return self.tokenizer.tokenize(text)
+
+class RegexSegmenter:
+    # Compiled-regex segmenter for news English. Every candidate boundary is classified from the word before it
+    # and the first character after it; only the ones it cannot call are handed to punkt, one sentence-sized
+    # span at a time, so punkt runs on a small fraction of the text.
+    name = 'regex'
+    
+    def __init__(self, fallback: PunktSegmenter = None):
+        self.fallback = fallback or PunktSegmenter()
+        self.candidates = 0
+        self.ambiguous = 0
+    
+    @staticmethod
+    def classify(word: str, punctuation: str, closers: str, next_char: str) -> Optional[bool]:
+        # True is a boundary, False is not, None is ambiguous
+        lower_next = next_char.islower()
+        if '..' in punctuation:
+            return None
+        if punctuation != '.':
+            # "Why?" she asked: a quoted question or exclamation carries on when the next word is lowercase
+            if lower_next:
+                return False if closers else None
+            return True
+        
+        word = word.lstrip(OPENERS)
+        key = word.lower()
+        if key in NON_FINAL_ABBREVIATIONS:
+            return False
+        if len(word) == 1 and word.isupper():
+            # Initials: J. K. Rowling
+            return False
+        if key in FINAL_ABBREVIATIONS or '.' in word:
+            return False if lower_next or next_char.isdigit() else None
+        if NUMBER_RE.match(word):
+            return not lower_next
+        if lower_next:
+            return None
+        return True
+    
+    def boundaries(self, text: str) -> List[int]:
+        decided: List[int] = []
+        undecided: List[int] = []
+        for match in CANDIDATE_RE.finditer(text):
+            start = max(text.rfind(' ', 0, match.start()), text.rfind('\n', 0, match.start())) + 1
+            word = text[start:match.start()]
+            decision = self.classify(word, match.group(1), match.group(2), match.group(3))
+            self.candidates += 1
+            if decision is None:
+                undecided.append(match.end())
+            elif decision:
+                decided.append(match.end())
+        
+        if not undecided:
+            return decided
+        self.ambiguous += len(undecided)
+        return sorted(decided + self._resolve(text, decided, undecided))
+    
+    def _resolve(self, text: str, decided: List[int], undecided: List[int]) -> List[int]:
+        # Punkt sees only the span between the decided boundaries around each undecided candidate
+        resolved = []
+        for start, end, candidates in self._spans(len(text), decided, undecided):
+            punkt_ends = {start + offset for offset in self.fallback.boundaries(text[start:end])}
+            resolved.extend(position for position in candidates if position in punkt_ends)
+        return resolved
+    
+    @staticmethod
+    def _spans(length: int, decided: List[int], undecided: List[int]) -> List[Tuple[int, int, List[int]]]:
+        edges = [0] + decided + [length]
+        spans = []
+        position = 0
+        for candidate in undecided:
+            while edges[position + 1] < candidate:
+                position += 1
+            if spans and spans[-1][0] == edges[position]:
+                spans[-1][2].append(candidate)
+            else:
+                spans.append((edges[position], edges[position + 1], [candidate]))
+        return spans
+    
+    def segment(self, text: str) -> List[str]:
+        sentences = []
+        start = 0
+        for end in self.boundaries(text) + [len(text)]:
+            sentence = text[start:end].strip()
+            if sentence:
+                sentences.append(sentence)
+            start = end
+        return sentences
+
+SEGMENTERS = {'punkt': PunktSegmenter, 'regex': RegexSegmenter}
+
+def make_segmenter(name: str):
+    if name not in SEGMENTERS:
+        raise ValueError(f"Unknown segmenter {name!r}; choose from {', '.join(SEGMENTERS)}")
+    return SEGMENTERS[name]()
@@ -0,0 +1,393 @@
+import os
+import sys
+import json
+import time
+import queue
+import argparse
+import threading
+from typing import Callable, Dict, IO, List, Optional
+from data_collector import NewsCollector, DEFAULT_COUNTS
+from preprocessing import TextPreprocessor
+from summarization_methods import GENERATION_KWARGS
+from summarize import EXTRACTIVE_METHODS, ABSTRACTIVE_METHODS, build_summarizer, summarize_texts
+
+_DONE = object()
+
+class Stage:
+    # A pool of worker threads between two bounded queues. make_worker is called once per thread and returns
+    # the function that processes one item (or a list of items when batched); fan-out workers return an
+    # iterable of outputs, the others one output or None to drop the item.
+    def __init__(self, name: str, make_worker: Callable, workers: int = 1, batched: bool = False,
+                 batch_size: int = 8, batch_wait: float = 0.05, fan_out: bool = False):
+        self.name = name
+        self.make_worker = make_worker
+        self.workers = workers
+        self.batched = batched
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.fan_out = fan_out
+        self.stats = {'received': 0, 'emitted': 0, 'dropped': 0, 'errors': 0, 'busy': 0.0, 'blocked': 0.0,
+                      'failed_workers': 0}
+        self.lock = threading.Lock()
+        self.threads = []
+        self.inbox = None
+        self.outbox = None
+        self.active = 0
+    
+    def start(self, inbox: queue.Queue, outbox: Optional[queue.Queue]):
+        self.inbox, self.outbox = inbox, outbox
+        self.active = self.workers
+        self.threads = [threading.Thread(target=self._run, name=f"{self.name}-{i}", daemon=True)
+                        for i in range(self.workers)]
+        for thread in self.threads:
+            thread.start()
+    
+    def join(self):
+        for thread in self.threads:
+            thread.join()
+    
+    def _count(self, **values):
+        with self.lock:
+            for name, value in values.items():
+                self.stats[name] += value
+    
+    def _emit(self, output) -> float:
+        if output is None:
+            self._count(dropped=1)
+            return 0.0
+        blocked = 0.0
+        if self.outbox is not None:
+            start_time = time.perf_counter()
+            self.outbox.put(output)
+            blocked = time.perf_counter() - start_time
+        self._count(emitted=1, blocked=blocked)
+        return blocked
+    
+    def _next_batch(self):
+        item = self.inbox.get()
+        if item is _DONE:
+            return [], True
+        
+        batch = [item]
+        deadline = time.perf_counter() + self.batch_wait
+        while self.batched and len(batch) < self.batch_size:
+            try:
+                item = self.inbox.get(timeout=max(deadline - time.perf_counter(), 0))
+            except queue.Empty:
+                break
+            if item is _DONE:
+                return batch, True
+            batch.append(item)
+        return batch, False
+    
+    def _process(self, process, batch: List):
+        self._count(received=len(batch))
+        start_time = time.perf_counter()
+        blocked = 0.0
+        try:
+            if self.batched:
+                outputs = process(batch)
+            elif self.fan_out:
+                outputs = process(batch[0])
+            else:
+                outputs = [process(batch[0])]
+            for output in outputs:
+                blocked += self._emit(output)
+        except Exception as e:
+            self._count(errors=len(batch))
+            if self.stats['errors'] <= 3:
+                print(f"Error in {self.name}: {e}")
+        # Time spent waiting on a full downstream queue is backpressure, not work
+        self._count(busy=time.perf_counter() - start_time - blocked)
+    
+    def _start_worker(self):
+        # Returns (process, drain). A worker that cannot be built (e.g. its model fails to load) leaves the
+        # stage to the others; the last one to fail stays to drop the stage's items, so upstream never blocks
+        # on a full queue and shutdown still reaches the sink.
+        try:
+            return self.make_worker(), False
+        except Exception as e:
+            print(f"Error starting a {self.name} worker: {e}")
+        with self.lock:
+            self.stats['failed_workers'] += 1
+            drain = self.stats['failed_workers'] == self.workers
+        if drain:
+            print(f"No {self.name} workers left; dropping its items")
+        return None, drain
+    
+    def _run(self):
+        done = False
+        try:
+            process, drain = self._start_worker()
+            while (process is not None or drain) and not done:
+                batch, done = self._next_batch()
+                if not batch:
+                    continue
+                if process is None:
+                    self._count(received=len(batch), errors=len(batch))
+                else:
+                    self._process(process, batch)
+        finally:
+            with self.lock:
+                self.active -= 1
+                last = self.active == 0
+            # Only a worker that took the end marker passes it on to its siblings
+            if done and not last:
+                self.inbox.put(_DONE)
+            elif last and self.outbox is not None:
+                self.outbox.put(_DONE)
+
+def method_params(method: str) -> Dict:
+    if method in EXTRACTIVE_METHODS:
+        return {'num_sentences': 3}
+    return dict(GENERATION_KWARGS)
+
+class StreamingPipeline:
+    def __init__(self, collector: NewsCollector, methods: List[str], counts: Dict[str, int], output: IO[str],
+                 fetch_workers: int = None, parse_workers: int = 2, preprocess_workers: int = 2,
+                 method_workers: Dict[str, int] = None, batch_size: int = 8, queue_size: int = 32,
+                 model_names: Dict[str, str] = None, compile_t5: bool = False, keep_text: bool = False):
+        self.collector = collector
+        self.methods = methods
+        self.counts = counts
+        self.output = output
+        self.queue_size = queue_size
+        self.model_names = model_names or {}
+        self.compile_t5 = compile_t5
+        self.keep_text = keep_text
+        self.accepted = {key: 0 for key in counts}
+        self.reserved = {key: 0 for key in counts}
+        self.lock = threading.Lock()
+        self.start_time = None
+        self.first_summary = None
+        self.written = 0
+        method_workers = method_workers or {}
+        
+        self.stages = [
+            Stage('discover', lambda: self._discover, workers=len(counts), fan_out=True),
+            Stage('fetch', lambda: self._fetch, workers=fetch_workers or collector.fetcher.workers),
+            Stage('parse', lambda: self._parse, workers=parse_workers),
+            Stage('preprocess', self._make_preprocess, workers=preprocess_workers)
+        ]
+        for method in methods:
+            # Extractive methods gain nothing from batching; abstractive ones share one generate call per batch
+            batched_size = batch_size if method in ABSTRACTIVE_METHODS else 1
+            self.stages.append(Stage(method, lambda method=method: self._make_summarize(method),
+                                     workers=method_workers.get(method, 1 if method in ABSTRACTIVE_METHODS else 2),
+                                     batched=True, batch_size=batched_size))
+        self.stages.append(Stage('sink', lambda: self._write))
+    
+    def _quota_open(self, key: str) -> bool:
+        with self.lock:
+            return self.accepted[key] < self.counts[key]
+    
+    def _reserve(self, key: str) -> bool:
+        # A reserved slot is held while the article is marked and stored, then committed or released;
+        # discovery and fetching only stop once the quota is filled by committed articles
+        with self.lock:
+            if self.accepted[key] + self.reserved[key] >= self.counts[key]:
+                return False
+            self.reserved[key] += 1
+            return True
+    
+    def _release(self, key: str, commit: bool):
+        with self.lock:
+            self.reserved[key] -= 1
+            if commit:
+                self.accepted[key] += 1
+    
+    def _discover(self, key: str):
+        for url in self.collector.iter_links(key, self.counts[key]):
+            if not self._quota_open(key):
+                break
+            yield {'source_key': key, 'url': url, 'discovered': time.perf_counter()}
+    
+    def _fetch(self, item: Dict) -> Optional[Dict]:
+        if not self._quota_open(item['source_key']):
+            return None
+        item['page'] = self.collector.fetcher.fetch_page(item['url'])
+        return item
+    
+    def _parse(self, item: Dict) -> Optional[Dict]:
+        key = item['source_key']
+        article = self.collector._parse_page(item.pop('page'), self.collector.parsers[key])
+        if not article or len(article.get('text', '')) <= 200 or not self._reserve(key):
+            return None
+        # Past the quota nothing is marked or stored, so a later run can still collect the article
+        accepted = False
+        try:
+            accepted = self.collector._mark_collected(item['url']) and (
+                self.collector.store is None or self.collector.store.add(article))
+        finally:
+            self._release(key, accepted)
+        if not accepted:
+            return None
+        item['article'] = article
+        return item
+    
+    def _make_preprocess(self):
+        preprocessor = TextPreprocessor()
+        
+        def preprocess(item: Dict) -> Optional[Dict]:
+            text = preprocessor.preprocess(item['article']['text'])
+            if len(preprocessor.segment_sentences(text)) < 3:
+                return None
+            item['text'] = text
+            return item
+        return preprocess
+    
+    def _make_summarize(self, method: str):
+        params = method_params(method)
+        summarizer = build_summarizer(method, self.model_names.get(method), self.compile_t5,
+                                      params.get('max_length', 150), params.get('min_length', 50))
+        
+        def summarize(batch: List[Dict]) -> List[Dict]:
+            start_time = time.perf_counter()
+            try:
+                summaries = summarize_texts(summarizer, method, [item['text'] for item in batch], params,
+                                            preprocess=False)
+            except Exception as e:
+                print(f"Error with {method}: {e}")
+                summaries = [None] * len(batch)
+            elapsed_time = (time.perf_counter() - start_time) / len(batch)
+            
+            for item, summary in zip(batch, summaries):
+                if summary is not None:
+                    item['article'][f'{method}_summary'] = summary
+                    item['article'][f'{method}_time'] = elapsed_time
+            return batch
+        return summarize
+    
+    def _write(self, item: Dict) -> Dict:
+        record = {k: v for k, v in item['article'].items() if self.keep_text or k != 'text'}
+        record['pipeline_latency'] = time.perf_counter() - item['discovered']
+        with self.lock:
+            self.output.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self.output.flush()
+            self.written += 1
+            if self.first_summary is None:
+                self.first_summary = time.perf_counter() - self.start_time
+        return item
+    
+    def run(self) -> Dict:
+        self.start_time = time.perf_counter()
+        sources = queue.Queue()
+        queues = [sources] + [queue.Queue(maxsize=self.queue_size) for _ in self.stages[1:]]
+        for stage, inbox, outbox in zip(self.stages, queues, queues[1:] + [None]):
+            stage.start(inbox, outbox)
+        
+        for key in self.counts:
+            sources.put(key)
+        sources.put(_DONE)
+        
+        for stage in self.stages:
+            stage.join()
+        
+        return {
+            'articles': self.written,
+            'elapsed': time.perf_counter() - self.start_time,
+            'first_summary': self.first_summary,
+            'collected': dict(self.accepted),
+            'stages': {stage.name: dict(stage.stats, workers=stage.workers) for stage in self.stages}
+        }
+
+def format_stage_stats(stats: Dict) -> str:
+    lines = [f"{'Stage':<12} {'Workers':>7} {'In':>6} {'Out':>6} {'Dropped':>7} {'Errors':>6} {'Busy s':>8} {'Blocked s':>9}"]
+    for name, stage in stats['stages'].items():
+        lines.append(f"{name:<12} {stage['workers']:>7} {stage['received']:>6} {stage['emitted']:>6} {stage['dropped']:>7} "
+                     f"{stage['errors']:>6} {stage['busy']:>8.2f} {stage['blocked']:>9.2f}")
+    return '\n'.join(lines)
+
+def parse_counts(value: str) -> Dict[str, int]:
+    counts = {}
+    for part in filter(None, (value or '').split(',')):
+        name, count = part.split('=')
+        counts[name.strip()] = int(count)
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description='Stream articles from discovery through fetch, parse, preprocess '
+                                                 'and summarization to a JSONL sink')
+    parser.add_argument('--output', '-o', type=str, default='results/stream_summaries.jsonl',
+                        help='JSONL file to write summaries to as they finish (- for stdout)')
+    parser.add_argument('--methods', type=str, default='TextRank,Lead-3',
+                        help='Comma-separated summarization methods, applied in this order')
+    parser.add_argument('--counts', type=str, default='',
+                        help='Articles per source, e.g. "bbc=50,guardian=30" (default: data_collector counts)')
+    parser.add_argument('--sources', type=str, default=None, help='JSON file with source definitions')
+    parser.add_argument('--fixture', action='store_true',
+                        help='Serve generated sites from a local fixture server and crawl those')
+    parser.add_argument('--fixture-latency', type=float, default=0.05, help='Seconds added to every fixture response')
+    parser.add_argument('--store', type=str, default=None, help='Also append collected articles to this article store')
+    parser.add_argument('--fetch-workers', type=int, default=16, help='Concurrent page fetches')
+    parser.add_argument('--parse-workers', type=int, default=2, help='Parser threads')
+    parser.add_argument('--preprocess-workers', type=int, default=2, help='Preprocessing threads')
+    parser.add_argument('--method-workers', type=str, default='',
+                        help='Threads per summarization method, e.g. "TextRank=4,BART=1"')
+    parser.add_argument('--models', type=str, default='',
+                        help='Checkpoints for abstractive methods, e.g. "T5=t5-base,BART=facebook/bart-large-cnn"')
+    parser.add_argument('--batch-size', type=int, default=8, help='Abstractive micro-batch size')
+    parser.add_argument('--queue-size', type=int, default=32, help='Capacity of each queue between stages')
+    parser.add_argument('--rate', type=float, default=4.0, help='Requests per second per host')
+    parser.add_argument('--burst', type=float, default=4.0, help='Request burst size per host')
+    parser.add_argument('--cache-dir', type=str, default=None, help='Raw page cache directory')
+    parser.add_argument('--compile-t5', action='store_true', help='Use the compiled static-cache path for T5')
+    parser.add_argument('--keep-text', action='store_true', help='Copy the article text into the output')
+    
+    args = parser.parse_args()
+    
+    methods = [m.strip() for m in args.methods.split(',') if m.strip()]
+    unknown = [m for m in methods if m not in EXTRACTIVE_METHODS + ABSTRACTIVE_METHODS]
+    if unknown:
+        parser.error(f"unknown methods: {', '.join(unknown)}")
+    
+    server = None
+    sources = None
+    rate = args.rate
+    if args.fixture:
+        from fixture_server import FixtureServer
+        server = FixtureServer(latency=args.fixture_latency).start()
+        sources = server.sources()
+        rate = 0
+        print(f"Serving fixture sites on {server.base_url}")
+    elif args.sources:
+        with open(args.sources, 'r', encoding='utf-8') as f:
+            sources = json.load(f)
+    
+    counts = parse_counts(args.counts) or {key: DEFAULT_COUNTS[key] for key in (sources or DEFAULT_COUNTS)
+                                           if key in DEFAULT_COUNTS}
+    
+    store = None
+    if args.store:
+        from article_store import ArticleStore
+        store = ArticleStore(args.store)
+    
+    collector = NewsCollector(sources=sources, workers=args.fetch_workers, rate=rate, burst=args.burst,
+                              cache_dir=args.cache_dir, store=store)
+    if args.output != '-':
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    
+    pipeline = StreamingPipeline(collector, methods, counts, output, fetch_workers=args.fetch_workers,
+                                 parse_workers=args.parse_workers, preprocess_workers=args.preprocess_workers,
+                                 method_workers=parse_counts(args.method_workers), batch_size=args.batch_size,
+                                 queue_size=args.queue_size, compile_t5=args.compile_t5, keep_text=args.keep_text,
+                                 model_names=dict(part.split('=', 1) for part in args.models.split(',') if part))
+    try:
+        stats = pipeline.run()
+    finally:
+        collector.close()
+        if store is not None:
+            store.close()
+        if output is not sys.stdout:
+            output.close()
+        if server is not None:
+            server.stop()
+    
+    print(format_stage_stats(stats), file=sys.stderr)
+    first = f"{stats['first_summary']:.2f}s" if stats['first_summary'] is not None else 'n/a'
+    print(f"Summarized {stats['articles']} articles in {stats['elapsed']:.1f}s (first summary after {first})",
+          file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+from extractive_summarizer import TFIDFSummarizer, TextRankSummarizer, LeadKSummarizer
+
+EXTRACTIVE_CLASSES = {
+    'TF-IDF': TFIDFSummarizer,
+    'TextRank': TextRankSummarizer,
+    'Lead-3': LeadKSummarizer
+}
+
+ABSTRACTIVE_METHODS = ['BART', 'T5']
+
+DEFAULT_MODELS = {'BART': 'facebook/bart-large-cnn', 'T5': 't5-small'}
+
+GENERATION_KWARGS = {
+    'max_length': 150,
+    'min_length': 50,
+    'num_beams': 4,
+    'do_sample': False,
+    'no_repeat_ngram_size': 3
+}
@@ -0,0 +1,375 @@
+import json
+import time
+import asyncio
+import argparse
+import multiprocessing
+from http import HTTPStatus
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Tuple
+from summarization_methods import EXTRACTIVE_CLASSES, ABSTRACTIVE_METHODS, GENERATION_KWARGS
+from parallel_evaluation import _init_extractive_worker, _run_extractive
+
+# Accepted type and (for integers) inclusive range of each generation parameter; requests share one
+# generation thread, so a single huge beam search or length would stall every other client
+GENERATION_PARAMS = {
+    'max_length': (int, 1, 512),
+    'min_length': (int, 0, 512),
+    'num_beams': (int, 1, 8),
+    'do_sample': (bool, None, None),
+    'no_repeat_ngram_size': (int, 0, 10)
+}
+
+WARMUP_TEXT = ("The city council approved a new transport plan on Tuesday after months of debate. "
+               "Officials said the plan would add bus routes, extend cycle lanes and cut journey times "
+               "for commuters travelling into the centre. Critics argued that the cost had been "
+               "underestimated and that residents in outer districts would see few benefits.")
+
+class ServiceError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+def generation_params(payload: Dict) -> Dict:
+    params = dict(GENERATION_KWARGS)
+    for name, (kind, low, high) in GENERATION_PARAMS.items():
+        if name not in payload:
+            continue
+        value = payload[name]
+        if not isinstance(value, kind) or (kind is int and isinstance(value, bool)):
+            raise ServiceError(HTTPStatus.BAD_REQUEST, f"'{name}' must be {kind.__name__}")
+        if kind is int and not low <= value <= high:
+            raise ServiceError(HTTPStatus.BAD_REQUEST, f"'{name}' must be between {low} and {high}")
+        params[name] = value
+    if 'min_length' not in payload:
+        params['min_length'] = min(params['min_length'], params['max_length'])
+    elif params['min_length'] > params['max_length']:
+        raise ServiceError(HTTPStatus.BAD_REQUEST, "'min_length' must not exceed 'max_length'")
+    return params
+
+class MicroBatcher:
+    def __init__(self, summarizer, max_batch_size: int = 8, max_wait: float = 0.01):
+        self.summarizer = summarizer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.batches = 0
+        self.requests = 0
+        self._queue = asyncio.Queue()
+        self._full = asyncio.Event()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+    
+    async def submit(self, text: str, params: Dict) -> str:
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((text, params, future))
+        if self._queue.qsize() >= self.max_batch_size - 1:
+            self._full.set()
+        return await future
+    
+    async def _collect(self) -> List[Tuple[str, Dict, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        
+        if self._queue.qsize() < self.max_batch_size - 1:
+            self._full.clear()
+            try:
+                await asyncio.wait_for(self._full.wait(), self.max_wait)
+            except asyncio.TimeoutError:
+                pass
+        
+        while len(batch) < self.max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+    
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            batch = await self._collect()
+            self.batches += 1
+            self.requests += len(batch)
+            
+            groups = {}
+            for text, params, future in batch:
+                groups.setdefault(tuple(sorted(params.items())), []).append((text, future))
+            
+            for key, jobs in groups.items():
+                texts = [text for text, _ in jobs]
+                try:
+                    summaries = await loop.run_in_executor(
+                        self._executor,
+                        lambda: self.summarizer.summarize_batch(texts, batch_size=self.max_batch_size,
+                                                                **dict(key)))
+                except Exception as e:
+                    for _, future in jobs:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                
+                for (_, future), summary in zip(jobs, summaries):
+                    if not future.done():
+                        future.set_result(summary)
+    
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+class SummarizationService:
+    def __init__(self, methods: List[str], bart_model: str = "facebook/bart-large-cnn",
+                 t5_model: str = "t5-small", compile_t5: bool = False, max_batch_size: int = 8,
+                 batch_wait: float = 0.01, extractive_workers: int = None, max_body_bytes: int = 10 * 2**20):
+        self.methods = methods
+        self.bart_model = bart_model
+        self.t5_model = t5_model
+        self.compile_t5 = compile_t5
+        self.max_batch_size = max_batch_size
+        self.batch_wait = batch_wait
+        self.extractive_workers = extractive_workers or multiprocessing.cpu_count()
+        self.max_body_bytes = max_body_bytes
+        self.started_at = time.time()
+        self.status = {name: {'state': 'pending'} for name in methods}
+        self.batchers = {}
+        self._tasks = []
+        self._pool = None
+    
+    def _load_abstractive(self, method_name: str):
+        from abstractive_summarizer import AbstractiveSummarizer, T5Summarizer
+        if method_name == 'BART':
+            return AbstractiveSummarizer(model_name=self.bart_model)
+        return T5Summarizer(model_name=self.t5_model, max_length=GENERATION_KWARGS['max_length'],
+                            min_length=GENERATION_KWARGS['min_length'], compiled=self.compile_t5)
+    
+    async def _warm_up_extractive(self, method_names: List[str]):
+        loop = asyncio.get_running_loop()
+        for method_name in method_names:
+            self.status[method_name]['state'] = 'warming'
+        
+        start_time = time.time()
+        try:
+            await asyncio.gather(*[loop.run_in_executor(self._pool, _run_extractive, method_name, WARMUP_TEXT, 3)
+                                   for method_name in method_names for _ in range(self.extractive_workers)])
+        except Exception as e:
+            for method_name in method_names:
+                self.status[method_name] = {'state': 'failed', 'error': str(e)}
+            return
+        
+        for method_name in method_names:
+            self.status[method_name] = {'state': 'ready', 'warmup_time': time.time() - start_time}
+    
+    async def _warm_up_abstractive(self, method_name: str):
+        loop = asyncio.get_running_loop()
+        self.status[method_name]['state'] = 'loading'
+        
+        try:
+            start_time = time.time()
+            summarizer = await loop.run_in_executor(None, self._load_abstractive, method_name)
+            load_time = time.time() - start_time
+            
+            self.status[method_name] = {'state': 'warming', 'load_time': load_time}
+            start_time = time.time()
+            await loop.run_in_executor(None, lambda: summarizer.summarize_batch([WARMUP_TEXT], **GENERATION_KWARGS))
+        except Exception as e:
+            self.status[method_name] = {'state': 'failed', 'error': str(e)}
+            print(f"Error loading {method_name}: {e}")
+            return
+        
+        batcher = MicroBatcher(summarizer, max_batch_size=self.max_batch_size, max_wait=self.batch_wait)
+        self.batchers[method_name] = batcher
+        self._tasks.append(asyncio.create_task(batcher.run()))
+        self.status[method_name] = {'state': 'ready', 'model_name': summarizer.model_name, 'load_time': load_time,
+                                    'warmup_time': time.time() - start_time}
+        print(f"{method_name} ready ({summarizer.model_name})")
+    
+    async def _warm_up_models(self, method_names: List[str]):
+        # from_pretrained switches the default torch device while it loads, so models load one at a time
+        for method_name in method_names:
+            await self._warm_up_abstractive(method_name)
+    
+    async def start(self):
+        extractive = [name for name in self.methods if name in EXTRACTIVE_CLASSES]
+        if extractive:
+            self._pool = ProcessPoolExecutor(max_workers=self.extractive_workers,
+                                             mp_context=multiprocessing.get_context('spawn'),
+                                             initializer=_init_extractive_worker,
+                                             initargs=({name: EXTRACTIVE_CLASSES[name] for name in extractive},))
+            self._tasks.append(asyncio.create_task(self._warm_up_extractive(extractive)))
+        
+        abstractive = [name for name in self.methods if name in ABSTRACTIVE_METHODS]
+        if abstractive:
+            self._tasks.append(asyncio.create_task(self._warm_up_models(abstractive)))
+    
+    def shutdown(self):
+        for task in self._tasks:
+            task.cancel()
+        for batcher in self.batchers.values():
+            batcher.shutdown()
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+    
+    def ready(self) -> bool:
+        return all(status['state'] == 'ready' for status in self.status.values())
+    
+    def health(self) -> Dict:
+        methods = {}
+        for method_name, status in self.status.items():
+            methods[method_name] = dict(status)
+            batcher = self.batchers.get(method_name)
+            if batcher:
+                methods[method_name]['batches'] = batcher.batches
+                methods[method_name]['mean_batch_size'] = batcher.requests / batcher.batches if batcher.batches else 0
+                methods[method_name]['queued'] = batcher._queue.qsize()
+        return {'status': 'ok', 'ready': self.ready(), 'uptime': time.time() - self.started_at, 'methods': methods}
+    
+    async def summarize(self, payload: Dict) -> Dict:
+        text = payload.get('text')
+        method_name = payload.get('method', 'TextRank')
+        if not isinstance(text, str) or not text.strip():
+            raise ServiceError(HTTPStatus.BAD_REQUEST, "'text' must be a non-empty string")
+        if method_name not in self.status:
+            raise ServiceError(HTTPStatus.NOT_FOUND, f"Unknown or disabled method {method_name!r}")
+        if self.status[method_name]['state'] != 'ready':
+            raise ServiceError(HTTPStatus.SERVICE_UNAVAILABLE,
+                               f"{method_name} is {self.status[method_name]['state']}")
+        
+        start_time = time.time()
+        if method_name in EXTRACTIVE_CLASSES:
+            num_sentences = payload.get('num_sentences', 3)
+            if not isinstance(num_sentences, int) or num_sentences < 1:
+                raise ServiceError(HTTPStatus.BAD_REQUEST, "'num_sentences' must be a positive integer")
+            # Cleaned the same way as in evaluation, in the worker process, so the service returns the
+            # evaluated summary without blocking the event loop on a large body
+            summary, _, _ = await asyncio.get_running_loop().run_in_executor(
+                self._pool, _run_extractive, method_name, text, num_sentences, True)
+        else:
+            summary = await self.batchers[method_name].submit(text, generation_params(payload))
+        
+        return {'method': method_name, 'summary': summary, 'latency_ms': (time.time() - start_time) * 1000}
+    
+    async def dispatch(self, method: str, path: str, body: bytes) -> Tuple[HTTPStatus, Dict]:
+        path = path.split('?', 1)[0]
+        
+        if path == '/health' and method == 'GET':
+            return HTTPStatus.OK, self.health()
+        if path == '/ready' and method == 'GET':
+            return (HTTPStatus.OK if self.ready() else HTTPStatus.SERVICE_UNAVAILABLE,
+                    {'ready': self.ready(), 'methods': self.status})
+        if path == '/summarize' and method == 'POST':
+            try:
+                payload = json.loads(body or b'{}')
+            except ValueError:
+                raise ServiceError(HTTPStatus.BAD_REQUEST, "Request body must be JSON")
+            if not isinstance(payload, dict):
+                raise ServiceError(HTTPStatus.BAD_REQUEST, "Request body must be a JSON object")
+            return HTTPStatus.OK, await self.summarize(payload)
+        if path in ('/health', '/ready', '/summarize'):
+            raise ServiceError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} not allowed on {path}")
+        raise ServiceError(HTTPStatus.NOT_FOUND, f"No route for {path}")
+    
+    async def _respond(self, writer: asyncio.StreamWriter, status: HTTPStatus, payload: Dict, keep_alive: bool):
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        writer.write(f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                     f"Content-Type: application/json\r\n"
+                     f"Content-Length: {len(data)}\r\n"
+                     f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + data)
+        await writer.drain()
+    
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request_line = await reader.readline()
+                    if not request_line.strip():
+                        break
+                    
+                    parts = request_line.decode('latin-1').split()
+                    if len(parts) != 3:
+                        break
+                    method, path, version = parts
+                    
+                    headers = {}
+                    while True:
+                        line = await reader.readline()
+                        if line in (b'\r\n', b'\n', b''):
+                            break
+                        name, _, value = line.decode('latin-1').partition(':')
+                        headers[name.strip().lower()] = value.strip()
+                except ValueError:
+                    # readline raises ValueError for a line over the stream limit (64 KiB)
+                    await self._respond(writer, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                                        {'error': "Request line or header too large"}, False)
+                    break
+                
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                
+                try:
+                    if 'transfer-encoding' in headers:
+                        raise ServiceError(HTTPStatus.LENGTH_REQUIRED, "Chunked request bodies are not supported")
+                    content_length = headers.get('content-length', '0')
+                    if not (content_length.isascii() and content_length.isdigit()):
+                        # Without a valid length the body cannot be skipped, so the connection closes
+                        keep_alive = False
+                        raise ServiceError(HTTPStatus.BAD_REQUEST, f"Invalid Content-Length {content_length!r}")
+                    length = int(content_length)
+                    if length > self.max_body_bytes:
+                        keep_alive = False
+                        raise ServiceError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                           f"Body exceeds {self.max_body_bytes} bytes")
+                    body = await reader.readexactly(length) if length else b''
+                    status, payload = await self.dispatch(method, path, body)
+                except ServiceError as e:
+                    status, payload = e.status, {'error': str(e)}
+                except Exception as e:
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e)}
+                
+                await self._respond(writer, status, payload, keep_alive)
+                
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+async def serve(service: SummarizationService, host: str, port: int):
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    await service.start()
+    print(f"Serving {', '.join(service.methods)} on http://{host}:{port}")
+    
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.shutdown()
+
+def main():
+    parser = argparse.ArgumentParser(description='HTTP summarization service')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='Interface to bind')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on')
+    parser.add_argument('--methods', type=str, default=','.join(list(EXTRACTIVE_CLASSES) + ABSTRACTIVE_METHODS),
+                        help='Comma-separated methods to serve')
+    parser.add_argument('--bart-model', type=str, default='facebook/bart-large-cnn', help='BART checkpoint')
+    parser.add_argument('--t5-model', type=str, default='t5-small', help='T5 checkpoint')
+    parser.add_argument('--compile-t5', action='store_true', help='Use the compiled static-cache path for T5')
+    parser.add_argument('--max-batch-size', type=int, default=8, help='Largest abstractive micro-batch')
+    parser.add_argument('--batch-wait-ms', type=float, default=10.0,
+                        help='How long to wait for more requests before running a partial batch')
+    parser.add_argument('--extractive-workers', type=int, default=None,
+                        help='Process pool size for TF-IDF / TextRank / Lead-3 (default: CPU count)')
+    parser.add_argument('--max-body-bytes', type=int, default=10 * 2**20, help='Largest accepted request body')
+    
+    args = parser.parse_args()
+    
+    methods = [name.strip() for name in args.methods.split(',') if name.strip()]
+    unknown = [name for name in methods if name not in EXTRACTIVE_CLASSES and name not in ABSTRACTIVE_METHODS]
+    if unknown:
+        parser.error(f"Unknown methods: {', '.join(unknown)}")
+    
+    service = SummarizationService(methods, bart_model=args.bart_model, t5_model=args.t5_model,
+                                   compile_t5=args.compile_t5, max_batch_size=args.max_batch_size,
+                                   batch_wait=args.batch_wait_ms / 1000,
+                                   extractive_workers=args.extractive_workers,
+                                   max_body_bytes=args.max_body_bytes)
+    
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        print("Shutting down")
+
+if __name__ == "__main__":
+    main()
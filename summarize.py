@@ -0,0 +1,196 @@
+import os
+import sys
+import json
+import time
+import argparse
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, IO, Iterator, List
+from summarization_methods import EXTRACTIVE_CLASSES, ABSTRACTIVE_METHODS, DEFAULT_MODELS
+
+EXTRACTIVE_METHODS = list(EXTRACTIVE_CLASSES)
+
+_worker_summarizer = None
+
+def build_summarizer(method: str, model_name: str = None, compile_t5: bool = False, max_length: int = 150,
+                     min_length: int = 50):
+    if method in EXTRACTIVE_CLASSES:
+        return EXTRACTIVE_CLASSES[method]()
+    
+    from abstractive_summarizer import AbstractiveSummarizer, T5Summarizer
+    if method == 'BART':
+        return AbstractiveSummarizer(model_name=model_name or DEFAULT_MODELS['BART'])
+    return T5Summarizer(model_name=model_name or DEFAULT_MODELS['T5'], max_length=max_length,
+                        min_length=min_length, compiled=compile_t5)
+
+def summarize_texts(summarizer, method: str, texts: List[str], params: Dict, preprocess: bool = True) -> List[str]:
+    # BART / T5 clean their input in summarize_batch; extractive texts are cleaned here unless the caller already has
+    if method in EXTRACTIVE_CLASSES:
+        if preprocess:
+            texts = [summarizer.preprocessor.preprocess(text) for text in texts]
+        return [summarizer.summarize(text, num_sentences=params['num_sentences']) for text in texts]
+    generation = {name: value for name, value in params.items() if name != 'num_sentences'}
+    return summarizer.summarize_batch(texts, batch_size=max(len(texts), 1), **generation)
+
+def _init_worker(method: str, model_name: str, compile_t5: bool, max_length: int, min_length: int):
+    global _worker_summarizer
+    _worker_summarizer = build_summarizer(method, model_name, compile_t5, max_length, min_length)
+
+def _summarize_chunk(method: str, texts: List[str], params: Dict) -> List[str]:
+    return summarize_texts(_worker_summarizer, method, texts, params)
+
+def read_records(stream: IO[bytes], text_field: str) -> Iterator[Dict]:
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield {'record': None, 'text': None, 'error': f"line {line_number}: invalid JSON ({e})"}
+            continue
+        
+        text = record.get(text_field) if isinstance(record, dict) else None
+        if not isinstance(text, str) or not text.strip():
+            yield {'record': record, 'text': None, 'error': f"line {line_number}: missing '{text_field}'"}
+        else:
+            yield {'record': record, 'text': text, 'error': None}
+
+def chunked(items: Iterator[Dict], size: int) -> Iterator[List[Dict]]:
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+def format_output(entry: Dict, summary: str, method: str, text_field: str, keep_text: bool) -> str:
+    record = entry['record']
+    if isinstance(record, dict):
+        output = {k: v for k, v in record.items() if keep_text or k != text_field}
+    else:
+        output = {}
+    
+    output['method'] = method
+    if entry['error']:
+        output['error'] = entry['error']
+    else:
+        output['summary'] = summary
+    return json.dumps(output, ensure_ascii=False)
+
+def write_chunk(output: IO[str], chunk: List[Dict], summaries: List[str], method: str, text_field: str,
+                keep_text: bool):
+    summaries = iter(summaries)
+    for entry in chunk:
+        summary = None if entry['error'] else next(summaries)
+        output.write(format_output(entry, summary, method, text_field, keep_text) + '\n')
+    output.flush()
+
+def fail_chunk(chunk: List[Dict], error: Exception):
+    for entry in chunk:
+        if not entry['error']:
+            entry['error'] = f"summarization failed: {error}"
+
+def run(input_stream: IO[bytes], output: IO[str], method: str, params: Dict, text_field: str = 'text',
+        workers: int = 0, batch_size: int = 8, max_in_flight: int = None, model_name: str = None,
+        compile_t5: bool = False, keep_text: bool = False) -> int:
+    chunks = chunked(read_records(input_stream, text_field), batch_size)
+    init_args = (method, model_name, compile_t5, params.get('max_length', 150), params.get('min_length', 50))
+    count = 0
+    
+    if not workers:
+        summarizer = build_summarizer(*init_args)
+        for chunk in chunks:
+            texts = [entry['text'] for entry in chunk if not entry['error']]
+            try:
+                summaries = summarize_texts(summarizer, method, texts, params) if texts else []
+            except Exception as e:
+                fail_chunk(chunk, e)
+                summaries = []
+            write_chunk(output, chunk, summaries, method, text_field, keep_text)
+            count += len(chunk)
+        return count
+    
+    max_in_flight = max_in_flight or workers * 2
+    pending = deque()
+    
+    def write_oldest():
+        chunk, future = pending.popleft()
+        try:
+            summaries = future.result() if future else []
+        except Exception as e:
+            fail_chunk(chunk, e)
+            summaries = []
+        write_chunk(output, chunk, summaries, method, text_field, keep_text)
+        return len(chunk)
+    
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_worker, initargs=init_args) as pool:
+        for chunk in chunks:
+            texts = [entry['text'] for entry in chunk if not entry['error']]
+            future = pool.submit(_summarize_chunk, method, texts, params) if texts else None
+            pending.append((chunk, future))
+            while len(pending) >= max_in_flight:
+                count += write_oldest()
+        
+        while pending:
+            count += write_oldest()
+    
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarize JSONL articles, one JSON summary per input line')
+    parser.add_argument('input', nargs='?', default='-', help='JSONL file to read (default: stdin)')
+    parser.add_argument('--output', '-o', type=str, default='-', help='JSONL file to write (default: stdout)')
+    parser.add_argument('--method', type=str, default='TextRank', choices=EXTRACTIVE_METHODS + ABSTRACTIVE_METHODS,
+                        help='Summarization method')
+    parser.add_argument('--text-field', type=str, default='text', help='Field holding the article text')
+    parser.add_argument('--keep-text', action='store_true', help='Copy the article text into the output')
+    parser.add_argument('--num-sentences', type=int, default=3, help='Sentences per extractive summary')
+    parser.add_argument('--model', type=str, default=None, help='Checkpoint for BART / T5')
+    parser.add_argument('--compile-t5', action='store_true', help='Use the compiled static-cache path for T5')
+    parser.add_argument('--max-length', type=int, default=150, help='Generation max_length')
+    parser.add_argument('--min-length', type=int, default=50, help='Generation min_length')
+    parser.add_argument('--num-beams', type=int, default=4, help='Beam search width')
+    parser.add_argument('--no-repeat-ngram-size', type=int, default=3, help='Generation no_repeat_ngram_size')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='Worker processes, each with its own summarizer (0 runs in this process)')
+    parser.add_argument('--batch-size', type=int, default=8,
+                        help='Articles per task (and per generate call for BART / T5)')
+    parser.add_argument('--max-in-flight', type=int, default=None,
+                        help='Most batches buffered at once (default: 2 x workers)')
+    
+    args = parser.parse_args()
+    
+    params = {'num_sentences': args.num_sentences}
+    if args.method in ABSTRACTIVE_METHODS:
+        params = {
+            'max_length': args.max_length,
+            'min_length': args.min_length,
+            'num_beams': args.num_beams,
+            'do_sample': False,
+            'no_repeat_ngram_size': args.no_repeat_ngram_size
+        }
+    
+    input_stream = sys.stdin.buffer if args.input == '-' else open(args.input, 'rb')
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    
+    start_time = time.time()
+    try:
+        count = run(input_stream, output, args.method, params, text_field=args.text_field, workers=args.workers,
+                    batch_size=args.batch_size, max_in_flight=args.max_in_flight, model_name=args.model,
+                    compile_t5=args.compile_t5, keep_text=args.keep_text)
+    except BrokenPipeError:
+        # The reader went away (e.g. piped into head); silence the flush at interpreter exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+    finally:
+        if input_stream is not sys.stdin.buffer:
+            input_stream.close()
+        if output is not sys.stdout:
+            output.close()
+    
+    print(f"Summarized {count} articles with {args.method} in {time.time() - start_time:.1f}s", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import json
+from article_store import ArticleStore, canonicalize_url
+
+def _article(i, url=None):
+    return {'url': url or f"https://news.example.com/story/{i}", 'title': f"Story {i}", 'text': f"Text {i}. " * 20,
+            'source': 'Example'}
+
+def _lines(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+def test_canonicalize_url():
+    assert canonicalize_url('HTTPS://News.Example.com:443/a/b/?utm_source=x&b=2&a=1#top') == \
+        'https://news.example.com/a/b?a=1&b=2'
+    assert canonicalize_url('http://example.com:8080') == 'http://example.com:8080/'
+    assert canonicalize_url('http://example.com/a?fbclid=1') == canonicalize_url('http://example.com/a')
+
+def test_canonical_dedup_keeps_original_url(tmp_path):
+    store = ArticleStore(str(tmp_path / 'articles.jsonl'))
+    original = 'https://news.example.com/story/1/?utm_source=rss&id=7'
+    assert store.add(_article(1, original))
+    assert not store.add(_article(1, 'https://NEWS.example.com/story/1?id=7&fbclid=abc'))
+    assert store.add_many([_article(2), _article(2), _article(3)]) == 2
+    
+    assert len(store) == 3
+    assert 'https://news.example.com/story/1?id=7' in store
+    assert store.get('https://news.example.com/story/1?id=7&utm_medium=x')['url'] == original
+    assert [article['url'] for article in store.iter_articles()] == [original, _article(2)['url'], _article(3)['url']]
+    store.close()
+
+def test_torn_last_line_is_dropped(tmp_path):
+    path = str(tmp_path / 'articles.jsonl')
+    store = ArticleStore(path)
+    store.add_many([_article(i) for i in range(3)])
+    store.close()
+    with open(path, 'ab') as f:
+        f.write(json.dumps(_article(3)).encode('utf-8')[:40])
+    
+    store = ArticleStore(path)
+    assert len(store) == 3
+    assert _article(3)['url'] not in store
+    assert store.add(_article(4))
+    store.close()
+    assert [article['url'] for article in _lines(path)] == [_article(i)['url'] for i in (0, 1, 2, 4)]
+
+def test_unindexed_complete_lines_are_indexed(tmp_path):
+    # The process died after writing a line but before committing its index row
+    path = str(tmp_path / 'articles.jsonl')
+    store = ArticleStore(path)
+    store.add(_article(0))
+    store.close()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(_article(1)) + '\n')
+    
+    store = ArticleStore(path)
+    assert len(store) == 2
+    assert store.get(_article(1)['url'])['title'] == 'Story 1'
+    store.close()
+
+def test_replaced_file_rebuilds_index(tmp_path):
+    path = str(tmp_path / 'articles.jsonl')
+    store = ArticleStore(path)
+    store.add_many([_article(i) for i in range(5)])
+    store.close()
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in (10, 11):
+            f.write(json.dumps(_article(i)) + '\n')
+    
+    store = ArticleStore(path)
+    assert len(store) == 2
+    assert _article(0)['url'] not in store
+    assert store.get(_article(11)['url'])['title'] == 'Story 11'
+    assert store.add(_article(0))
+    store.close()
+
+def test_truncated_file_rebuilds_index(tmp_path):
+    path = str(tmp_path / 'articles.jsonl')
+    store = ArticleStore(path)
+    store.add_many([_article(i) for i in range(5)])
+    store.close()
+    lines = open(path, 'rb').readlines()
+    with open(path, 'wb') as f:
+        f.writelines(lines[:2])
+    
+    store = ArticleStore(path)
+    assert store.urls() == [_article(0)['url'], _article(1)['url']]
+    assert store.get(_article(1)['url'])['title'] == 'Story 1'
+    store.close()
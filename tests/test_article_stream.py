@@ -0,0 +1,93 @@
+import json
+import random
+import pytest
+from article_stream import convert_to_jsonl, detect_format, iter_articles, iter_json_array, shard_byte_ranges
+
+def _articles(count, seed=0):
+    rng = random.Random(seed)
+    # Varied lengths and multi-byte characters put shard edges inside lines and inside characters
+    words = ['news', 'café', '東京', 'a']
+    return [{'id': i, 'title': f"Article {i}",
+             'text': ' '.join(rng.choice(words) for _ in range(rng.randint(0, 200)))}
+            for i in range(count)]
+
+@pytest.fixture
+def jsonl_file(tmp_path):
+    articles = _articles(53)
+    path = tmp_path / 'articles.jsonl'
+    with open(path, 'w', encoding='utf-8') as f:
+        for i, article in enumerate(articles):
+            f.write(json.dumps(article, ensure_ascii=False) + '\n')
+            if i % 10 == 0:
+                f.write('\n')
+    return str(path), articles
+
+@pytest.fixture
+def json_file(tmp_path):
+    articles = _articles(53, seed=1)
+    path = tmp_path / 'articles.json'
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(articles, f, ensure_ascii=False, indent=2)
+    return str(path), articles
+
+def test_detect_format(tmp_path, jsonl_file, json_file):
+    assert detect_format(jsonl_file[0]) == 'jsonl'
+    assert detect_format(json_file[0]) == 'json'
+    padded = tmp_path / 'padded.json'
+    padded.write_text(' ' * 5000 + '\n[{"id": 1}]')
+    assert detect_format(str(padded)) == 'json'
+    objects = tmp_path / 'objects.txt'
+    objects.write_text('{"id": 1}\n')
+    assert detect_format(str(objects)) == 'jsonl'
+    empty = tmp_path / 'empty.json'
+    empty.write_text('')
+    assert detect_format(str(empty)) == 'jsonl'
+
+def test_byte_ranges_tile_the_file(jsonl_file):
+    path, _ = jsonl_file
+    for num_shards in range(1, 8):
+        ranges = shard_byte_ranges(path, num_shards)
+        assert ranges[0][0] == 0
+        assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+        assert ranges[-1][1] == len(open(path, 'rb').read())
+
+@pytest.mark.parametrize('num_shards', range(1, 8))
+def test_jsonl_shards_cover_every_article_once(jsonl_file, num_shards):
+    path, articles = jsonl_file
+    shards = [list(iter_articles(path, shard_index=i, num_shards=num_shards)) for i in range(num_shards)]
+    assert [article for shard in shards for article in shard] == articles
+
+def test_jsonl_shards_with_more_shards_than_lines(tmp_path):
+    path = tmp_path / 'short.jsonl'
+    path.write_text('{"id": 0}\n{"id": 1}\n')
+    shards = [list(iter_articles(str(path), shard_index=i, num_shards=15)) for i in range(15)]
+    assert [article['id'] for shard in shards for article in shard] == [0, 1]
+
+@pytest.mark.parametrize('num_shards', range(1, 8))
+def test_json_array_shards_cover_every_article_once(json_file, num_shards):
+    path, articles = json_file
+    shards = [list(iter_articles(path, shard_index=i, num_shards=num_shards)) for i in range(num_shards)]
+    assert sorted((article for shard in shards for article in shard), key=lambda a: a['id']) == articles
+    assert all(shard == articles[i::num_shards] for i, shard in enumerate(shards))
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64, 1 << 16])
+def test_json_array_chunk_sizes(json_file, chunk_size):
+    path, articles = json_file
+    assert list(iter_json_array(path, chunk_size=chunk_size)) == articles
+
+def test_json_array_rejects_other_json(tmp_path):
+    path = tmp_path / 'object.json'
+    path.write_text('{"id": 1}')
+    with pytest.raises(ValueError):
+        list(iter_json_array(str(path)))
+
+def test_num_samples(jsonl_file, json_file):
+    for path, articles in [jsonl_file, json_file]:
+        assert list(iter_articles(path, num_samples=5)) == articles[:5]
+        assert list(iter_articles(path, num_samples=1000)) == articles
+
+def test_convert_to_jsonl(tmp_path, json_file):
+    path, articles = json_file
+    output = str(tmp_path / 'converted.jsonl')
+    assert convert_to_jsonl(path, output) == len(articles)
+    assert list(iter_articles(output)) == articles
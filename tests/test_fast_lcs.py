@@ -0,0 +1,74 @@
+import random
+import pytest
+
+pytest.importorskip('rouge_score')
+from rouge_score import rouge_scorer
+import fast_lcs
+
+def _dp_table(ref, can):
+    table = [[0] * (len(can) + 1) for _ in range(len(ref) + 1)]
+    for i in range(1, len(ref) + 1):
+        for j in range(1, len(can) + 1):
+            if ref[i - 1] == can[j - 1]:
+                table[i][j] = table[i - 1][j - 1] + 1
+            else:
+                table[i][j] = max(table[i - 1][j], table[i][j - 1])
+    return table
+
+def _random_tokens(rng, max_length, vocab_size):
+    # A small vocabulary forces repeated tokens and ties in the backtrack
+    return [f"w{rng.randrange(vocab_size)}" for _ in range(rng.randint(0, max_length))]
+
+def _pairs(count, max_length=40, vocab_size=6, seed=0):
+    rng = random.Random(seed)
+    return [(_random_tokens(rng, max_length, vocab_size), _random_tokens(rng, max_length, vocab_size))
+            for _ in range(count)]
+
+def test_lcs_length_matches_dp():
+    for ref, can in _pairs(300):
+        assert fast_lcs.lcs_length(ref, can) == _dp_table(ref, can)[-1][-1]
+
+def test_lcs_length_beyond_machine_word():
+    rng = random.Random(1)
+    ref = _random_tokens(rng, 300, 20) + ['x'] * 100
+    can = _random_tokens(rng, 300, 20)
+    assert fast_lcs.lcs_length(ref, can) == _dp_table(ref, can)[-1][-1]
+
+def test_rows_encode_dp_table():
+    # Column j of the DP table is recoverable from bit-row j: table[i][j] = i - popcount(row_j & low i bits)
+    for ref, can in _pairs(50, max_length=20):
+        table = _dp_table(ref, can)
+        rows = fast_lcs._lcs_rows(ref, can)
+        for j, row in enumerate(rows):
+            for i in range(len(ref) + 1):
+                assert i - fast_lcs._popcount(row & ((1 << i) - 1)) == table[i][j]
+
+def test_lcs_indices_is_a_longest_common_subsequence():
+    for ref, can in _pairs(300):
+        indices = fast_lcs.lcs_indices(ref, can)
+        assert indices == sorted(set(indices))
+        assert len(indices) == _dp_table(ref, can)[-1][-1]
+        remaining = iter(can)
+        assert all(ref[i] in remaining for i in indices)
+
+def test_lcs_indices_match_rouge_backtrack():
+    for ref, can in _pairs(300):
+        table = rouge_scorer._lcs_table(ref, can)
+        assert fast_lcs.lcs_indices(ref, can) == rouge_scorer._backtrack_norec(table, ref, can)
+
+def test_score_lcs_matches_rouge():
+    for ref, can in _pairs(300):
+        assert fast_lcs.score_lcs(ref, can) == rouge_scorer._score_lcs(ref, can)
+
+def test_summary_level_lcs_matches_rouge():
+    rng = random.Random(2)
+    for _ in range(200):
+        ref = [_random_tokens(rng, 15, 8) for _ in range(rng.randint(0, 5))]
+        can = [_random_tokens(rng, 15, 8) for _ in range(rng.randint(0, 5))]
+        assert fast_lcs.summary_level_lcs(ref, can) == rouge_scorer._summary_level_lcs(ref, can)
+
+def test_popcount_fallback_agrees():
+    fallback = lambda x: bin(x).count('1')
+    rng = random.Random(3)
+    for value in [0, 1, (1 << 200) - 1] + [rng.getrandbits(500) for _ in range(100)]:
+        assert fast_lcs._popcount(value) == fallback(value)
@@ -0,0 +1,84 @@
+import time
+import pytest
+from email.utils import formatdate
+from urllib.parse import urlsplit
+
+for module in ('requests', 'numpy', 'nltk', 'sklearn', 'networkx', 'rouge_score'):
+    pytest.importorskip(module)
+import requests
+from fixture_server import FixtureServer
+from http_fetcher import MAX_BACKOFF, Fetcher, TokenBucket
+
+def _article_urls(server, count=1):
+    return [article['url'] for article in server.site.articles[:count]]
+
+def test_token_bucket_allows_burst_then_paces():
+    bucket = TokenBucket(rate=20, burst=3)
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    start_time = time.monotonic()
+    bucket.acquire()
+    bucket.acquire()
+    assert time.monotonic() - start_time >= 0.09
+
+def test_backoff_honours_retry_after():
+    fetcher = Fetcher(workers=1, backoff_factor=0.5)
+    try:
+        assert fetcher._backoff(0, None) == 0.5
+        assert fetcher._backoff(3, None) == 4.0
+        assert fetcher._backoff(20, None) == MAX_BACKOFF
+        assert fetcher._backoff(0, '7') == 7.0
+        assert fetcher._backoff(0, '100000') == MAX_BACKOFF
+        assert 8 <= fetcher._backoff(0, formatdate(time.time() + 10, usegmt=True)) <= 10
+        assert fetcher._backoff(0, formatdate(time.time() - 60, usegmt=True)) == 0.0
+        assert fetcher._backoff(1, 'soon') == 1.0
+    finally:
+        fetcher.close()
+
+def test_retries_transient_errors():
+    # fail_every=1 answers 503 (Retry-After: 0) to the first request for every page
+    with FixtureServer(articles_per_source=2, fail_every=1) as server:
+        url = _article_urls(server)[0]
+        path = urlsplit(url).path
+        with Fetcher(workers=2, rate=0, backoff_factor=0.01) as fetcher:
+            assert fetcher.fetch(url) == server.site.pages[path][1]
+            assert fetcher.stats['retries'] == 1
+            assert fetcher.stats['requests'] == 2
+        assert server.request_counts[path] == 2
+
+def test_gives_up_after_max_retries():
+    with FixtureServer(articles_per_source=2, fail_every=1) as server:
+        with Fetcher(workers=1, rate=0, max_retries=0) as fetcher:
+            with pytest.raises(requests.HTTPError):
+                fetcher.fetch(_article_urls(server)[0])
+            assert fetcher.stats['retries'] == 0
+
+def test_connection_errors_are_retried_then_raised():
+    with FixtureServer() as server:
+        url = server.base_url + '/'
+    with Fetcher(workers=1, rate=0, max_retries=2, backoff_factor=0.01, timeout=1) as fetcher:
+        with pytest.raises(requests.ConnectionError):
+            fetcher.get(url)
+        assert fetcher.stats['requests'] == 3
+        assert fetcher.stats['errors'] == 3
+
+def test_every_attempt_is_rate_limited():
+    with FixtureServer(articles_per_source=4, fail_every=1) as server:
+        urls = _article_urls(server, 2)
+        # Burst 1 at 5 requests/s: two pages, each retried once, are four requests and three waits
+        with Fetcher(workers=1, rate=5, burst=1, backoff_factor=0.0) as fetcher:
+            start_time = time.monotonic()
+            for url in urls:
+                fetcher.fetch(url)
+            elapsed = time.monotonic() - start_time
+            assert fetcher.stats['requests'] == 4
+            assert elapsed >= 0.55
+            assert fetcher.stats['throttled_s'] >= 0.55
+
+def test_hosts_are_limited_separately():
+    with FixtureServer(articles_per_source=2) as first, FixtureServer(articles_per_source=2) as second:
+        urls = _article_urls(first) + _article_urls(second)
+        with Fetcher(workers=2, rate=1, burst=1) as fetcher:
+            start_time = time.monotonic()
+            for url in urls:
+                fetcher.fetch(url)
+            assert time.monotonic() - start_time < 0.5
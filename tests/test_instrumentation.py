@@ -0,0 +1,86 @@
+import random
+import pytest
+from instrumentation import SUB_BUCKETS, Instrumentation, LatencyHistogram, bucket_bounds, bucket_index
+
+def _values(count=5000, seed=0):
+    rng = random.Random(seed)
+    # Log-uniform from 1ns to ~100s, plus the exact small values and power-of-two edges
+    values = [int(10 ** rng.uniform(0, 11)) for _ in range(count)]
+    return values + list(range(0, 2 * SUB_BUCKETS + 2)) + [(1 << k) + d for k in range(5, 40) for d in (-1, 0, 1)]
+
+def _histogram(values):
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+    return histogram
+
+def test_bucket_contains_value_with_bounded_width():
+    for value in _values():
+        low, high = bucket_bounds(bucket_index(value))
+        assert low <= value <= high
+        assert high - low <= value / SUB_BUCKETS
+
+def test_small_values_are_exact():
+    for value in range(2 * SUB_BUCKETS):
+        assert bucket_bounds(bucket_index(value)) == (value, value)
+
+def test_buckets_are_monotonic_and_contiguous():
+    previous_high = -1
+    for index in range(bucket_index(1 << 30)):
+        low, high = bucket_bounds(index)
+        assert low == previous_high + 1
+        assert bucket_index(low) == index and bucket_index(high) == index
+        previous_high = high
+
+def test_merge_equals_recording_everything():
+    values = _values()
+    random.Random(1).shuffle(values)
+    merged = LatencyHistogram()
+    for start in range(0, len(values), 700):
+        merged.merge(_histogram(values[start:start + 700]))
+    merged.merge(LatencyHistogram())
+    
+    single = _histogram(values)
+    assert merged.to_dict() == single.to_dict()
+
+def test_dict_round_trip():
+    histogram = _histogram(_values(500))
+    restored = LatencyHistogram.from_dict(histogram.to_dict())
+    assert restored.to_dict() == histogram.to_dict()
+    assert all(restored.percentile(q) == histogram.percentile(q) for q in (1, 50, 95, 99, 100))
+
+def test_percentile_within_bucket_error():
+    values = _values()
+    histogram = _histogram(values)
+    ordered = sorted(values)
+    for q in (1, 10, 50, 90, 95, 99, 99.9, 100):
+        exact = ordered[max(1, int(round(q / 100 * len(values)))) - 1]
+        assert abs(histogram.percentile(q) - exact) <= exact / SUB_BUCKETS
+    assert histogram.percentile(100) == max(values)
+    assert LatencyHistogram().percentile(50) == 0
+
+def test_disabled_spans_record_nothing():
+    registry = Instrumentation(enabled=False)
+    with registry.span('stage'):
+        pass
+    assert registry.summary() == {}
+
+def test_drain_and_merge_snapshot():
+    worker = Instrumentation(enabled=True)
+    parent = Instrumentation(enabled=True)
+    values = _values(300)
+    for value in values:
+        worker.record('summarize', value)
+    with worker.span('load'):
+        pass
+    
+    snapshot = worker.drain()
+    assert worker.summary() == {}
+    parent.merge_snapshot(snapshot)
+    parent.merge_snapshot(snapshot)
+    parent.merge_snapshot({})
+    
+    stages = parent.summary()
+    assert stages['summarize']['count'] == 2 * len(values)
+    assert stages['summarize']['total_s'] == pytest.approx(2 * sum(values) / 1e9)
+    assert stages['load']['count'] == 2
@@ -0,0 +1,75 @@
+import random
+import pytest
+
+np = pytest.importorskip('numpy')
+from near_duplicates import MinHasher, NearDuplicateIndex, choose_bands, exact_pairs, jaccard, shingle_hashes
+
+WORDS = ('council vote budget school river bridge police report market shares energy price storm coast '
+         'hospital doctors league match season coach court ruling minister talks border trade').split()
+
+def _text(rng, length=300):
+    return ' '.join(rng.choice(WORDS) + str(rng.randrange(50)) for _ in range(length))
+
+def _edit(rng, text, fraction):
+    tokens = text.split()
+    for position in rng.sample(range(len(tokens)), int(len(tokens) * fraction)):
+        tokens[position] = 'edited' + str(rng.randrange(1000))
+    return ' '.join(tokens)
+
+def _collision_probability(similarity, bands, rows):
+    return 1 - (1 - similarity ** rows) ** bands
+
+@pytest.mark.parametrize('num_perm', [16, 64, 128, 200])
+@pytest.mark.parametrize('threshold', [0.3, 0.5, 0.8, 0.95])
+def test_bands_fit_signature(threshold, num_perm):
+    bands, rows = choose_bands(threshold, num_perm)
+    assert bands >= 1 and rows >= 1
+    assert bands * rows <= num_perm
+
+@pytest.mark.parametrize('threshold', [0.5, 0.6, 0.7, 0.8, 0.85])
+def test_default_bands_favour_recall(threshold):
+    bands, rows = choose_bands(threshold, 128)
+    assert _collision_probability(threshold + 0.1, bands, rows) >= 0.95
+    assert _collision_probability(threshold - 0.2, bands, rows) <= 0.35
+
+def test_recall_weight_moves_the_curve():
+    recall_bands = choose_bands(0.8, 128, recall_weight=0.9)
+    balanced_bands = choose_bands(0.8, 128, recall_weight=0.5)
+    assert _collision_probability(0.8, *recall_bands) > _collision_probability(0.8, *balanced_bands)
+    assert _collision_probability(0.6, *recall_bands) > _collision_probability(0.6, *balanced_bands)
+
+def test_explicit_bands():
+    index = NearDuplicateIndex(threshold=0.8, num_perm=128, bands=16)
+    assert (index.bands, index.rows) == (16, 8)
+
+def test_shingles():
+    assert len(shingle_hashes('')) == 0
+    assert len(shingle_hashes('too short')) == 1
+    assert len(shingle_hashes('a b c d e f g')) == 3
+    assert np.array_equal(shingle_hashes('One, two THREE four five'), shingle_hashes('one two three four five'))
+
+def test_signature_estimates_jaccard():
+    rng = random.Random(0)
+    hasher = MinHasher(num_perm=256)
+    base = _text(rng)
+    for fraction in (0.02, 0.05, 0.1, 0.2):
+        edited = _edit(rng, base, fraction)
+        exact = jaccard(set(shingle_hashes(base).tolist()), set(shingle_hashes(edited).tolist()))
+        estimate = float(np.mean(hasher.signature(base) == hasher.signature(edited)))
+        assert estimate == pytest.approx(exact, abs=0.1)
+
+def test_index_groups_near_duplicates_only():
+    rng = random.Random(1)
+    originals = [_text(rng) for _ in range(20)]
+    texts = {f"a{i}": text for i, text in enumerate(originals)}
+    # One changed word in a hundred leaves shingle Jaccard around 0.9
+    texts.update({f"b{i}": _edit(rng, text, 0.01) for i, text in enumerate(originals)})
+    
+    index = NearDuplicateIndex(threshold=0.8)
+    for key, text in texts.items():
+        index.add(key, text)
+    
+    groups = sorted(sorted(group) for group in index.groups())
+    assert groups == [[f"a{i}", f"b{i}"] for i in sorted(range(20), key=str)]
+    assert all(index.representative(f"b{i}") == f"a{i}" for i in range(20))
+    assert {tuple(sorted(group)) for group in groups} == exact_pairs(texts, 0.8)
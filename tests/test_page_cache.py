@@ -0,0 +1,86 @@
+import os
+import time
+import pytest
+from page_cache import PageCache
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = PageCache(str(tmp_path), max_bytes=250)
+    for name in ('a', 'b'):
+        cache.store(f"http://x/{name}", b'x' * 100)
+        time.sleep(0.01)
+    # Reading a refreshes it, so b is the least recently used page when c arrives
+    assert cache.read('http://x/a') == b'x' * 100
+    time.sleep(0.01)
+    cache.store('http://x/c', b'x' * 100)
+    
+    assert cache.lookup('http://x/b') is None
+    assert cache.read('http://x/a') is not None
+    assert cache.read('http://x/c') is not None
+    assert cache.stats() == {'pages': 2, 'bytes': 200, 'max_bytes': 250}
+    cache.close()
+    
+    reopened = PageCache(str(tmp_path), max_bytes=150)
+    assert reopened.stats()['pages'] == 1
+    assert reopened.stats()['bytes'] == 100
+    reopened.close()
+
+def test_parse_results_follow_body_and_parser(tmp_path):
+    cache = PageCache(str(tmp_path), max_bytes=10_000)
+    url = 'http://x/article'
+    content_hash = cache.store(url, b'<p>old</p>', etag='"1"')
+    assert cache.get_parsed(url, content_hash, 'v1') == (None, False)
+    cache.set_parsed(url, content_hash, {'text': 'old'}, 'v1')
+    assert cache.get_parsed(url, content_hash, 'v1') == ({'text': 'old'}, True)
+    assert cache.get_parsed(url, content_hash, 'v2') == (None, False)
+    assert cache.stats()['bytes'] == len(b'<p>old</p>') + len('{"text": "old"}')
+    
+    # Storing the same body keeps the parse result, a new body drops it
+    assert cache.store(url, b'<p>old</p>', etag='"1"') == content_hash
+    assert cache.get_parsed(url, content_hash, 'v1')[1]
+    new_hash = cache.store(url, b'<p>new</p>', etag='"2"')
+    assert cache.get_parsed(url, content_hash, 'v1') == (None, False)
+    assert cache.get_parsed(url, new_hash, 'v1') == (None, False)
+    assert cache.stats()['bytes'] == len(b'<p>new</p>')
+    
+    # Parse results of unknown pages are not stored
+    cache.set_parsed('http://x/missing', new_hash, {'text': ''}, 'v1')
+    assert cache.stats()['pages'] == 1
+    cache.close()
+
+def test_conditional_requests_round_trip(tmp_path):
+    for module in ('requests', 'numpy', 'nltk', 'sklearn', 'networkx', 'rouge_score'):
+        pytest.importorskip(module)
+    from fixture_server import FixtureServer
+    from http_fetcher import Fetcher
+    
+    with FixtureServer(articles_per_source=2) as server:
+        path = server.site.article_paths()[0]
+        url = server.base_url + path
+        with Fetcher(workers=1, rate=0, cache=PageCache(str(tmp_path))) as fetcher:
+            first = fetcher.fetch_page(url)
+            assert first.changed
+            assert fetcher.cache.conditional_headers(fetcher.cache.lookup(url))
+            
+            server.reset_counters()
+            second = fetcher.fetch_page(url)
+            assert not second.changed
+            assert second.content == first.content
+            assert second.content_hash == first.content_hash
+            assert fetcher.stats['not_modified'] == 1
+            assert server.not_modified == 1
+            
+            server.site.update_article(path, 'A correction was added to this article.')
+            third = fetcher.fetch_page(url)
+            assert third.changed
+            assert b'A correction was added' in third.content
+            assert third.content_hash != first.content_hash
+            
+            # A 304 for a page whose body file is gone falls back to a full fetch
+            os.remove(fetcher.cache._body_path(url))
+            server.reset_counters()
+            fourth = fetcher.fetch_page(url)
+            assert fourth.content == third.content
+            assert not fourth.changed
+            assert server.not_modified == 1
+            assert server.request_counts[path] == 2
+            assert fetcher.stats['not_modified'] == 1
@@ -0,0 +1,60 @@
+import multiprocessing
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+from results_store import ResultsStore
+
+ROWS = [
+    {'article_id': 'a', 'title': 'Café in 東京', 'TF-IDF_rouge1_f1': 0.5, 'TF-IDF_summary': 'First. Second.'},
+    {'article_id': 'b', 'title': '', 'TF-IDF_rouge1_f1': 0.25, 'TF-IDF_summary': None},
+    {'article_id': 'c', 'title': 'Plain', 'TF-IDF_rouge1_f1': 1.0, 'TF-IDF_summary': 'x' * 5000}
+]
+
+def test_columns_round_trip(tmp_path):
+    store = ResultsStore(str(tmp_path))
+    run_id = store.append_run(ROWS)
+    
+    assert list(store.load_column('title')) == ['Café in 東京', '', 'Plain']
+    assert list(store.load_column('TF-IDF_summary')) == ['First. Second.', '', 'x' * 5000]
+    assert np.allclose(store.load_column('TF-IDF_rouge1_f1'), [0.5, 0.25, 1.0])
+    assert store.load_text('TF-IDF_summary', [2, 0], run_id) == ['x' * 5000, 'First. Second.']
+    assert store.columns(run_id)['title'] == 'text'
+    assert store.aggregates(run_id)['columns']['TF-IDF_rouge1_f1']['count'] == 3
+
+def test_empty_text_column(tmp_path):
+    store = ResultsStore(str(tmp_path))
+    store.append_run([{'title': '', 'score': 1.0}, {'title': '', 'score': 2.0}])
+    assert list(store.load_column('title')) == ['', '']
+
+def test_columns_concatenate_across_runs(tmp_path):
+    store = ResultsStore(str(tmp_path))
+    first = store.append_run(ROWS[:1])
+    second = store.append_run([{'article_id': 'd', 'other': 2.0}])
+    assert list(store.load_column('article_id', [first, second])) == ['a', 'd']
+    assert np.isnan(store.load_column('other', [first, second])[0])
+
+def _append_runs(root, worker, count):
+    store = ResultsStore(root)
+    for i in range(count):
+        store.append_run([{'article_id': f"{worker}-{i}", 'score': float(i)}], run_id=f"run-{worker}-{i}",
+                         error_analysis={'worker': worker})
+
+def test_concurrent_runs_keep_every_manifest_entry(tmp_path):
+    root = str(tmp_path)
+    context = multiprocessing.get_context('fork')
+    processes = [context.Process(target=_append_runs, args=(root, worker, 10)) for worker in range(6)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert all(process.exitcode == 0 for process in processes)
+    
+    store = ResultsStore(root)
+    expected = {f"run-{worker}-{i}" for worker in range(6) for i in range(10)}
+    assert set(store.run_ids()) == expected
+    for run_id in expected:
+        aggregates = store.aggregates(run_id)
+        assert aggregates['num_rows'] == 1
+        assert aggregates['error_analysis']['worker'] == int(run_id.split('-')[1])
+    assert not [name for name in tmp_path.iterdir() if name.suffix == '.tmp']
@@ -0,0 +1,53 @@
+import math
+import random
+import pytest
+
+pytest.importorskip('rouge_score')
+pytest.importorskip('nltk')
+from evaluation import RunningStats
+
+def _stats(values):
+    stats = RunningStats()
+    for value in values:
+        stats.update(value)
+    return stats
+
+def _population_std(values):
+    mean = sum(values) / len(values)
+    return math.sqrt(sum((v - mean) ** 2 for v in values) / len(values))
+
+def test_update_matches_two_pass():
+    values = [random.Random(0).uniform(0, 1) for _ in range(1000)]
+    stats = _stats(values)
+    assert stats.count == len(values)
+    assert stats.mean == pytest.approx(sum(values) / len(values), rel=1e-12)
+    assert stats.std() == pytest.approx(_population_std(values), rel=1e-9)
+
+@pytest.mark.parametrize('num_shards', [1, 2, 3, 7, 50])
+def test_merged_shards_match_single_pass(num_shards):
+    rng = random.Random(num_shards)
+    values = [rng.gauss(0.4, 0.2) for _ in range(997)]
+    cuts = sorted(rng.sample(range(1, len(values)), num_shards - 1))
+    shards = [values[a:b] for a, b in zip([0] + cuts, cuts + [len(values)])]
+    
+    merged = RunningStats()
+    for shard in shards:
+        merged.merge(_stats(shard))
+    single = _stats(values)
+    
+    assert merged.count == single.count
+    assert merged.mean == pytest.approx(single.mean, rel=1e-12)
+    assert merged.m2 == pytest.approx(single.m2, rel=1e-9)
+
+def test_merge_with_empty():
+    stats = _stats([0.1, 0.5, 0.9])
+    before = (stats.count, stats.mean, stats.m2)
+    stats.merge(RunningStats())
+    assert (stats.count, stats.mean, stats.m2) == before
+    
+    empty = RunningStats()
+    empty.merge(_stats([0.1, 0.5, 0.9]))
+    assert (empty.count, empty.mean, empty.m2) == pytest.approx(before)
+
+def test_empty_std_is_nan():
+    assert math.isnan(RunningStats().std())
@@ -0,0 +1,85 @@
+import pytest
+
+pytest.importorskip('nltk')
+from sentence_segmenter import PunktSegmenter, RegexSegmenter, make_segmenter
+
+try:
+    PunktSegmenter()
+except LookupError:
+    pytest.skip('punkt data is not installed', allow_module_level=True)
+
+from benchmark_segmentation import HARD_SENTENCES, boundary_metrics, make_corpus
+
+NEXT = 'The next one starts here.'
+# Sentence-final abbreviations and ellipses are left to punkt, which does not split them either
+DEFERRED = {"{name} has lived in the U.S.", "It was, she said, a long wait..."}
+
+@pytest.fixture(scope='module')
+def regex():
+    return RegexSegmenter()
+
+@pytest.fixture(scope='module')
+def punkt():
+    return PunktSegmenter()
+
+@pytest.mark.parametrize('word, punctuation, closers, next_char, expected', [
+    ('done', '.', '', 'T', True),
+    ('done', '.', '', 't', None),
+    ('Mr', '.', '', 'S', False),
+    ('"Dr', '.', '', 'S', False),
+    ('J', '.', '', 'R', False),
+    ('Inc', '.', '', 'r', False),
+    ('Inc', '.', '', 'T', None),
+    ('Jan', '.', '', '1', False),
+    ('U.S', '.', '', 'e', False),
+    ('D.C', '.', '', 'T', None),
+    ('40', '.', '', 'T', True),
+    ('$12.40', '.', '', 'T', None),
+    ('2.1', '.', '', 'p', False),
+    ('now', '?', '"', 'a', False),
+    ('now', '?', '', 'a', None),
+    ('yet', '!', '"', 'S', True),
+    ('wait', '...', '', 'T', None),
+    ('disgrace', '.', '"', 'T', True),
+])
+def test_classify(word, punctuation, closers, next_char, expected):
+    assert RegexSegmenter.classify(word, punctuation, closers, next_char) is expected
+
+def test_spans_group_candidates_between_decided_boundaries():
+    spans = RegexSegmenter._spans(100, [20, 50], [10, 15, 30, 60, 70])
+    assert spans == [(0, 20, [10, 15]), (20, 50, [30]), (50, 100, [60, 70])]
+    assert RegexSegmenter._spans(40, [], [5, 25]) == [(0, 40, [5, 25])]
+
+def test_plain_text_matches_punkt(regex, punkt):
+    for text, planted in make_corpus(200, hard_fraction=0.0, seed=3):
+        boundaries = regex.boundaries(text)
+        assert boundaries == planted
+        assert boundaries == punkt.boundaries(text)[:-1]
+
+@pytest.mark.parametrize('template', HARD_SENTENCES)
+def test_hard_sentences(regex, punkt, template):
+    sentence = template.format(name='Smith', name2='Okafor', place='Leeds')
+    text = f"{sentence} {NEXT}"
+    if template in DEFERRED:
+        assert regex.segment(text) == punkt.segment(text)
+    else:
+        assert regex.segment(text) == [sentence, NEXT]
+
+def test_hard_corpus_precision():
+    regex, punkt = RegexSegmenter(), PunktSegmenter()
+    corpus = make_corpus(200, hard_fraction=0.4, seed=3)
+    planted = [set(boundaries) for _, boundaries in corpus]
+    regex_metrics = boundary_metrics([set(regex.boundaries(text)) for text, _ in corpus], planted)
+    punkt_metrics = boundary_metrics([set(punkt.boundaries(text)) - {len(text)} for text, _ in corpus], planted)
+    assert regex_metrics['precision'] >= 0.99
+    assert regex_metrics['recall'] >= punkt_metrics['recall']
+    assert 0 < regex.ambiguous < regex.candidates
+
+def test_segment_strips_and_drops_empty(regex):
+    assert regex.segment('  First one.   Second one!  ') == ['First one.', 'Second one!']
+    assert regex.segment('') == []
+
+def test_make_segmenter():
+    assert isinstance(make_segmenter('regex'), RegexSegmenter)
+    with pytest.raises(ValueError):
+        make_segmenter('spacy')
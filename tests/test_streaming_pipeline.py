@@ -0,0 +1,65 @@
+import io
+import json
+import threading
+import pytest
+
+for module in ('bs4', 'requests', 'nltk', 'sklearn', 'networkx', 'rouge_score'):
+    pytest.importorskip(module)
+import streaming_pipeline
+from data_collector import NewsCollector
+from fixture_server import FixtureServer
+from streaming_pipeline import StreamingPipeline
+
+@pytest.fixture
+def server():
+    with FixtureServer(articles_per_source=12) as server:
+        yield server
+
+def _run(server, tmp_path, counts=None, queue_size=4):
+    sources = server.sources()
+    counts = counts or {key: 4 for key in sources}
+    collector = NewsCollector(output_dir=str(tmp_path), sources=sources, workers=4, rate=0)
+    output = io.StringIO()
+    pipeline = StreamingPipeline(collector, ['Lead-3'], counts, output, fetch_workers=4, queue_size=queue_size)
+    
+    # A stage that never shuts down would hang join(); run in a thread so the test fails instead
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(pipeline.run()), daemon=True)
+    thread.start()
+    thread.join(timeout=120)
+    collector.close()
+    assert not thread.is_alive(), 'pipeline did not shut down'
+    return counts, result, [json.loads(line) for line in output.getvalue().splitlines()]
+
+def test_lead3_against_fixture_sites(server, tmp_path):
+    counts, stats, rows = _run(server, tmp_path)
+    
+    assert stats['collected'] == counts
+    assert stats['articles'] == len(rows) == sum(counts.values())
+    assert len({row['url'] for row in rows}) == len(rows)
+    assert {row['source'] for row in rows} == {server.sources()[key]['name'] for key in counts}
+    for row in rows:
+        assert row['Lead-3_summary']
+        assert row['Lead-3_time'] >= 0
+        assert 'text' not in row
+    
+    stages = stats['stages']
+    assert list(stages) == ['discover', 'fetch', 'parse', 'preprocess', 'Lead-3', 'sink']
+    assert stages['parse']['emitted'] == sum(counts.values())
+    assert stages['Lead-3']['received'] == stages['Lead-3']['emitted'] == len(rows)
+    assert stages['sink']['received'] == len(rows)
+    assert all(stage['errors'] == 0 and stage['failed_workers'] == 0 for stage in stages.values())
+
+def test_stage_without_workers_still_shuts_down(server, tmp_path, monkeypatch):
+    def build_summarizer(*args, **kwargs):
+        raise RuntimeError('model unavailable')
+    monkeypatch.setattr(streaming_pipeline, 'build_summarizer', build_summarizer)
+    
+    # A one-slot queue fills at once, so upstream would block if the failed stage stopped reading
+    counts, stats, rows = _run(server, tmp_path, queue_size=1)
+    
+    assert rows == []
+    summarize = stats['stages']['Lead-3']
+    assert summarize['failed_workers'] == summarize['workers']
+    assert summarize['errors'] == summarize['received'] == stats['stages']['preprocess']['emitted'] > 0
+    assert stats['stages']['sink']['received'] == 0